@@ -8,10 +8,15 @@ LINEチャネル作成Issueを自動生成するスクリプト
 import json
 import os
 import re
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import requests
+# Add project root to path (reuses the pooled HTTP session, keep-alive to api.github.com)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.http_client import get_session  # noqa: E402
 
 # GitHub API settings
 GITHUB_API_BASE = "https://api.github.com"
@@ -20,7 +25,6 @@ REPO_NAME = os.getenv("GITHUB_REPOSITORY", "").split("/")[1] if "/" in os.getenv
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 # Paths
-PROJECT_ROOT = Path(__file__).parent.parent.parent
 SITES_DIR = PROJECT_ROOT / "data" / "sites"
 CHANNELS_FILE = PROJECT_ROOT / "data" / "channels.json"
 
@@ -121,7 +125,7 @@ def check_existing_issue(channel_id: str, repo_owner: str, repo_name: str) -> bo
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        response = get_session().get(url, headers=headers, params=params, timeout=30)
         response.raise_for_status()
         issues = response.json()
         
@@ -167,7 +171,7 @@ def create_issue(title: str, body: str, labels: list, repo_owner: str, repo_name
     }
     
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = get_session().post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
         issue = response.json()
         print(f"✓ Issue created: #{issue['number']} - {title}")
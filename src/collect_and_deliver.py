@@ -1,9 +1,17 @@
 """Information collection and delivery execution script"""
 
+import argparse
+import math
 import os
+import signal
 import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -14,17 +22,25 @@ from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv(project_root / ".env")
 
+from src.collect_scheduler import CircuitBreaker, CollectionScheduler  # noqa: E402
 from src.collectors.base import BaseInformationCollector, InformationItem  # noqa: E402
 from src.collectors.email_collector import EmailCollector  # noqa: E402
 from src.collectors.rss_reader import RSSReaderCollector  # noqa: E402
-from src.diff_detector import DiffDetector  # noqa: E402
+from src.collectors.site_state import SiteStateCache  # noqa: E402
+from src.delivery_outbox import DeliveryOutbox  # noqa: E402
+from src.diff_detector import DedupIndex, DiffDetector  # noqa: E402
 from src.line_notifier import LineNotifier  # noqa: E402
-from src.storage import Storage  # noqa: E402
+from src.storage import Storage, create_storage  # noqa: E402
 from src.user_manager import UserManager  # noqa: E402
 
 
-def main():
-    """Main process"""
+def main(daemon: bool = False):
+    """
+    Main process
+
+    Args:
+        daemon: Keep running and collect each site when it is due instead of doing a single pass
+    """
     print("=" * 60)
     print("Information Collection and Delivery Script Started")
     print("=" * 60)
@@ -40,7 +56,7 @@ def main():
     print(f"  GEMINI_API_KEY: {'✓' if gemini_key_exists else '✗'}")
 
     # Initialize
-    storage = Storage()
+    storage = create_storage()
     user_manager = UserManager(storage)
     diff_detector = DiffDetector()
 
@@ -53,6 +69,24 @@ def main():
         print("⚠️ LINE Notifier could not be initialized, but will continue with information collection only")
         line_notifier = None
 
+    max_workers = int(os.getenv("COLLECT_MAX_WORKERS", "4"))
+    site_timeout = float(os.getenv("COLLECT_SITE_TIMEOUT_SECONDS", "300"))
+    run_timeout = float(os.getenv("COLLECT_RUN_TIMEOUT_SECONDS", "0")) or None
+
+    if daemon:
+        poll_seconds = float(os.getenv("COLLECT_DAEMON_POLL_SECONDS", "60"))
+        run_daemon(
+            storage,
+            user_manager,
+            diff_detector,
+            line_notifier,
+            max_workers,
+            site_timeout,
+            poll_seconds,
+            run_timeout=run_timeout,
+        )
+        return
+
     # Load site configurations
     sites_data = storage.load_sites()
     if not sites_data or not sites_data.get("sites"):
@@ -65,86 +99,426 @@ def main():
 
     print(f"Number of enabled sites: {len(enabled_sites)}")
 
-    # Collect information from each site
-    all_new_items = []
+    # Build the dedup index from stored items once for the whole run
+    dedup_index = _build_dedup_index(storage, diff_detector)
 
-    for site in enabled_sites:
-        site_id = site.get("id", "")
-        site_name = site.get("name", "Unknown")
-        collector_type = site.get("collector_type", "")
+    # Site state (last collection time, stats, collector state) is cached for the whole run and
+    # written in one batch at the end, or at exit if the run is interrupted
+    site_state = SiteStateCache(storage, sites)
+    site_state.install_exit_hooks()
 
-        print(f"\n--- Site: {site_name} ({site_id}) ---")
+    # Decide which sites are due (reads storage, so stays on the main thread)
+    collection_plan = _plan_collection(enabled_sites, storage, site_state)
 
-        # Check collection timing
-        collector = _create_collector(collector_type, storage)
-        if not collector:
-            print(f"Warning: Collector type '{collector_type}' is not implemented")
-            continue
+    all_new_items, collected = _collect_new_items(
+        collection_plan, diff_detector, dedup_index, max_workers, site_timeout, run_timeout
+    )
+    outbox, published = _publish_new_items(storage, user_manager, all_new_items)
+    if published:
+        _commit_collections(collected)
+    else:
+        _forget_new_items(dedup_index, all_new_items)
 
-        if not collector.should_collect(site):
-            print("Skipped: Not time to collect yet")
+    _report_open_circuits(site_state)
+
+    # Persist the site state buffered during the run
+    site_state.flush()
+
+    _deliver_pending_jobs(outbox, line_notifier)
+
+    print("\n" + "=" * 60)
+    print("Information Collection and Delivery Script Completed")
+    print("=" * 60)
+
+
+def run_daemon(
+    storage: Storage,
+    user_manager: UserManager,
+    diff_detector: DiffDetector,
+    line_notifier: Optional[LineNotifier],
+    max_workers: int,
+    site_timeout: float,
+    poll_seconds: float = 60.0,
+    stop_event: Optional[threading.Event] = None,
+    run_timeout: Optional[float] = None,
+):
+    """
+    Collect each site when it is due until stopped (SIGTERM / SIGINT)
+
+    Sites are kept in a min-heap by next due time and the loop sleeps until
+    the earliest deadline, waking at least every poll_seconds to pick up site
+    configuration changes and deferred delivery jobs.
+
+    Args:
+        storage: Storage instance
+        user_manager: UserManager instance
+        diff_detector: DiffDetector instance
+        line_notifier: LineNotifier instance (None to only collect)
+        max_workers: Maximum number of concurrent collections
+        site_timeout: Per-site timeout in seconds
+        poll_seconds: Maximum sleep between checks
+        stop_event: Event that stops the loop (created and wired to signals if omitted)
+        run_timeout: Deadline in seconds for collecting each batch of due sites (None to derive it from site_timeout)
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop_event.set())
+
+    site_state: Optional[SiteStateCache] = None
+    # Looks up the current site_state, so intervals follow reloads and adaptive updates
+    scheduler = CollectionScheduler(interval_minutes=lambda site: site_state.get_interval_minutes(site["id"]))
+    dedup_index = _build_dedup_index(storage, diff_detector)
+    sites_version = None
+    loaded = False
+
+    print(f"\nDaemon mode started (workers: {max_workers}, poll: {poll_seconds:.0f}s)")
+
+    try:
+        while not stop_event.is_set():
+            # Reload the site configurations when they changed
+            version = storage.get_data_version("sites")
+            if not loaded or version != sites_version:
+                if site_state:
+                    site_state.flush()
+                sites_data = storage.load_sites()
+                sites = sites_data.get("sites", []) if sites_data else []
+                site_state = SiteStateCache(storage, sites)
+                scheduler.sync(
+                    [s for s in sites if s.get("enabled", False)], site_state.get_last_checked_time, site_state.get_retry_at
+                )
+                sites_version = storage.get_data_version("sites")
+                loaded = True
+                print(f"✓ Site configurations loaded ({len(scheduler.next_due())} enabled sites)")
+
+            due_sites = scheduler.pop_due()
+            if due_sites:
+                print(f"\n--- {datetime.now().isoformat()} Collecting {len(due_sites)} due sites ---")
+                collection_plan = []
+                for site in due_sites:
+                    collector = _create_collector(site.get("collector_type", ""), storage, site_state)
+                    if collector:
+                        collection_plan.append((site, collector))
+                    else:
+                        print(f"Warning: Collector type '{site.get('collector_type', '')}' is not implemented")
+
+                all_new_items, collected = _collect_new_items(
+                    collection_plan, diff_detector, dedup_index, max_workers, site_timeout, run_timeout
+                )
+                for site in due_sites:
+                    scheduler.reschedule(site, not_before=site_state.get_retry_at(site["id"]))
+                outbox, published = _publish_new_items(storage, user_manager, all_new_items)
+                if published:
+                    _commit_collections(collected)
+                else:
+                    _forget_new_items(dedup_index, all_new_items)
+                _report_open_circuits(site_state)
+
+                # Our own write changes the version; only absorb it if nobody else changed the sites meanwhile
+                version_before_flush = storage.get_data_version("sites")
+                site_state.flush()
+                if version_before_flush == sites_version:
+                    sites_version = storage.get_data_version("sites")
+            else:
+                outbox = DeliveryOutbox(storage)
+
+            _deliver_pending_jobs(outbox, line_notifier)
+
+            wait_seconds = scheduler.seconds_until_next()
+            stop_event.wait(poll_seconds if wait_seconds is None else min(wait_seconds, poll_seconds))
+    finally:
+        if site_state:
+            site_state.flush()
+        print("\nDaemon mode stopped")
+
+
+def _build_dedup_index(storage: Storage, diff_detector: DiffDetector) -> DedupIndex:
+    """
+    Build the dedup index from the stored information items
+
+    Args:
+        storage: Storage instance
+        diff_detector: DiffDetector instance
+
+    Returns:
+        DedupIndex: Index of stored URLs and content hashes
+    """
+    stored_items_data = storage.load_information_items()
+    stored_items = stored_items_data.get("items", []) if stored_items_data else []
+    print(f"Stored information items: {len(stored_items)}")
+    return diff_detector.build_index(stored_items)
+
+
+def _collect_new_items(
+    collection_plan: List[Tuple[Dict, BaseInformationCollector]],
+    diff_detector: DiffDetector,
+    dedup_index: DedupIndex,
+    max_workers: int,
+    site_timeout: float,
+    run_timeout: Optional[float] = None,
+) -> Tuple[List[InformationItem], List[Tuple[Dict, BaseInformationCollector]]]:
+    """
+    Collect the planned sites concurrently and extract the new items
+
+    Args:
+        collection_plan: (site configuration, collector) pairs
+        diff_detector: DiffDetector instance
+        dedup_index: Index of known items (updated in place)
+        max_workers: Maximum number of concurrent collections
+        site_timeout: Per-site timeout in seconds
+        run_timeout: Deadline for collecting all planned sites in seconds (None to derive it from site_timeout)
+
+    Returns:
+        Tuple[List[InformationItem], List[Tuple[Dict, BaseInformationCollector]]]:
+            New items in site order, and the (site configuration, collector) pairs whose results were processed
+    """
+    # Collect due sites concurrently; results come back in site order
+    print(f"\nCollecting {len(collection_plan)} sites (workers: {max_workers}, timeout: {site_timeout:.0f}s)")
+    results = _collect_sites_concurrently(collection_plan, max_workers, site_timeout, run_timeout)
+
+    # Dedup results on the main thread (the index is updated in place, in site order)
+    deduped = []
+
+    for (site, collector), items in zip(collection_plan, results):
+        site_id = site.get("id", "")
+        print(f"\n--- Result: {site.get('name', 'Unknown')} ({site_id}) ---")
+
+        # A failure (as opposed to "not modified" or "no entries") counts towards the site's circuit breaker
+        error = (
+            collector.last_error if items is not None else collector.last_error or "Collection raised an error or timed out"
+        )
+        if error:
+            health = collector.record_failure(site_id, error)
+            print(f"Skipped: Collection failed ({error})")
+            if health and health.get("open_until"):
+                print(f"⚠️ {health['consecutive_failures']} consecutive failures, circuit open until {health['open_until']}")
             continue
 
-        # Collect information
         try:
-            items = collector.collect(site)
+            collector.record_success(site_id)
             print(f"Collected information: {len(items)} items")
 
+            new_items = []
             if items:
-                # Extract new information using diff detection
-                stored_items_data = storage.load_information_items()
-                stored_items = stored_items_data.get("items", []) if stored_items_data else []
-
-                new_items = diff_detector.detect_new_items(items, stored_items)
+                # Extract new information using diff detection (the index is updated in place)
+                new_items = diff_detector.filter_new_items(items, dedup_index)
                 print(f"New information: {len(new_items)} items")
+            deduped.append((site, collector, items, new_items))
+        except Exception as e:
+            print(f"❌ Error: Failed to process collected information - {e}")
+            traceback.print_exc()
+            continue
 
-                if new_items:
-                    all_new_items.extend(new_items)
+    # Expensive per-item work (e.g. AI summaries) only runs for items that survived dedup, on the worker pool
+    prepared = _prepare_new_items_concurrently(
+        [(site, collector, new_items) for site, collector, _, new_items in deduped], max_workers
+    )
 
-                    # Record collection completion
-                    collector.mark_as_collected(site_id, items)
+    # Merge results on the main thread (single writer for storage)
+    all_new_items = []
+    collected = []
 
-                    # Save information items
-                    _save_new_items(storage, new_items, stored_items)
-        except Exception as e:
-            print(f"❌ Error: Failed to collect information - {e}")
-            import traceback
+    for (site, collector, items, new_items), ok in zip(deduped, prepared):
+        if not ok:
+            _forget_new_items(dedup_index, new_items)
+            continue
+        site_id = site.get("id", "")
 
+        try:
+            if new_items:
+                # Record collection completion
+                collector.mark_as_collected(site_id, items)
+
+            # Adapt the polling interval to how often the site has new items
+            interval = collector.record_check(site_id, len(new_items))
+            if interval is not None:
+                print(f"Next check in {interval:.0f} min")
+
+            # Collector state (e.g. feed ETag / Last-Modified) is committed once the new items are saved
+            collected.append((site, collector))
+            all_new_items.extend(new_items)
+        except Exception as e:
+            print(f"❌ Error: Failed to process collected information - {e}")
             traceback.print_exc()
+            _forget_new_items(dedup_index, new_items)
             continue
 
-    # Deliver new information
+    return all_new_items, collected
+
+
+def _forget_new_items(dedup_index: DedupIndex, new_items: List[InformationItem]):
+    """
+    Remove new items that were not saved from the dedup index
+
+    The index outlives a batch in daemon mode, so items left in it would be
+    filtered as already seen when the collector fetches them again.
+
+    Args:
+        dedup_index: Index of known items (updated in place)
+        new_items: New items that were dropped before being saved
+    """
+    for item in new_items:
+        dedup_index.discard(item.url, item.content_hash)
+
+
+def _prepare_new_items_concurrently(
+    prepare_plan: List[Tuple[Dict, BaseInformationCollector, List[InformationItem]]], max_workers: int
+) -> List[bool]:
+    """
+    Run collector.prepare_new_items() for each site's new items on a bounded thread pool
+
+    Sites without new items are prepared inline, since there is nothing to
+    wait on (collectors still use the call to release per-run state).
+
+    Args:
+        prepare_plan: (site configuration, collector, new items) triples; the items are updated in place
+        max_workers: Maximum number of concurrent preparations
+
+    Returns:
+        List[bool]: Whether each site was prepared, in the same order as prepare_plan
+    """
+
+    def run(site: Dict, collector: BaseInformationCollector, new_items: List[InformationItem]) -> bool:
+        try:
+            collector.prepare_new_items(site, new_items)
+            return True
+        except Exception as e:
+            print(f"❌ Error: Failed to prepare new information ({site.get('id', '')}) - {e}")
+            traceback.print_exc()
+            return False
+
+    prepared = [True] * len(prepare_plan)
+    jobs = [i for i, (_, _, new_items) in enumerate(prepare_plan) if new_items]
+    for i, (site, collector, new_items) in enumerate(prepare_plan):
+        if not new_items:
+            prepared[i] = run(site, collector, new_items)
+    if not jobs:
+        return prepared
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="prepare") as executor:
+        futures = {executor.submit(run, *prepare_plan[i]): i for i in jobs}
+        for future, i in futures.items():
+            prepared[i] = future.result()
+
+    return prepared
+
+
+def _commit_collections(collected: List[Tuple[Dict, BaseInformationCollector]]):
+    """
+    Commit the collectors' progress (e.g. feed validators, email UID checkpoints) once the new items are saved and queued
+
+    Sites whose results were discarded (timeouts, failures) or not saved are
+    not committed, so their next collection fetches the same content again.
+
+    Args:
+        collected: (site configuration, collector) pairs whose results were processed
+    """
+    for site, collector in collected:
+        site_id = site.get("id", "")
+        try:
+            if not collector.commit_collection(site_id):
+                print(f"⚠️ Warning: Failed to save collection progress ({site_id})")
+        except Exception as e:
+            print(f"❌ Error: Failed to commit collection progress ({site_id}) - {e}")
+            traceback.print_exc()
+
+
+def _report_open_circuits(site_state: SiteStateCache):
+    """
+    Print the sites whose collections keep failing
+
+    Args:
+        site_state: Run-scoped site state cache
+    """
+    circuits = site_state.open_circuits()
+    if not circuits:
+        return
+
+    print(f"\n--- Open circuits ({len(circuits)} sites) ---")
+    for circuit in circuits:
+        state = "probing next" if circuit["state"] == CircuitBreaker.HALF_OPEN else f"retry after {circuit['open_until']}"
+        print(
+            f"  {circuit['name'] or 'Unknown'} ({circuit['id']}): {circuit['consecutive_failures']} consecutive failures, "
+            f"{state} - {circuit['last_error']}"
+        )
+
+
+def _publish_new_items(
+    storage: Storage, user_manager: UserManager, all_new_items: List[InformationItem]
+) -> Tuple[DeliveryOutbox, bool]:
+    """
+    Queue deliveries for new items and save them
+
+    Args:
+        storage: Storage instance
+        user_manager: UserManager instance
+        all_new_items: New information items
+
+    Returns:
+        Tuple[DeliveryOutbox, bool]: Outbox holding the queued jobs, and whether the new items were saved
+    """
+    # Write delivery jobs to the outbox before saving items, so a crash can't lose deliveries
+    outbox = DeliveryOutbox(storage)
     if all_new_items:
-        if line_notifier is None:
-            print(
-                f"\n⚠️ Warning: There are {len(all_new_items)} new information items, but LINE Notifier was not initialized, so delivery is skipped"
-            )
-        else:
-            print(f"\n--- Starting delivery of new information ({len(all_new_items)} items) ---")
-            _deliver_new_items(all_new_items, user_manager, line_notifier)
+        print(f"\n--- Queueing delivery of new information ({len(all_new_items)} items) ---")
+        _enqueue_new_items(all_new_items, user_manager, outbox)
+
+        # Save all new information items at once
+        if not _save_new_items(storage, all_new_items):
+            print("❌ Error: Failed to save new information items")
+            return outbox, False
     else:
         print("\nNo new information")
+    return outbox, True
 
-    print("\n" + "=" * 60)
-    print("Information Collection and Delivery Script Completed")
-    print("=" * 60)
 
+def _deliver_pending_jobs(outbox: DeliveryOutbox, line_notifier: Optional[LineNotifier]):
+    """
+    Send queued jobs, including ones left pending by earlier runs
 
-def _create_collector(collector_type: str, storage: Storage) -> BaseInformationCollector:
+    Args:
+        outbox: DeliveryOutbox instance
+        line_notifier: LineNotifier instance (None postpones delivery)
+    """
+    pending_count = len(outbox.pending_jobs())
+    if not pending_count:
+        return
+
+    if line_notifier is None:
+        print(
+            f"\n⚠️ Warning: There are {pending_count} pending delivery jobs, but LINE Notifier was not initialized, so delivery is postponed"
+        )
+        return
+
+    print(f"\n--- Starting delivery ({pending_count} jobs) ---")
+    summary = outbox.process(line_notifier)
+    print(f"Delivery finished (pending: {summary['pending']}, failed: {summary['failed']})")
+    for endpoint, stats in line_notifier.rate_limiter.stats().items():
+        print(
+            f"  {endpoint}: {stats['rate_per_second']:.1f}/{stats['limit_per_second']:.0f} req/s, "
+            f"queue depth {stats['queue_depth']}"
+        )
+
+
+def _create_collector(
+    collector_type: str, storage: Storage, site_state: Optional[SiteStateCache] = None
+) -> BaseInformationCollector:
     """
     Create collector
 
     Args:
         collector_type: Collector type
         storage: Storage instance
+        site_state: Run-scoped site state cache shared by the collectors
 
     Returns:
         BaseInformationCollector: Collector instance
     """
     if collector_type == "email":
-        return EmailCollector(storage)
+        return EmailCollector(storage, site_state)
     elif collector_type == "rss":
-        return RSSReaderCollector(storage)
+        return RSSReaderCollector(storage, site_state)
     # Other types will be added in the future
     # elif collector_type == 'scraper':
     #     return ScraperCollector(storage)
@@ -152,36 +526,163 @@ def _create_collector(collector_type: str, storage: Storage) -> BaseInformationC
         return None
 
 
-def _save_new_items(storage: Storage, new_items: List[InformationItem], stored_items: List[Dict]):
+def _plan_collection(
+    enabled_sites: List[Dict], storage: Storage, site_state: Optional[SiteStateCache] = None
+) -> List[Tuple[Dict, BaseInformationCollector]]:
     """
-    Save new information items
+    Select the sites that are due for collection
 
     Args:
+        enabled_sites: List of enabled site configurations
         storage: Storage instance
-        new_items: List of new information items
-        stored_items: List of existing information items
+        site_state: Run-scoped site state cache shared by the collectors
+
+    Returns:
+        List[Tuple[Dict, BaseInformationCollector]]: (site configuration, collector) pairs in site order
     """
-    # Convert new items to dictionary format
-    new_items_dict = [item.to_dict() for item in new_items]
+    plan = []
+    for site in enabled_sites:
+        site_id = site.get("id", "")
+        site_name = site.get("name", "Unknown")
+        collector_type = site.get("collector_type", "")
+
+        print(f"\n--- Site: {site_name} ({site_id}) ---")
+
+        # Check collection timing
+        collector = _create_collector(collector_type, storage, site_state)
+        if not collector:
+            print(f"Warning: Collector type '{collector_type}' is not implemented")
+            continue
+
+        if not collector.should_collect(site):
+            retry_at = collector.site_state.get_retry_at(site_id)
+            if collector.site_state.get_circuit_state(site_id) == CircuitBreaker.OPEN and retry_at:
+                print(f"Skipped: Circuit open after repeated failures (retry after {retry_at.isoformat()})")
+            else:
+                print("Skipped: Not time to collect yet")
+            continue
+
+        if collector.site_state.get_circuit_state(site_id) == CircuitBreaker.HALF_OPEN:
+            print("Probing a site whose circuit was open")
+
+        plan.append((site, collector))
+
+    return plan
+
+
+def _collect_sites_concurrently(
+    collection_plan: List[Tuple[Dict, BaseInformationCollector]],
+    max_workers: int,
+    site_timeout: float,
+    run_timeout: Optional[float] = None,
+) -> List[Optional[List[InformationItem]]]:
+    """
+    Run collector.collect() for each planned site on a bounded thread pool
+
+    A site that raises or runs longer than site_timeout yields None. Python
+    threads can't be interrupted, so a timed-out collection keeps its worker
+    busy until the collector's own network timeout fires, and its result is
+    discarded. The whole call is bounded by run_timeout, measured from
+    submission: sites still queued at the deadline, or queued behind workers
+    that are all stuck on timed-out collections, are cancelled without starting.
 
-    # Merge with existing items
-    all_items = stored_items + new_items_dict
+    Args:
+        collection_plan: (site configuration, collector) pairs
+        max_workers: Maximum number of concurrent collections
+        site_timeout: Per-site timeout in seconds, measured from when the site starts collecting
+        run_timeout: Deadline for the whole call in seconds, measured from submission
+            (default: site_timeout for every max_workers sites)
+
+    Returns:
+        List[Optional[List[InformationItem]]]: Collected items per site, in the same order as collection_plan
+    """
+    results: List[Optional[List[InformationItem]]] = [None] * len(collection_plan)
+    if not collection_plan:
+        return results
+
+    max_workers = max(1, max_workers)
+    if run_timeout is None:
+        run_timeout = site_timeout * math.ceil(len(collection_plan) / max_workers)
+    deadline = time.monotonic() + run_timeout
 
-    # Keep only the latest 1000 items (simple implementation)
-    if len(all_items) > 1000:
-        all_items = sorted(all_items, key=lambda x: x.get("scraped_at", ""), reverse=True)[:1000]
+    started_at: Dict[int, float] = {}
+    timed_out = []
 
-    storage.save_information_items(all_items)
+    def run(index: int, site: Dict, collector: BaseInformationCollector) -> List[InformationItem]:
+        started_at[index] = time.monotonic()
+        return collector.collect(site)
 
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector")
+    futures = {executor.submit(run, i, site, collector): i for i, (site, collector) in enumerate(collection_plan)}
+    pending = set(futures)
 
-def _deliver_new_items(new_items: List[InformationItem], user_manager: UserManager, line_notifier: LineNotifier):
+    try:
+        while pending:
+            wait_seconds = max(0.0, min(1.0, site_timeout, deadline - time.monotonic()))
+            done, pending = wait(pending, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = futures[future]
+                site_id = collection_plan[index][0].get("id", "")
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"❌ Error: Failed to collect information ({site_id}) - {e}")
+                    traceback.print_exc()
+
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                if index in started_at and now - started_at[index] > site_timeout:
+                    site_id = collection_plan[index][0].get("id", "")
+                    print(f"❌ Error: Collection timed out after {site_timeout:.0f}s ({site_id})")
+                    pending.discard(future)
+                    timed_out.append(future)
+
+            # Queued sites can't start in time once the deadline passed or every worker is stuck
+            stuck_workers = sum(1 for future in timed_out if not future.done())
+            if pending and (now >= deadline or stuck_workers >= max_workers):
+                for future in pending:
+                    site_id = collection_plan[futures[future]][0].get("id", "")
+                    if future.cancel():
+                        print(f"❌ Error: Collection cancelled before it started ({site_id})")
+                    else:
+                        print(f"❌ Error: Collection timed out at the {run_timeout:.0f}s run deadline ({site_id})")
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def _save_new_items(storage: Storage, new_items: List[InformationItem]) -> bool:
     """
-    Deliver new information
+    Save new information items
+
+    Only the new items are appended; the storage backend applies the
+    retention window (latest ITEM_RETENTION_MAX_ITEMS items) on its own.
+
+    Args:
+        storage: Storage instance
+        new_items: List of new information items
+
+    Returns:
+        bool: True if save succeeded, False otherwise
+    """
+    return storage.append_information_items([item.to_dict() for item in new_items])
+
+
+def _enqueue_new_items(new_items: List[InformationItem], user_manager: UserManager, outbox: DeliveryOutbox):
+    """
+    Write delivery jobs for new information to the outbox
+
+    Each category message is formatted once and queued as multicast jobs of
+    up to 500 recipients.
 
     Args:
         new_items: List of new information items
         user_manager: UserManager instance
-        line_notifier: LineNotifier instance
+        outbox: DeliveryOutbox instance
     """
     # Group by category
     items_by_category: dict[str, list[InformationItem]] = {}
@@ -191,7 +692,7 @@ def _deliver_new_items(new_items: List[InformationItem], user_manager: UserManag
             items_by_category[category] = []
         items_by_category[category].append(item)
 
-    # Deliver by category
+    # Queue by category
     for category, items in items_by_category.items():
         # Get users subscribed to this category
         user_ids = user_manager.get_subscribed_users(category)
@@ -200,19 +701,13 @@ def _deliver_new_items(new_items: List[InformationItem], user_manager: UserManag
             print(f"No users subscribed to category '{category}'")
             continue
 
-        print(f"Category '{category}': Delivering to {len(user_ids)} users")
-
-        # Deliver to each user
-        for user_id in user_ids:
-            try:
-                success = line_notifier.send_information_items(user_id, [item.to_dict() for item in items])
-                if success:
-                    print(f"✓ Delivery successful: {user_id[:10]}...")
-                else:
-                    print(f"❌ Delivery failed: {user_id[:10]}...")
-            except Exception as e:
-                print(f"❌ Delivery error: {user_id[:10]}... - {e}")
+        message = LineNotifier.format_information_message([item.to_dict() for item in items])
+        dedup_key = f"{category}|" + "|".join(sorted(item.url for item in items))
+        added = outbox.enqueue_multicast(category, user_ids, message, dedup_key)
+        print(f"Category '{category}': Queued {added} delivery jobs for {len(user_ids)} users")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Collect information and deliver it to LINE")
+    parser.add_argument("--daemon", action="store_true", help="keep running and collect each site when it is due")
+    main(daemon=parser.parse_args().daemon)
@@ -0,0 +1,407 @@
+"""Next-due collection scheduling module"""
+
+import heapq
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Collection interval used when a site does not configure check_interval_minutes
+DEFAULT_INTERVAL_MINUTES = 60
+
+# Number of recent per-check new item counts kept in a site's schedule
+SCHEDULE_HISTORY_SIZE = 10
+
+# Maximum length of the last error message kept in a site's health
+HEALTH_ERROR_MAX_LENGTH = 500
+
+
+def configured_interval_minutes(site: Dict) -> float:
+    """
+    Get the interval configured for a site
+
+    Args:
+        site: Site configuration
+
+    Returns:
+        float: check_interval_minutes (DEFAULT_INTERVAL_MINUTES if not set)
+    """
+    return float(site.get("collector_config", {}).get("check_interval_minutes", DEFAULT_INTERVAL_MINUTES))
+
+
+class AdaptiveIntervalPolicy:
+    """
+    Chooses each site's polling interval from its observed rate of new items
+
+    The rate (new items per hour) is an exponentially weighted moving
+    average whose older observations lose half their weight every
+    half_life_hours; the interval is the time expected to produce
+    target_new_items new items, clamped to the site's bounds. Intervals
+    tighten immediately when new items appear but at most double per check,
+    so a quiet site drifts to the upper bound gradually.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_minutes: float = 15,
+        max_minutes: float = 1440,
+        half_life_hours: float = 6.0,
+        target_new_items: float = 1.0,
+    ):
+        """
+        Initialize
+
+        Args:
+            enabled: Use adaptive intervals (False always uses check_interval_minutes)
+            min_minutes: Default lower bound (collector_config.min_check_interval_minutes overrides)
+            max_minutes: Default upper bound (collector_config.max_check_interval_minutes overrides)
+            half_life_hours: Time after which an observation counts half as much in the moving average
+            target_new_items: Expected new items per check the interval aims for
+        """
+        self.enabled = enabled
+        self.min_minutes = min_minutes
+        self.max_minutes = max_minutes
+        self.half_life_hours = half_life_hours
+        self.target_new_items = target_new_items
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveIntervalPolicy":
+        """
+        Create a policy from COLLECT_ADAPTIVE_INTERVALS, COLLECT_MIN_INTERVAL_MINUTES
+        and COLLECT_MAX_INTERVAL_MINUTES
+
+        Adaptive intervals are opt-in, so upgrading keeps every site on its
+        configured check_interval_minutes until COLLECT_ADAPTIVE_INTERVALS=true.
+
+        Returns:
+            AdaptiveIntervalPolicy: Configured policy
+        """
+        return cls(
+            enabled=os.getenv("COLLECT_ADAPTIVE_INTERVALS", "false").lower() == "true",
+            min_minutes=float(os.getenv("COLLECT_MIN_INTERVAL_MINUTES", "15")),
+            max_minutes=float(os.getenv("COLLECT_MAX_INTERVAL_MINUTES", "1440")),
+        )
+
+    def bounds(self, site: Dict) -> Tuple[float, float]:
+        """
+        Get the interval bounds of a site
+
+        Args:
+            site: Site configuration
+
+        Returns:
+            Tuple[float, float]: (lower bound, upper bound) in minutes
+        """
+        config = site.get("collector_config", {})
+        low = float(config.get("min_check_interval_minutes", self.min_minutes))
+        high = float(config.get("max_check_interval_minutes", self.max_minutes))
+        return low, max(low, high)
+
+    def interval_minutes(self, site: Dict) -> float:
+        """
+        Get the interval currently chosen for a site
+
+        Args:
+            site: Site configuration (including its persisted schedule)
+
+        Returns:
+            float: Interval in minutes
+        """
+        configured = configured_interval_minutes(site)
+        if not self.enabled:
+            return configured
+
+        chosen = (site.get("schedule") or {}).get("interval_minutes")
+        low, high = self.bounds(site)
+        return min(max(float(chosen if chosen is not None else configured), low), high)
+
+    def update(self, site: Dict, new_item_count: int, now: Optional[datetime] = None) -> Dict:
+        """
+        Record a successful check and choose the next interval
+
+        Args:
+            site: Site configuration (including its persisted schedule)
+            new_item_count: Number of new items found by the check
+            now: Check time (defaults to the current time)
+
+        Returns:
+            Dict: New schedule (interval_minutes, new_items_per_hour, last_checked_at, recent_new_counts)
+        """
+        now = now or datetime.now()
+        schedule = site.get("schedule") or {}
+
+        try:
+            last_checked = datetime.fromisoformat(schedule["last_checked_at"])
+            elapsed_hours = (now - last_checked).total_seconds() / 3600
+        except (KeyError, TypeError, ValueError):
+            elapsed_hours = configured_interval_minutes(site) / 60
+        elapsed_hours = max(elapsed_hours, 1 / 60)
+
+        observed_rate = new_item_count / elapsed_hours
+        previous_rate = schedule.get("new_items_per_hour")
+        if previous_rate is None:
+            rate = observed_rate
+        else:
+            weight = 1 - 0.5 ** (elapsed_hours / self.half_life_hours)
+            rate = weight * observed_rate + (1 - weight) * previous_rate
+
+        low, high = self.bounds(site)
+        interval = high if rate <= 0 else min(max(60 * self.target_new_items / rate, low), high)
+        if self.enabled:
+            interval = min(interval, 2 * self.interval_minutes(site))
+
+        return {
+            "interval_minutes": round(interval, 1),
+            "new_items_per_hour": round(rate, 6),
+            "last_checked_at": now.isoformat(),
+            "recent_new_counts": (schedule.get("recent_new_counts", []) + [new_item_count])[-SCHEDULE_HISTORY_SIZE:],
+        }
+
+
+class CircuitBreaker:
+    """
+    Backs off sites whose collections keep failing
+
+    A site's health counts its consecutive failed collections. Once that
+    reaches failure_threshold the circuit opens: the site is not collected
+    until open_until, and every further failure doubles the wait (starting
+    at base_backoff_minutes, capped at max_backoff_minutes). When open_until
+    passes the circuit is half-open and a single probe collection decides
+    whether it closes again or reopens for longer.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, base_backoff_minutes: float = 60, max_backoff_minutes: float = 10080):
+        """
+        Initialize
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            base_backoff_minutes: Wait after the circuit first opens
+            max_backoff_minutes: Upper bound of the wait
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff_minutes = base_backoff_minutes
+        self.max_backoff_minutes = max(base_backoff_minutes, max_backoff_minutes)
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """
+        Create a circuit breaker from COLLECT_CIRCUIT_FAILURE_THRESHOLD,
+        COLLECT_CIRCUIT_BASE_BACKOFF_MINUTES and COLLECT_CIRCUIT_MAX_BACKOFF_MINUTES
+
+        Returns:
+            CircuitBreaker: Configured circuit breaker
+        """
+        return cls(
+            failure_threshold=int(os.getenv("COLLECT_CIRCUIT_FAILURE_THRESHOLD", "3")),
+            base_backoff_minutes=float(os.getenv("COLLECT_CIRCUIT_BASE_BACKOFF_MINUTES", "60")),
+            max_backoff_minutes=float(os.getenv("COLLECT_CIRCUIT_MAX_BACKOFF_MINUTES", "10080")),
+        )
+
+    def backoff_minutes(self, consecutive_failures: int) -> float:
+        """
+        Get the wait after a given number of consecutive failures
+
+        Args:
+            consecutive_failures: Consecutive failed collections
+
+        Returns:
+            float: Wait in minutes (0 while below the threshold)
+        """
+        if consecutive_failures < self.failure_threshold:
+            return 0.0
+        exponent = min(consecutive_failures - self.failure_threshold, 32)
+        return min(self.base_backoff_minutes * 2**exponent, self.max_backoff_minutes)
+
+    def record_failure(self, health: Optional[Dict], error: str, now: Optional[datetime] = None) -> Dict:
+        """
+        Record a failed collection
+
+        Args:
+            health: Current health of the site (None if it has never failed)
+            error: Error message
+            now: Failure time (defaults to the current time)
+
+        Returns:
+            Dict: New health (consecutive_failures, first_failure_at, last_failure_at, last_error, open_until)
+        """
+        now = now or datetime.now()
+        health = health or {}
+        failures = int(health.get("consecutive_failures", 0)) + 1
+        backoff = self.backoff_minutes(failures)
+
+        return {
+            "consecutive_failures": failures,
+            "first_failure_at": health.get("first_failure_at") or now.isoformat(),
+            "last_failure_at": now.isoformat(),
+            "last_error": error[:HEALTH_ERROR_MAX_LENGTH],
+            "open_until": (now + timedelta(minutes=backoff)).isoformat() if backoff else None,
+        }
+
+    @staticmethod
+    def open_until(health: Optional[Dict]) -> Optional[datetime]:
+        """
+        Get the time until which a site's circuit is open
+
+        Args:
+            health: Health of the site
+
+        Returns:
+            datetime: End of the open period, or None if the circuit is closed
+        """
+        open_until = (health or {}).get("open_until")
+        try:
+            return datetime.fromisoformat(open_until) if open_until else None
+        except (ValueError, TypeError):
+            return None
+
+    def state(self, health: Optional[Dict], now: Optional[datetime] = None) -> str:
+        """
+        Get the circuit state of a site
+
+        Args:
+            health: Health of the site
+            now: Current time (defaults to the current time)
+
+        Returns:
+            str: CLOSED, OPEN (not collected until open_until) or HALF_OPEN (next collection is a probe)
+        """
+        open_until = self.open_until(health)
+        if open_until is None:
+            return self.CLOSED
+        return self.OPEN if (now or datetime.now()) < open_until else self.HALF_OPEN
+
+
+class CollectionScheduler:
+    """
+    Min-heap of sites ordered by the time they are next due for collection
+
+    Heap entries are never removed in place; rescheduling or dropping a site
+    just updates its due time, and stale entries are skipped when popped.
+    """
+
+    def __init__(
+        self, clock: Callable[[], float] = time.time, interval_minutes: Optional[Callable[[Dict], Optional[float]]] = None
+    ):
+        """
+        Initialize
+
+        Args:
+            clock: Time function returning epoch seconds (replaceable in tests)
+            interval_minutes: Function returning a site's current interval (defaults to check_interval_minutes)
+        """
+        self.clock = clock
+        self.interval_minutes = interval_minutes
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._sites: Dict[str, Dict] = {}
+
+    def interval_seconds(self, site: Dict) -> float:
+        """
+        Get the collection interval of a site
+
+        Args:
+            site: Site configuration
+
+        Returns:
+            float: Interval in seconds
+        """
+        minutes = self.interval_minutes(site) if self.interval_minutes else None
+        if minutes is None:
+            minutes = configured_interval_minutes(site)
+        return max(float(minutes), 1.0) * 60
+
+    def sync(
+        self,
+        sites: List[Dict],
+        last_collected: Callable[[str], Optional[datetime]],
+        not_before: Optional[Callable[[str], Optional[datetime]]] = None,
+    ):
+        """
+        Replace the scheduled sites with the given (enabled) site configurations
+
+        Sites already scheduled keep their due time; new sites are due one
+        interval after their last collection, or immediately if never collected.
+
+        Args:
+            sites: Enabled site configurations
+            last_collected: Function returning the last collection time of a site ID
+            not_before: Function returning the earliest time a site ID may be collected (e.g. an open circuit)
+        """
+        now = self.clock()
+        self._sites = {site["id"]: site for site in sites if site.get("id")}
+
+        due = {}
+        for site_id, site in self._sites.items():
+            if site_id in self._due:
+                due[site_id] = self._due[site_id]
+                continue
+            last = last_collected(site_id)
+            due_at = last.timestamp() + self.interval_seconds(site) if last else now
+            earliest = not_before(site_id) if not_before else None
+            due[site_id] = max(due_at, earliest.timestamp()) if earliest else due_at
+
+        self._due = due
+        self._heap = [(due_at, site_id) for site_id, due_at in due.items()]
+        heapq.heapify(self._heap)
+
+    def pop_due(self) -> List[Dict]:
+        """
+        Remove and return the sites whose due time has passed
+
+        Returns:
+            List[Dict]: Due site configurations, earliest first
+        """
+        now = self.clock()
+        due_sites = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, site_id = heapq.heappop(self._heap)
+            if self._due.get(site_id) != due_at:
+                continue
+            del self._due[site_id]
+            due_sites.append(self._sites[site_id])
+        return due_sites
+
+    def reschedule(self, site: Dict, not_before: Optional[datetime] = None):
+        """
+        Schedule a site one interval from now
+
+        Args:
+            site: Site configuration
+            not_before: Earliest time the site may be collected again (e.g. the end of an open circuit)
+        """
+        site_id = site.get("id")
+        if site_id not in self._sites:
+            return
+        due_at = self.clock() + self.interval_seconds(self._sites[site_id])
+        if not_before:
+            due_at = max(due_at, not_before.timestamp())
+        self._due[site_id] = due_at
+        heapq.heappush(self._heap, (due_at, site_id))
+
+    def seconds_until_next(self) -> Optional[float]:
+        """
+        Get the time until the next site is due
+
+        Returns:
+            float: Seconds until the next deadline (0 if one has passed), or None if nothing is scheduled
+        """
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - self.clock(), 0.0)
+
+    def next_due(self) -> Dict[str, datetime]:
+        """
+        Get the next due time of every scheduled site
+
+        Returns:
+            Dict[str, datetime]: Site ID -> next due time
+        """
+        return {site_id: datetime.fromtimestamp(due_at) for site_id, due_at in self._due.items()}
@@ -2,16 +2,20 @@
 
 import sys
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from src.storage import Storage  # noqa: E402
+from src.collect_scheduler import CircuitBreaker  # noqa: E402
+from src.collectors.host_limiter import HostLimiter, get_host_limiter  # noqa: E402
+from src.collectors.site_state import SiteStateCache  # noqa: E402
+from src.storage import Storage, create_storage  # noqa: E402
 
 
 class InformationItem:
@@ -75,14 +79,58 @@ class InformationItem:
 class BaseInformationCollector(ABC):
     """情報収集の統一インターフェース"""
 
-    def __init__(self, storage: Optional[Storage] = None):
+    def __init__(self, storage: Optional[Storage] = None, site_state: Optional[SiteStateCache] = None):
         """
         初期化
 
         Args:
             storage: Storageインスタンス
+            site_state: 実行全体で共有するサイト状態キャッシュ（指定時は更新を溜めて呼び出し側が flush する。
+                省略時は更新のたびに保存する）
         """
-        self.storage = storage or Storage()
+        self.storage = storage or create_storage()
+        self._site_state = site_state
+        self._owns_site_state = site_state is None
+        # 次回の収集に引き継ぐ状態（フィードのETagなど）。site_id -> 状態
+        self.pending_site_state: Dict[str, Dict] = {}
+        # ホストごとの同時接続数・リクエスト間隔の制限（全コレクターで共有）
+        self.host_limiter: HostLimiter = get_host_limiter()
+        # 直近の collect() が失敗した場合のエラー内容（未更新・新着なしは失敗ではないのでNone）
+        self.last_error: Optional[str] = None
+
+    @contextmanager
+    def host_slot(self, url_or_host: str) -> Iterator[None]:
+        """
+        リクエスト先ホストの枠を確保してから処理を実行
+
+        Args:
+            url_or_host: リクエスト先のURL、またはホスト名
+        """
+        with self.host_limiter.limit(url_or_host):
+            yield
+
+    @property
+    def site_state(self) -> SiteStateCache:
+        """サイト状態キャッシュ（未指定の場合は初回アクセス時に作成）"""
+        if self._site_state is None:
+            self._site_state = SiteStateCache(self.storage)
+        return self._site_state
+
+    def _commit_site_state(self, recorded: bool) -> bool:
+        """
+        サイト状態の記録結果を確定（共有キャッシュでない場合はすぐに保存）
+
+        Args:
+            recorded: キャッシュへの記録が成功したかどうか
+
+        Returns:
+            bool: 記録（と保存）が成功したかどうか
+        """
+        if not recorded:
+            return False
+        if self._owns_site_state:
+            return self.site_state.flush()
+        return True
 
     @abstractmethod
     def collect(self, site_config: Dict) -> List[InformationItem]:
@@ -97,6 +145,31 @@ class BaseInformationCollector(ABC):
         """
         pass
 
+    def prepare_new_items(self, site_config: Dict, items: List[InformationItem]):
+        """
+        新着と判定されたアイテムを仕上げる（重複除外の後に呼ばれる。AI要約の生成など）
+
+        Args:
+            site_config: サイト設定
+            items: 新着の情報アイテムのリスト（その場で更新する）
+        """
+        pass
+
+    def commit_collection(self, site_id: str) -> bool:
+        """
+        新着の保存・配信登録が終わった後に収集の進捗を確定する（フィードのETag、メールの取得位置など）
+
+        収集結果が破棄された場合（タイムアウトや保存の失敗）は呼ばれないため、
+        次回の収集で同じ内容をもう一度取得する。
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            bool: 確定が成功したかどうか
+        """
+        return self.save_site_state(site_id)
+
     def get_last_collected_time(self, site_id: str) -> Optional[datetime]:
         """
         最後に収集した時刻を取得
@@ -107,46 +180,108 @@ class BaseInformationCollector(ABC):
         Returns:
             datetime: 最後に収集した時刻。未収集の場合はNone
         """
-        sites_data = self.storage.load_sites()
-        if not sites_data:
-            return None
+        return self.site_state.get_last_collected_time(site_id)
+
+    def mark_as_collected(self, site_id: str, items: List[InformationItem]) -> bool:
+        """
+        収集完了を記録
+
+        Args:
+            site_id: サイトID
+            items: 収集した情報アイテムのリスト
+
+        Returns:
+            bool: 記録が成功したかどうか
+        """
+        # 最終収集時刻・統計情報を更新（収集状態は commit_collection で確定する）
+        return self._commit_site_state(self.site_state.record_collection(site_id, len(items)))
 
-        sites = sites_data.get("sites", [])
-        site = next((s for s in sites if s.get("id") == site_id), None)
+    def record_check(self, site_id: str, new_item_count: int) -> Optional[float]:
+        """
+        収集結果（新着件数）を記録して次の収集間隔を決める
+
+        Args:
+            site_id: サイトID
+            new_item_count: 新着アイテム数
 
-        if not site or not site.get("last_collected_at"):
+        Returns:
+            float: 次の収集間隔（分）。記録に失敗した場合はNone
+        """
+        interval = self.site_state.record_check(site_id, new_item_count)
+        if interval is None or not self._commit_site_state(True):
             return None
+        return interval
+
+    def record_failure(self, site_id: str, error: str) -> Optional[Dict]:
+        """
+        収集の失敗を記録（連続失敗が続くとサーキットが開き、次回の収集が後ろ倒しになる）
+
+        Args:
+            site_id: サイトID
+            error: エラーメッセージ
 
-        try:
-            return datetime.fromisoformat(site["last_collected_at"])
-        except (ValueError, TypeError):
+        Returns:
+            Dict: 更新後の失敗状況。記録に失敗した場合はNone
+        """
+        health = self.site_state.record_failure(site_id, error)
+        if health is None or not self._commit_site_state(True):
             return None
+        return health
 
-    def mark_as_collected(self, site_id: str, items: List[InformationItem]) -> bool:
+    def record_success(self, site_id: str) -> bool:
         """
-        収集完了を記録
+        収集の成功を記録（失敗状況をリセット）
 
         Args:
             site_id: サイトID
-            items: 収集した情報アイテムのリスト
 
         Returns:
             bool: 記録が成功したかどうか
         """
-        site = self.storage.load_site(site_id)
-        if not site:
-            return False
+        return self._commit_site_state(self.site_state.record_success(site_id))
+
+    def fetch_attempts(self, site_id: str, max_attempts: int) -> int:
+        """
+        1回の収集での取得試行回数を決める
+
+        サーキットが開いた（連続失敗がしきい値に達した）サイトは収集ごとのリトライ
+        （とその待ち時間）を行わず、再試行はサーキットブレーカーのバックオフに任せる。
+        しきい値に達していない一時的な失敗では、通常どおりリトライする。
+
+        Args:
+            site_id: サイトID
+            max_attempts: 正常なサイトの最大試行回数
 
-        # 最終収集時刻を更新
-        site["last_collected_at"] = datetime.now().isoformat()
+        Returns:
+            int: 試行回数
+        """
+        return max_attempts if self.site_state.get_circuit_state(site_id) == CircuitBreaker.CLOSED else 1
 
-        # 統計情報を更新
-        if "stats" not in site:
-            site["stats"] = {}
-        site["stats"]["total_collected"] = site["stats"].get("total_collected", 0) + len(items)
-        site["stats"]["last_collected_count"] = len(items)
+    def update_site_state(self, site_id: str, **state):
+        """
+        次回の収集に引き継ぐ状態を記録（commit_collection または save_site_state で保存される）
 
-        return self.storage.save_site(site)
+        Args:
+            site_id: サイトID
+            **state: 保存する状態（サイト設定の collector_state にマージされる）
+        """
+        self.pending_site_state.setdefault(site_id, {}).update(state)
+
+    def save_site_state(self, site_id: str) -> bool:
+        """
+        記録済みの収集状態をサイト設定に保存
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            bool: 保存が成功したかどうか（保存する状態がない場合もTrue）
+        """
+        state = self.pending_site_state.pop(site_id, None)
+        if not state:
+            return True
+
+        return self._commit_site_state(self.site_state.update_state(site_id, state))
 
     def should_collect(self, site_config: Dict) -> bool:
         """
@@ -161,13 +296,21 @@ class BaseInformationCollector(ABC):
         if not site_config.get("enabled", False):
             return False
 
-        check_interval = site_config.get("collector_config", {}).get("check_interval_minutes", 60)
-        last_collected = self.get_last_collected_time(site_config.get("id", ""))
+        site_id = site_config.get("id", "")
+
+        # 失敗が続いてサーキットが開いている間は収集しない（期限後の1回は回復確認として収集する）
+        if self.site_state.get_circuit_state(site_id) == CircuitBreaker.OPEN:
+            return False
+
+        last_checked = self.site_state.get_last_checked_time(site_id)
 
-        if last_collected is None:
+        if last_checked is None:
             # 未収集の場合は収集する
             return True
 
-        # 収集間隔をチェック
-        elapsed_minutes = (datetime.now() - last_collected).total_seconds() / 60
+        # 収集間隔をチェック（適応的な収集間隔が有効な場合は新着の頻度に応じた間隔）
+        check_interval = self.site_state.get_interval_minutes(site_id)
+        if check_interval is None:
+            check_interval = self.site_state.policy.interval_minutes(site_config)
+        elapsed_minutes = (datetime.now() - last_checked).total_seconds() / 60
         return elapsed_minutes >= check_interval
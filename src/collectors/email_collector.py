@@ -1,6 +1,5 @@
 """メールから情報を収集するモジュール"""
 
-import email
 import imaplib
 import os
 import re
@@ -9,9 +8,7 @@ from datetime import datetime
 from email.header import decode_header
 from email.message import Message
 from pathlib import Path
-from typing import Dict, List, Optional
-
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Tuple
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent.parent.parent
@@ -19,22 +16,43 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from src.collectors.base import BaseInformationCollector, InformationItem  # noqa: E402
+from src.collectors.email_document import EmailDocument  # noqa: E402
+from src.collectors.email_sync_state import get_email_sync_state  # noqa: E402
+from src.collectors.imap_fetch import fetch_bodies, fetch_headers  # noqa: E402
+from src.collectors.imap_pool import ImapAccountState, get_imap_pool  # noqa: E402
+from src.collectors.site_state import SiteStateCache  # noqa: E402
+from src.collectors.summary_cache import get_summary_cache  # noqa: E402
+from src.http_client import get_timeout  # noqa: E402
 from src.storage import Storage  # noqa: E402
 
+# 受信するメールボックス
+MAILBOX = "INBOX"
+
+# 同じアカウントの取得結果を再検索せずに使い回す秒数（同じ収集サイクルのサイトを1回の検索にまとめる）
+SYNC_REUSE_SECONDS = 60
+
 
 class EmailCollector(BaseInformationCollector):
     """メールから情報を収集するクラス"""
 
-    def __init__(self, storage: Optional[Storage] = None):
+    def __init__(self, storage: Optional[Storage] = None, site_state: Optional[SiteStateCache] = None):
         """
         初期化
 
         Args:
             storage: Storageインスタンス
+            site_state: 実行全体で共有するサイト状態キャッシュ
         """
-        super().__init__(storage)
-        self.processed_message_ids = set()
-        self._load_processed_ids()
+        super().__init__(storage, site_state)
+        # UIDチェックポイントと処理済みMessage-ID（同じStorageを使うコレクター間で共有）
+        self.sync_state = get_email_sync_state(self.storage)
+        # 新着の保存後に確定する取得位置と処理済みMessage-ID（サイトID -> 取得結果）
+        self.pending_sync: Dict[str, Dict] = {}
+        # アカウントごとのIMAP接続と取得済みメール（全コレクターで共有）
+        self.imap_pool = get_imap_pool()
+        # AI要約のキャッシュと、重複除外の後に要約するアイテムの本文（id(item) -> (item, 本文テキスト)）
+        self.summary_cache = get_summary_cache(self.storage)
+        self._summary_sources: Dict[int, Tuple[InformationItem, str]] = {}
 
     def collect(self, site_config: Dict) -> List[InformationItem]:
         """
@@ -46,11 +64,10 @@ class EmailCollector(BaseInformationCollector):
         Returns:
             List[InformationItem]: 収集した情報アイテムのリスト
         """
+        self.last_error = None
         collector_config = site_config.get("collector_config", {})
         email_account_id = collector_config.get("email_account_id")
         subscription_email = collector_config.get("subscription_email")
-        sender_email = collector_config.get("sender_email")
-        subject_pattern = collector_config.get("subject_pattern", "")
 
         if not email_account_id or not subscription_email:
             print(f"警告: メールアカウント設定が不完全です (site_id: {site_config.get('id')})")
@@ -63,7 +80,7 @@ class EmailCollector(BaseInformationCollector):
             return []
 
         # メールを受信
-        messages = self._fetch_emails(email_account, subscription_email, sender_email, subject_pattern)
+        messages = self._fetch_emails(email_account, site_config)
 
         # 情報アイテムに変換
         items = []
@@ -91,21 +108,22 @@ class EmailCollector(BaseInformationCollector):
         accounts = accounts_data.get("accounts", [])
         return next((acc for acc in accounts if acc.get("id") == account_id), None)
 
-    def _fetch_emails(
-        self,
-        email_account: Dict,
-        subscription_email: str,
-        sender_email: Optional[str] = None,
-        subject_pattern: Optional[str] = None,
-    ) -> List[Message]:
+    def _fetch_emails(self, email_account: Dict, site_config: Dict) -> List[Message]:
         """
         メールを受信
 
+        IMAP接続は同じアカウントのサイト間で共有する。サイトの取得位置
+        （UIDVALIDITY と最後のUID）が保存されていれば、同じアカウントを使う
+        メールサイト全体の条件をまとめた1回の検索で新着を取得し、各サイトの
+        条件（TO/FROM/SUBJECT）にはローカルで振り分ける。取得位置のない
+        サイトの初回は、そのサイトの条件で未読メールを検索する。
+        メールはヘッダーだけを先にまとめて取得して振り分け・重複除外を行い、
+        残ったメールだけ本文パートを取得する（添付ファイルは取得せず、既読にもしない）。
+        取得位置はここでは進めず、新着の保存後に commit_collection で確定する。
+
         Args:
             email_account: メールアカウント情報
-            subscription_email: 購読に使用したメールアドレス（エイリアス含む）
-            sender_email: 送信者メールアドレス（フィルタ用）
-            subject_pattern: 件名パターン（フィルタ用）
+            site_config: サイト設定
 
         Returns:
             List[Message]: メールメッセージのリスト
@@ -115,6 +133,7 @@ class EmailCollector(BaseInformationCollector):
             imap_server = email_account.get("imap_server", "imap.gmail.com")
             imap_port = email_account.get("imap_port", 993)
             username = email_account.get("username")
+            account_id = email_account.get("id") or username or ""
             # パスワードはemail_accounts.jsonまたは環境変数から取得
             # 環境変数GMAIL_APP_PASSWORDが優先される（セキュリティのため）
             password = os.getenv("GMAIL_APP_PASSWORD") or email_account.get("password")
@@ -123,61 +142,286 @@ class EmailCollector(BaseInformationCollector):
                 print("警告: メールアカウントのパスワードが設定されていません")
                 return []
 
-            mail = imaplib.IMAP4_SSL(imap_server, imap_port)
-            mail.login(username, password)
-            mail.select("INBOX")
+            site_id = site_config.get("id", "")
+            filters = self._site_filters(site_config)
+            account = self.imap_pool.account(account_id)
+
+            # アカウントの接続と取得済みメールを排他し、同じIMAPサーバーへの同時接続数・接続間隔を制限
+            with account.lock, self.host_slot(imap_server):
+                with self.imap_pool.session(account_id, imap_server, imap_port, username, password, get_timeout()) as mail:
+                    uidvalidity, uidnext = self._mailbox_status(mail, MAILBOX)
+                    mail.select(MAILBOX)
+                    account.reset_messages(uidvalidity)
+
+                    last_uid = self.sync_state.get_last_uid(account_id, MAILBOX, uidvalidity, site_id) if uidvalidity else None
+                    group = []
+                    if last_uid is None:
+                        # 初回はサイトの条件で未読メールを検索
+                        uids = self._search_uids(mail, ["UNSEEN"] + self._search_criteria(filters))
+                        candidates, failed_uids = fetch_headers(mail, uids)
+                        checkpoint = min(failed_uids) - 1 if failed_uids else max([(uidnext or 1) - 1] + uids)
+                    else:
+                        group = self._account_sites(account_id, site_config)
+                        self._sync_account(mail, account, account_id, uidvalidity, uidnext, last_uid, group)
+                        candidates = {
+                            uid: msg for uid, msg in account.messages.items() if uid > last_uid and self._matches(msg, filters)
+                        }
+                        checkpoint = max(last_uid, account.synced_through)
+
+                    # 過去の実行で処理済みのメールをヘッダーの段階で除外
+                    selected = {}
+                    selected_ids = set()
+                    for uid in sorted(candidates):
+                        message_id = candidates[uid].get("Message-ID", "")
+                        if message_id and (message_id in selected_ids or self.sync_state.is_processed(message_id)):
+                            continue
+                        selected[uid] = candidates[uid]
+                        selected_ids.add(message_id)
+
+                    # 残ったメールの本文パートだけを取得（本文を取得できなかったメールは次回もう一度取得する）
+                    bodies, body_failed_uids = fetch_bodies(mail, selected)
+                    if body_failed_uids:
+                        checkpoint = min(checkpoint, min(body_failed_uids) - 1)
+                    messages = [bodies[uid] for uid in sorted(bodies)]
+
+            # 取得位置と処理済みMessage-IDは、新着の保存・配信登録の後に commit_collection で確定する
+            self.pending_sync[site_id] = {
+                "account_id": account_id,
+                "uidvalidity": uidvalidity,
+                "checkpoint": checkpoint,
+                "message_ids": [msg.get("Message-ID", "") for msg in messages],
+                "group": [s.get("id", "") for s in group],
+            }
+
+            print(f"✓ {len(messages)}件の新着メールを取得しました")
+            return messages
+
+        except Exception as e:
+            print(f"エラー: メール受信に失敗しました - {e}")
+            self.last_error = f"メール受信に失敗しました: {e}"
+            return []
+
+    def commit_collection(self, site_id: str) -> bool:
+        """
+        取得位置を進め、取得したメールのMessage-IDを処理済みとして保存
+
+        同じアカウントのすべてのサイトが取得済みになったメールは共有の取得結果から破棄する。
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            bool: 保存が成功したかどうか（確定する取得結果がない場合もTrue）
+        """
+        pending = self.pending_sync.pop(site_id, None)
+        if not pending:
+            return True
+
+        account_id = pending["account_id"]
+        uidvalidity = pending["uidvalidity"]
+        if uidvalidity:
+            self.sync_state.advance(account_id, MAILBOX, uidvalidity, site_id, pending["checkpoint"])
+            if pending["group"]:
+                cursors = [self.sync_state.get_last_uid(account_id, MAILBOX, uidvalidity, sid) for sid in pending["group"]]
+                account = self.imap_pool.account(account_id)
+                with account.lock:
+                    account.prune(min(c or 0 for c in cursors))
+
+        self.sync_state.mark_processed(pending["message_ids"])
+        return self.sync_state.flush()
+
+    def _sync_account(
+        self,
+        mail: imaplib.IMAP4,
+        account: ImapAccountState,
+        account_id: str,
+        uidvalidity: int,
+        uidnext: Optional[int],
+        last_uid: int,
+        group: List[Dict],
+    ):
+        """
+        アカウントの取得済みメールを最新にする（同じアカウントのサイト全体で1回の検索）
+
+        Args:
+            mail: ログイン済みのIMAP接続
+            account: アカウントの共有状態
+            account_id: メールアカウントID
+            uidvalidity: 現在のUIDVALIDITY
+            uidnext: 現在のUIDNEXT
+            last_uid: 収集するサイトの取得位置
+            group: 同じアカウントを使うメールサイトの設定
+        """
+        now = self.imap_pool.clock()
+        covered = account.low_uid is not None and last_uid >= account.low_uid
+        if covered and now - account.synced_at < SYNC_REUSE_SECONDS:
+            return
+
+        if covered:
+            low = account.synced_through
+        else:
+            cursors = [self.sync_state.get_last_uid(account_id, MAILBOX, uidvalidity, s.get("id", "")) for s in group]
+            low = min([last_uid] + [c for c in cursors if c is not None])
+
+        criteria = ["UID", f"{low + 1}:*"] + self._combined_criteria([self._site_filters(s) for s in group])
+        # "UID n:*" は該当がなくても最後のメールを返すため、範囲外と取得済みのUIDを除外する
+        uids = [uid for uid in self._search_uids(mail, criteria) if uid > low and uid not in account.messages]
+        fetched, failed_uids = fetch_headers(mail, uids)
+        account.messages.update(fetched)
+
+        # 取得に失敗したメールは次回もう一度取得する
+        account.synced_through = min(failed_uids) - 1 if failed_uids else max([low, (uidnext or 1) - 1] + uids)
+        if not covered:
+            account.low_uid = low
+        account.synced_at = now
+
+    def _account_sites(self, account_id: str, site_config: Dict) -> List[Dict]:
+        """
+        同じメールアカウントを使う有効なメールサイトを取得
+
+        Args:
+            account_id: メールアカウントID
+            site_config: 収集中のサイト設定（一覧になくても含める）
 
-            # 検索条件を構築
-            search_criteria = ["UNSEEN"]  # 未読メール
+        Returns:
+            List[Dict]: サイト設定のリスト
+        """
+        sites = [
+            site
+            for site in self.site_state.list_sites()
+            if site.get("enabled", False)
+            and site.get("collector_type") == "email"
+            and site.get("collector_config", {}).get("email_account_id") == account_id
+            and site.get("id") != site_config.get("id")
+        ]
+        return [site_config] + sites
+
+    @staticmethod
+    def _site_filters(site_config: Dict) -> Dict[str, str]:
+        """
+        サイトのメール振り分け条件を取得
 
-            # エイリアスでのフィルタリング（TOフィールド）
-            if subscription_email:
-                search_criteria.append(f'TO "{subscription_email}"')
+        Args:
+            site_config: サイト設定
 
-            # 送信者でのフィルタリング
-            if sender_email:
-                search_criteria.append(f'FROM "{sender_email}"')
+        Returns:
+            Dict[str, str]: to（購読に使用したメールアドレス）, from（送信者）, subject（件名パターン）
+        """
+        collector_config = site_config.get("collector_config", {})
+        return {
+            "to": collector_config.get("subscription_email") or "",
+            "from": collector_config.get("sender_email") or "",
+            "subject": collector_config.get("subject_pattern") or "",
+        }
+
+    @staticmethod
+    def _search_criteria(filters: Dict[str, str]) -> List[str]:
+        """
+        振り分け条件をIMAPの検索条件に変換
 
-            # 件名でのフィルタリング
-            if subject_pattern:
-                search_criteria.append(f'SUBJECT "{subject_pattern}"')
+        Args:
+            filters: 振り分け条件
+
+        Returns:
+            List[str]: 検索条件（すべてを満たす）
+        """
+        criteria = []
+        # エイリアスでのフィルタリング（TOフィールド）
+        if filters.get("to"):
+            criteria.append(f'TO "{filters["to"]}"')
+        # 送信者でのフィルタリング
+        if filters.get("from"):
+            criteria.append(f'FROM "{filters["from"]}"')
+        # 件名でのフィルタリング
+        if filters.get("subject"):
+            criteria.append(f'SUBJECT "{filters["subject"]}"')
+        return criteria
+
+    def _combined_criteria(self, filters_list: List[Dict[str, str]]) -> List[str]:
+        """
+        複数サイトの振り分け条件を OR でまとめた検索条件を作成
 
-            # メールを検索
-            status, message_numbers = mail.search(None, *search_criteria)
+        Args:
+            filters_list: サイトごとの振り分け条件
 
-            if status != "OK":
-                print("警告: メール検索に失敗しました")
-                mail.close()
-                mail.logout()
+        Returns:
+            List[str]: 検索条件（いずれかのサイトの条件を満たす。条件のないサイトがあれば空）
+        """
+        groups = []
+        for filters in filters_list:
+            criteria = self._search_criteria(filters)
+            if not criteria:
                 return []
+            group = criteria[0] if len(criteria) == 1 else f"({' '.join(criteria)})"
+            if group not in groups:
+                groups.append(group)
 
-            messages = []
-            for num in message_numbers[0].split():
-                try:
-                    status, msg_data = mail.fetch(num, "(RFC822)")
-                    if status == "OK":
-                        msg = email.message_from_bytes(msg_data[0][1])
-                        message_id = msg.get("Message-ID", "")
+        expression = groups[-1]
+        for group in reversed(groups[:-1]):
+            expression = f"OR {group} {expression}"
+        return [expression]
 
-                        # 重複チェック
-                        if message_id and message_id in self.processed_message_ids:
-                            continue
+    def _matches(self, msg: Message, filters: Dict[str, str]) -> bool:
+        """
+        メールがサイトの振り分け条件を満たすか判定（IMAPの検索と同じく大文字小文字を区別しない部分一致）
 
-                        messages.append(msg)
-                        self.processed_message_ids.add(message_id)
-                except Exception as e:
-                    print(f"警告: メールの取得に失敗しました: {e}")
-                    continue
+        Args:
+            msg: メールメッセージ
+            filters: 振り分け条件
 
-            mail.close()
-            mail.logout()
+        Returns:
+            bool: 条件を満たす場合True
+        """
+        for key, header in (("to", "To"), ("from", "From"), ("subject", "Subject")):
+            if not filters.get(key):
+                continue
+            try:
+                value = self._decode_header(msg.get(header, ""))
+            except Exception:
+                value = str(msg.get(header, ""))
+            if filters[key].lower() not in value.lower():
+                return False
+        return True
 
-            print(f"✓ {len(messages)}件の新着メールを取得しました")
-            return messages
+    @staticmethod
+    def _search_uids(mail: imaplib.IMAP4, criteria: List[str]) -> List[int]:
+        """
+        メールを検索してUIDを取得
 
-        except Exception as e:
-            print(f"エラー: メール受信に失敗しました - {e}")
-            return []
+        Args:
+            mail: ログイン済みのIMAP接続
+            criteria: 検索条件
+
+        Returns:
+            List[int]: 昇順のUIDのリスト
+        """
+        status, data = mail.uid("SEARCH", None, *criteria)
+        if status != "OK":
+            raise imaplib.IMAP4.error("メール検索に失敗しました")
+        return sorted(int(uid) for uid in (data[0] or b"").split())
+
+    @staticmethod
+    def _mailbox_status(mail: imaplib.IMAP4, mailbox: str) -> Tuple[Optional[int], Optional[int]]:
+        """
+        メールボックスの UIDVALIDITY と UIDNEXT を取得
+
+        Args:
+            mail: ログイン済みのIMAP接続
+            mailbox: メールボックス名
+
+        Returns:
+            Tuple[Optional[int], Optional[int]]: (UIDVALIDITY, UIDNEXT)。取得できない場合はNone
+        """
+        try:
+            status, data = mail.status(mailbox, "(UIDVALIDITY UIDNEXT)")
+        except Exception:
+            return None, None
+        if status != "OK" or not data or not data[0]:
+            return None, None
+
+        response = data[0].decode("utf-8", errors="ignore") if isinstance(data[0], bytes) else str(data[0])
+        values = {key: int(value) for key, value in re.findall(r"(UIDVALIDITY|UIDNEXT) (\d+)", response)}
+        return values.get("UIDVALIDITY"), values.get("UIDNEXT")
 
     def _parse_email_to_item(self, msg: Message, site_config: Dict) -> Optional[InformationItem]:
         """
@@ -198,27 +442,21 @@ class EmailCollector(BaseInformationCollector):
             date_str = msg.get("Date", "")
             published_at = self._parse_email_date(date_str)
 
-            # メール本文を取得
-            body = self._get_email_body(msg)
+            # メール本文を取得（HTMLのパースは1回だけ行い、リンク・タイトル・要約で共有）
+            document = EmailDocument(self._get_email_body(msg))
 
-            # HTMLからリンクとテキストを抽出
-            links = self._extract_links(body)
+            # HTMLからリンクを抽出
+            links = document.links
             main_link = links[0] if links else site_config.get("url", "")
 
             # タイトルを抽出（件名または本文から）
-            title = subject or self._extract_title_from_body(body) or "メール通知"
+            title = subject or document.title or "メール通知"
 
-            # 要約を生成（オプション）
-            summary = None
-            collector_config = site_config.get("collector_config", {})
-            if collector_config.get("summary_enabled", False):
-                summary = self._generate_summary(body, collector_config)
-
-            # コンテンツハッシュを生成
+            # コンテンツハッシュを生成（要約は新着と判定された後に生成するため含めない）
             from src.diff_detector import DiffDetector
 
             detector = DiffDetector()
-            content_hash = detector.generate_content_hash(title, main_link, summary)
+            content_hash = detector.generate_content_hash(title, main_link)
 
             item = InformationItem(
                 title=title,
@@ -227,10 +465,13 @@ class EmailCollector(BaseInformationCollector):
                 site_id=site_config.get("id", ""),
                 site_name=site_config.get("name", ""),
                 published_at=published_at,
-                summary=summary,
                 content_hash=content_hash,
             )
 
+            # 要約する場合は本文テキストを prepare_new_items まで保持（オプション）
+            if site_config.get("collector_config", {}).get("summary_enabled", False):
+                self._summary_sources[id(item)] = (item, document.text)
+
             return item
 
         except Exception as e:
@@ -332,81 +573,29 @@ class EmailCollector(BaseInformationCollector):
 
         return body
 
-    def _extract_links(self, html: str) -> List[str]:
-        """
-        HTMLからリンクを抽出
-
-        Args:
-            html: HTML文字列
-
-        Returns:
-            List[str]: リンクURLのリスト
-        """
-        if not html:
-            return []
-
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            links = []
-
-            # <a>タグからリンクを抽出
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                # 相対URLを絶対URLに変換（必要に応じて）
-                if href.startswith("http"):
-                    links.append(href)
-
-            return links
-        except Exception:
-            # HTMLパースに失敗した場合は正規表現で抽出
-            pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-            links = re.findall(pattern, html)
-            return links[:10]  # 最大10件
-
-    def _extract_title_from_body(self, html: str) -> Optional[str]:
+    def prepare_new_items(self, site_config: Dict, items: List[InformationItem]):
         """
-        メール本文からタイトルを抽出
+        新着と判定されたアイテムだけAI要約を生成（重複したメールは要約しない）
 
         Args:
-            html: HTML文字列
-
-        Returns:
-            str: タイトル
+            site_config: サイト設定
+            items: 新着の情報アイテムのリスト（summary を設定する）
         """
-        if not html:
-            return None
+        collector_config = site_config.get("collector_config", {})
+        for item in items:
+            source = self._summary_sources.get(id(item))
+            if source and source[0] is item:
+                item.summary = self._generate_summary(source[1], collector_config)
 
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-
-            # <h1>タグを探す
-            h1 = soup.find("h1")
-            if h1:
-                return h1.get_text(strip=True)
-
-            # <title>タグを探す
-            title = soup.find("title")
-            if title:
-                return title.get_text(strip=True)
-
-            # 最初の見出しを探す
-            for tag in ["h2", "h3", "strong", "b"]:
-                elem = soup.find(tag)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    if text and len(text) > 10:
-                        return text
+        self._summary_sources.clear()
+        self.summary_cache.flush()
 
-            return None
-        except Exception:
-            return None
-
-    def _generate_summary(self, body: str, collector_config: Dict) -> Optional[str]:
+    def _generate_summary(self, text: str, collector_config: Dict) -> Optional[str]:
         """
-        AI要約を生成
+        AI要約を生成（同じ本文・モデルの要約はキャッシュから返す）
 
         Args:
-            body: メール本文
+            text: メール本文のテキスト
             collector_config: コレクター設定
 
         Returns:
@@ -416,33 +605,22 @@ class EmailCollector(BaseInformationCollector):
         if not summary_enabled:
             return None
 
-        try:
-            import google.generativeai as genai
-
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                print("警告: GEMINI_API_KEYが設定されていません")
-                return None
-
-            genai.configure(api_key=api_key)
-            model_name = collector_config.get("summary_model", "gemini-1.5-flash")
-            model = genai.GenerativeModel(model_name)
-
-            # メール本文をテキストに変換（HTMLタグを除去）
-            soup = BeautifulSoup(body, "html.parser")
-            text_body = soup.get_text(separator=" ", strip=True)
+        model_name = collector_config.get("summary_model", "gemini-1.5-flash")
 
-            # 長すぎる場合は切り詰め
-            if len(text_body) > 10000:
-                text_body = text_body[:10000] + "..."
+        # 長すぎる場合は切り詰め
+        text_body = text if len(text) <= 10000 else text[:10000] + "..."
 
-            prompt = f"""以下のメール内容を3-5行で簡潔に要約してください。重要な情報やリンクを含めてください。
+        cached = self.summary_cache.get(model_name, text_body)
+        if cached is not None:
+            print("✓ AI要約をキャッシュから取得しました")
+            return cached
 
-{text_body}"""
-
-            response = model.generate_content(prompt)
-            summary = response.text.strip()
+        try:
+            summary = self._request_summary(model_name, text_body)
+            if summary is None:
+                return None
 
+            self.summary_cache.put(model_name, text_body, summary)
             print(f"✓ AI要約を生成しました ({len(summary)}文字)")
             return summary
 
@@ -450,28 +628,30 @@ class EmailCollector(BaseInformationCollector):
             print(f"警告: AI要約の生成に失敗しました - {e}")
             return None
 
-    def _load_processed_ids(self):
-        """処理済みメールIDを読み込み"""
-        items_data = self.storage.load_information_items()
-        if items_data and items_data.get("items"):
-            # 既存の情報アイテムからメールIDを抽出（実装は簡略化）
-            pass
-
-    def mark_as_collected(self, site_id: str, items: List[InformationItem]) -> bool:
+    def _request_summary(self, model_name: str, text_body: str) -> Optional[str]:
         """
-        収集完了を記録（メールIDも保存）
+        Gemini APIで要約を生成
 
         Args:
-            site_id: サイトID
-            items: 収集した情報アイテムのリスト
+            model_name: モデル名
+            text_body: 要約する本文テキスト
 
         Returns:
-            bool: 記録が成功したかどうか
+            str: 要約テキスト。APIキーが設定されていない場合はNone
         """
-        # 親クラスのメソッドを呼び出し
-        result = super().mark_as_collected(site_id, items)
+        import google.generativeai as genai
+
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            print("警告: GEMINI_API_KEYが設定されていません")
+            return None
 
-        # 処理済みメールIDを保存（簡略化のため、ここでは実装しない）
-        # 実際の実装では、itemsにメールIDを含めて保存する
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name)
+
+        prompt = f"""以下のメール内容を3-5行で簡潔に要約してください。重要な情報やリンクを含めてください。
+
+{text_body}"""
 
-        return result
+        response = model.generate_content(prompt, request_options={"timeout": get_timeout()})
+        return response.text.strip()
@@ -0,0 +1,105 @@
+"""メール本文（HTML）のパース結果を共有するモジュール"""
+
+import os
+import re
+from functools import cached_property
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+# 標準のパーサー（壊れたHTMLの補正方法はパーサーごとに異なるため、インストール状況で結果が変わらないよう固定する）
+DEFAULT_HTML_PARSER = "html.parser"
+
+# パースに失敗した場合に正規表現で抽出するリンクのパターンと最大件数
+LINK_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+MAX_FALLBACK_LINKS = 10
+
+
+def get_html_parser() -> str:
+    """
+    メール本文のパーサー名を取得
+
+    Returns:
+        str: BeautifulSoup のパーサー名（EMAIL_HTML_PARSER、デフォルト html.parser。lxml で高速なパーサーを使う）
+    """
+    return os.getenv("EMAIL_HTML_PARSER") or DEFAULT_HTML_PARSER
+
+
+class EmailDocument:
+    """
+    メール本文を1回だけパースし、リンク・タイトル・テキストを必要になった時に計算するクラス
+
+    リンク抽出・タイトル抽出・要約用のテキスト化で同じDOMを共有する。
+    """
+
+    def __init__(self, html: str, parser: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            html: メール本文（HTMLまたはテキスト）
+            parser: BeautifulSoup のパーサー名（省略時は get_html_parser()）
+        """
+        self.html = html or ""
+        self.parser = parser or get_html_parser()
+
+    @cached_property
+    def soup(self) -> Optional[BeautifulSoup]:
+        """パース済みのDOM（本文が空、またはパースに失敗した場合はNone）"""
+        if not self.html:
+            return None
+
+        try:
+            return BeautifulSoup(self.html, self.parser)
+        except Exception:
+            if self.parser == "html.parser":
+                return None
+        # 高速なパーサーで失敗した場合は標準のパーサーで再試行
+        try:
+            return BeautifulSoup(self.html, "html.parser")
+        except Exception:
+            return None
+
+    @cached_property
+    def links(self) -> List[str]:
+        """<a> タグの http(s) リンク（パースに失敗した場合は本文から正規表現で最大10件）"""
+        if not self.html:
+            return []
+
+        if self.soup is None:
+            return LINK_PATTERN.findall(self.html)[:MAX_FALLBACK_LINKS]
+
+        return [a["href"] for a in self.soup.find_all("a", href=True) if a["href"].startswith("http")]
+
+    @cached_property
+    def title(self) -> Optional[str]:
+        """本文から推測したタイトル（<h1>、<title>、10文字を超える最初の見出し・強調の順）"""
+        if self.soup is None:
+            return None
+
+        # <h1>タグを探す
+        h1 = self.soup.find("h1")
+        if h1:
+            return h1.get_text(strip=True)
+
+        # <title>タグを探す
+        title = self.soup.find("title")
+        if title:
+            return title.get_text(strip=True)
+
+        # 最初の見出しを探す
+        for tag in ["h2", "h3", "strong", "b"]:
+            elem = self.soup.find(tag)
+            if elem:
+                text = elem.get_text(strip=True)
+                if text and len(text) > 10:
+                    return text
+
+        return None
+
+    @cached_property
+    def text(self) -> str:
+        """HTMLタグを除いた本文テキスト"""
+        if self.soup is None:
+            return self.html
+        return self.soup.get_text(separator=" ", strip=True)
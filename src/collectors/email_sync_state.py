@@ -0,0 +1,160 @@
+"""メール受信の同期状態（IMAP UIDチェックポイントと処理済みMessage-ID）"""
+
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.storage import Storage  # noqa: E402
+
+# 保存する処理済みMessage-IDの最大件数（古いものから削除）
+MAX_MESSAGE_IDS = 10000
+
+
+class EmailSyncState:
+    """
+    アカウント・メールボックスごとのIMAP同期状態
+
+    UIDVALIDITY と最後に取得したUIDをチェックポイントとして保存し、次回は
+    それより大きいUIDのメールだけを取得する。UIDVALIDITY が変わった場合
+    （メールボックスの再作成など）はチェックポイントを破棄する。
+    処理済みのMessage-IDも保存し、実行をまたいで重複を除外する。
+    """
+
+    def __init__(self, storage: Storage, max_message_ids: int = MAX_MESSAGE_IDS):
+        """
+        初期化
+
+        Args:
+            storage: Storageインスタンス
+            max_message_ids: 保存する処理済みMessage-IDの最大件数
+        """
+        self.storage = storage
+        self.max_message_ids = max_message_ids
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        data = storage.load_email_sync_state() or {}
+        self._checkpoints = data.get("checkpoints", {})
+        self._message_ids: "OrderedDict[str, None]" = OrderedDict((mid, None) for mid in data.get("message_ids", []))
+
+    @staticmethod
+    def _key(account_id: str, mailbox: str) -> str:
+        return f"{account_id}/{mailbox}"
+
+    def get_last_uid(self, account_id: str, mailbox: str, uidvalidity: int, cursor: str) -> Optional[int]:
+        """
+        最後に取得したUIDを取得
+
+        Args:
+            account_id: メールアカウントID
+            mailbox: メールボックス名
+            uidvalidity: 現在のUIDVALIDITY
+            cursor: チェックポイントの利用者（同じメールボックスを別条件で検索する場合に分ける）
+
+        Returns:
+            int: 最後に取得したUID。チェックポイントがない、またはUIDVALIDITYが変わった場合はNone
+        """
+        with self._lock:
+            checkpoint = self._checkpoints.get(self._key(account_id, mailbox))
+            if not checkpoint or checkpoint.get("uidvalidity") != uidvalidity:
+                return None
+            return checkpoint.get("last_uid", {}).get(cursor)
+
+    def advance(self, account_id: str, mailbox: str, uidvalidity: int, cursor: str, last_uid: int):
+        """
+        チェックポイントを進める（UIDVALIDITYが変わっていれば他の利用者の分もリセット）
+
+        Args:
+            account_id: メールアカウントID
+            mailbox: メールボックス名
+            uidvalidity: 現在のUIDVALIDITY
+            cursor: チェックポイントの利用者
+            last_uid: 取得済みの最大UID
+        """
+        with self._lock:
+            key = self._key(account_id, mailbox)
+            checkpoint = self._checkpoints.get(key)
+            if not checkpoint or checkpoint.get("uidvalidity") != uidvalidity:
+                checkpoint = self._checkpoints[key] = {"uidvalidity": uidvalidity, "last_uid": {}}
+
+            if checkpoint["last_uid"].get(cursor) == last_uid:
+                return
+            checkpoint["last_uid"][cursor] = last_uid
+            checkpoint["updated_at"] = datetime.now().isoformat()
+            self._dirty = True
+
+    def is_processed(self, message_id: str) -> bool:
+        """
+        処理済みのMessage-IDかどうか
+
+        Args:
+            message_id: Message-ID
+
+        Returns:
+            bool: 処理済みの場合True
+        """
+        with self._lock:
+            return bool(message_id) and message_id in self._message_ids
+
+    def mark_processed(self, message_ids: Iterable[str]):
+        """
+        Message-IDを処理済みとして記録
+
+        Args:
+            message_ids: Message-IDのリスト
+        """
+        with self._lock:
+            for message_id in message_ids:
+                if not message_id:
+                    continue
+                self._message_ids[message_id] = None
+                self._message_ids.move_to_end(message_id)
+                self._dirty = True
+
+            while len(self._message_ids) > self.max_message_ids:
+                self._message_ids.popitem(last=False)
+
+    def flush(self) -> bool:
+        """
+        変更があれば保存
+
+        Returns:
+            bool: 保存が成功したかどうか（変更がない場合もTrue）
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            if not self.storage.save_email_sync_state(self._checkpoints, list(self._message_ids)):
+                return False
+            self._dirty = False
+            return True
+
+
+_sync_states: "weakref.WeakKeyDictionary[Storage, EmailSyncState]" = weakref.WeakKeyDictionary()
+_sync_states_lock = threading.Lock()
+
+
+def get_email_sync_state(storage: Storage) -> EmailSyncState:
+    """
+    Storageごとに共有するメール同期状態を取得（並列に収集するメールサイト間で共有する）
+
+    Args:
+        storage: Storageインスタンス
+
+    Returns:
+        EmailSyncState: 共有のメール同期状態
+    """
+    with _sync_states_lock:
+        state = _sync_states.get(storage)
+        if state is None:
+            state = _sync_states[storage] = EmailSyncState(storage)
+        return state
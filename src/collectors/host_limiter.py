@@ -0,0 +1,148 @@
+"""ホストごとの同時接続数・リクエスト間隔の制限"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+
+class _HostState:
+    """1ホスト分の制限状態"""
+
+    def __init__(self, max_in_flight: int):
+        self.semaphore = threading.BoundedSemaphore(max_in_flight)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+        self.in_flight = 0
+        self.waited_seconds = 0.0
+
+
+class HostLimiter:
+    """
+    ホストごとの同時リクエスト数と最小リクエスト間隔を制限するクラス
+
+    並列収集で同じホスト（同じフィード配信サービスや imap.gmail.com など）に
+    リクエストが集中してスロットリングされないよう、ホストごとに
+    同時実行数を max_in_flight 以下、リクエスト開始間隔を
+    min_interval_seconds 以上に保つ。
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 2,
+        min_interval_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        初期化
+
+        Args:
+            max_in_flight: ホストごとの最大同時リクエスト数
+            min_interval_seconds: 同じホストへのリクエスト開始の最小間隔（秒）
+            clock: 単調増加する時刻関数（テスト用に差し替え可能）
+            sleep: スリープ関数（テスト用に差し替え可能）
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_interval_seconds = min_interval_seconds
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        """
+        URLまたはホスト名からホスト名を取得
+
+        Args:
+            url_or_host: URL、またはホスト名
+
+        Returns:
+            str: 小文字のホスト名
+        """
+        if "://" in url_or_host:
+            return (urlparse(url_or_host).hostname or "").lower()
+        return url_or_host.lower()
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(self.max_in_flight)
+            return state
+
+    @contextmanager
+    def limit(self, url_or_host: str) -> Iterator[None]:
+        """
+        ホストへのリクエスト枠を確保（空きと間隔を待ってから実行）
+
+        Args:
+            url_or_host: リクエスト先のURL、またはホスト名
+        """
+        host = self.host_of(url_or_host)
+        if not host:
+            yield
+            return
+
+        state = self._state(host)
+        started_at = self.clock()
+        state.semaphore.acquire()
+        try:
+            # 次の開始時刻を予約してからロック外で待つ
+            with state.lock:
+                now = self.clock()
+                start_at = max(now, state.next_start)
+                state.next_start = start_at + self.min_interval_seconds
+            if start_at > now:
+                self.sleep(start_at - now)
+
+            with state.lock:
+                state.in_flight += 1
+                state.waited_seconds += self.clock() - started_at
+            try:
+                yield
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+        finally:
+            state.semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        ホストごとの実行中リクエスト数と累計待ち時間を取得
+
+        Returns:
+            Dict[str, Dict[str, float]]: ホスト名 -> {in_flight, waited_seconds}
+        """
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: {"in_flight": state.in_flight, "waited_seconds": state.waited_seconds} for host, state in hosts.items()}
+
+
+_host_limiter: Optional[HostLimiter] = None
+_host_limiter_lock = threading.Lock()
+
+
+def get_host_limiter() -> HostLimiter:
+    """
+    プロセス共有のホストリミッターを取得
+
+    COLLECT_HOST_MAX_IN_FLIGHT（デフォルト2）と COLLECT_HOST_MIN_INTERVAL_SECONDS
+    （デフォルト1.0）で設定できる。
+
+    Returns:
+        HostLimiter: 共有のホストリミッター
+    """
+    global _host_limiter
+    if _host_limiter is None:
+        with _host_limiter_lock:
+            if _host_limiter is None:
+                _host_limiter = HostLimiter(
+                    max_in_flight=int(os.getenv("COLLECT_HOST_MAX_IN_FLIGHT", "2")),
+                    min_interval_seconds=float(os.getenv("COLLECT_HOST_MIN_INTERVAL_SECONDS", "1.0")),
+                )
+    return _host_limiter
@@ -0,0 +1,260 @@
+"""IMAPのまとめ取得（ヘッダーを先に取得し、必要な本文パートだけを後から取得）"""
+
+import email
+import imaplib
+import re
+from itertools import takewhile
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+# 振り分け・重複除外に使うヘッダー
+HEADER_FIELDS = ("MESSAGE-ID", "FROM", "TO", "SUBJECT", "DATE")
+
+# 1回の FETCH で指定するUIDの最大数
+FETCH_BATCH_SIZE = 200
+
+# 接続が使えなくなったエラー（バッチ単位で読み飛ばさず、呼び出し元に伝えて接続を破棄させる）
+CONNECTION_ERRORS = (OSError, imaplib.IMAP4.abort)
+
+_UID_PATTERN = re.compile(rb"\bUID (\d+)")
+_ATOM_PATTERN = re.compile(rb"[^\s()]+")
+
+
+def message_set(uids: List[int]) -> str:
+    """
+    UIDのリストをIMAPのメッセージセット（"1:3,7"）に変換
+
+    Args:
+        uids: UIDのリスト
+
+    Returns:
+        str: メッセージセット
+    """
+    ranges = []
+    for uid in sorted(set(uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(start) if start == end else f"{start}:{end}" for start, end in ranges)
+
+
+def _batches(uids: List[int]) -> List[List[int]]:
+    uids = sorted(uids)
+    return [uids[i : i + FETCH_BATCH_SIZE] for i in range(0, len(uids), FETCH_BATCH_SIZE)]
+
+
+def _uid_fetch(mail: imaplib.IMAP4, uids: List[int], items: str) -> List:
+    status, data = mail.uid("FETCH", message_set(uids), items)
+    if status != "OK":
+        raise imaplib.IMAP4.error(f"FETCH に失敗しました: {items}")
+    return data or []
+
+
+def _literal_responses(data: List) -> Dict[int, bytes]:
+    """FETCH の応答から UID -> リテラル（ヘッダーや本文）を取り出す"""
+    literals = {}
+    for entry in data:
+        if isinstance(entry, tuple) and len(entry) == 2:
+            match = _UID_PATTERN.search(entry[0])
+            if match:
+                literals[int(match.group(1))] = entry[1]
+    return literals
+
+
+def fetch_headers(mail: imaplib.IMAP4, uids: List[int]) -> Tuple[Dict[int, Message], List[int]]:
+    """
+    振り分けに必要なヘッダーだけをまとめて取得（既読にしない）
+
+    Args:
+        mail: メールボックスを選択済みのIMAP接続
+        uids: 取得するUID
+
+    Returns:
+        Tuple[Dict[int, Message], List[int]]: (UID -> ヘッダーだけのメッセージ, 取得できなかったUID)
+    """
+    headers = {}
+    for batch in _batches(uids):
+        try:
+            data = _uid_fetch(mail, batch, f"(UID BODY.PEEK[HEADER.FIELDS ({' '.join(HEADER_FIELDS)})])")
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            print(f"警告: メールヘッダーの取得に失敗しました: {e}")
+            continue
+        for uid, raw in _literal_responses(data).items():
+            headers[uid] = email.message_from_bytes(raw)
+
+    return headers, [uid for uid in uids if uid not in headers]
+
+
+def _parse_list(data: bytes, pos: int) -> Tuple[list, int]:
+    """data[pos] の "(" から対応する ")" までをリストとしてパース"""
+    items = []
+    pos += 1
+    while pos < len(data):
+        char = data[pos : pos + 1]
+        if char == b")":
+            return items, pos + 1
+        if char == b" ":
+            pos += 1
+        elif char == b"(":
+            item, pos = _parse_list(data, pos)
+            items.append(item)
+        elif char == b'"':
+            end = pos + 1
+            value = bytearray()
+            while data[end : end + 1] != b'"':
+                if data[end : end + 1] == b"\\":
+                    end += 1
+                value += data[end : end + 1]
+                end += 1
+                if end >= len(data):
+                    raise ValueError("閉じていない文字列です")
+            items.append(value.decode("utf-8", errors="ignore"))
+            pos = end + 1
+        elif char == b"{":
+            raise ValueError("リテラルを含む BODYSTRUCTURE には対応していません")
+        else:
+            match = _ATOM_PATTERN.match(data, pos)
+            atom = match.group(0).decode("ascii", errors="ignore")
+            items.append(None if atom.upper() == "NIL" else atom)
+            pos = match.end()
+    raise ValueError("閉じていないリストです")
+
+
+def parse_bodystructure(response: bytes) -> Optional[list]:
+    """
+    FETCH の応答から BODYSTRUCTURE をパース
+
+    Args:
+        response: "1 (UID 5 BODYSTRUCTURE (...))" 形式の応答
+
+    Returns:
+        list: BODYSTRUCTURE のリスト表現。見つからない場合はNone
+    """
+    start = response.find(b"BODYSTRUCTURE (")
+    if start < 0:
+        return None
+    structure, _ = _parse_list(response, start + len(b"BODYSTRUCTURE "))
+    return structure
+
+
+def _params(value) -> Dict[str, str]:
+    if not isinstance(value, list):
+        return {}
+    return {str(k).lower(): v for k, v in zip(value[::2], value[1::2]) if k}
+
+
+def _is_attachment(part: list) -> bool:
+    # 拡張データの位置は text/* では lines の分だけ後ろにずれる
+    index = 9 if str(part[0]).lower() == "text" else 8
+    disposition = part[index] if len(part) > index else None
+    return isinstance(disposition, list) and bool(disposition) and str(disposition[0]).lower() == "attachment"
+
+
+def _leaf_parts(structure: list, prefix: str = "") -> List[Tuple[str, list]]:
+    """BODYSTRUCTURE の末端パートを (セクション番号, パート) のリストで返す"""
+    if not structure or not isinstance(structure[0], list):
+        return [(prefix or "1", structure)]
+
+    # マルチパートは子パートのリストが先頭に並び、その後にサブタイプが続く
+    parts = []
+    for number, child in enumerate(takewhile(lambda item: isinstance(item, list), structure), 1):
+        parts.extend(_leaf_parts(child, f"{prefix}.{number}" if prefix else str(number)))
+    return parts
+
+
+def select_text_part(structure: list) -> Optional[Dict[str, str]]:
+    """
+    本文として使うパート（添付ファイル以外の text/html、なければ text/plain）を選ぶ
+
+    Args:
+        structure: BODYSTRUCTURE のリスト表現
+
+    Returns:
+        Dict[str, str]: section（"1.2" など）, content_type, charset, encoding。該当がない場合はNone
+    """
+    candidates = {}
+    for section, part in _leaf_parts(structure):
+        if len(part) < 7 or not isinstance(part[0], str) or _is_attachment(part):
+            continue
+        content_type = f"{part[0]}/{part[1]}".lower()
+        if content_type in ("text/html", "text/plain") and content_type not in candidates:
+            candidates[content_type] = {
+                "section": section,
+                "content_type": content_type,
+                "charset": _params(part[2]).get("charset") or "utf-8",
+                "encoding": (part[5] or "7bit").lower(),
+            }
+    return candidates.get("text/html") or candidates.get("text/plain")
+
+
+def fetch_bodies(mail: imaplib.IMAP4, headers: Dict[int, Message]) -> Tuple[Dict[int, Message], List[int]]:
+    """
+    BODYSTRUCTURE で本文パートを選び、そのパートだけをまとめて取得（既読にしない）
+
+    添付ファイルはダウンロードしない。BODYSTRUCTURE を解釈できないメールは全体を取得する。
+
+    Args:
+        mail: メールボックスを選択済みのIMAP接続
+        headers: UID -> ヘッダーだけのメッセージ
+
+    Returns:
+        Tuple[Dict[int, Message], List[int]]: (UID -> ヘッダーと本文パートのメッセージ, 取得できなかったUID)
+    """
+    uids = sorted(headers)
+    parts: Dict[int, Optional[Dict[str, str]]] = {}
+    for batch in _batches(uids):
+        try:
+            data = _uid_fetch(mail, batch, "(UID BODYSTRUCTURE)")
+        except CONNECTION_ERRORS:
+            raise
+        except Exception as e:
+            print(f"警告: メール構造の取得に失敗しました: {e}")
+            continue
+        for entry in data:
+            response = entry[0] if isinstance(entry, tuple) else entry
+            match = _UID_PATTERN.search(response or b"")
+            if not match or int(match.group(1)) not in headers:
+                continue
+            try:
+                structure = parse_bodystructure(response) if not isinstance(entry, tuple) else None
+                parts[int(match.group(1))] = select_text_part(structure) if structure else None
+            except (ValueError, IndexError, TypeError):
+                parts[int(match.group(1))] = None
+
+    # 同じセクションのメールごとにまとめて取得
+    sections: Dict[str, List[int]] = {}
+    for uid, part in parts.items():
+        sections.setdefault(part["section"] if part else "", []).append(uid)
+
+    messages = {}
+    for section, section_uids in sections.items():
+        for batch in _batches(section_uids):
+            try:
+                data = _uid_fetch(mail, batch, f"(UID BODY.PEEK[{section}])")
+            except CONNECTION_ERRORS:
+                raise
+            except Exception as e:
+                print(f"警告: メール本文の取得に失敗しました: {e}")
+                continue
+            for uid, raw in _literal_responses(data).items():
+                if not section:
+                    messages[uid] = email.message_from_bytes(raw)
+                else:
+                    messages[uid] = _with_body(headers[uid], parts[uid], raw)
+
+    return messages, [uid for uid in uids if uid not in messages]
+
+
+def _with_body(header: Message, part: Dict[str, str], raw: bytes) -> Message:
+    """ヘッダーだけのメッセージに取得した本文パートを付けたメッセージを作成"""
+    msg = email.message_from_bytes(header.as_bytes())
+    for name in ("Content-Type", "Content-Transfer-Encoding"):
+        del msg[name]
+    msg["Content-Type"] = f'{part["content_type"]}; charset="{part["charset"]}"'
+    msg["Content-Transfer-Encoding"] = part["encoding"]
+    # 8bitの本文もバイト列のまま保持し、get_payload(decode=True) で元のバイト列に戻せるようにする
+    msg.set_payload(raw.decode("ascii", errors="surrogateescape"))
+    return msg
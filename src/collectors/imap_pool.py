@@ -0,0 +1,189 @@
+"""アカウントごとに共有するIMAP接続"""
+
+import atexit
+import imaplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Callable, Dict, Iterator, Optional
+
+
+class ImapAccountState:
+    """アカウントごとの共有状態（IMAP接続と、複数サイト向けに取得済みのメール）"""
+
+    def __init__(self):
+        """初期化"""
+        self.lock = threading.RLock()
+        self.connection: Optional[imaplib.IMAP4] = None
+        self.last_used_at = 0.0
+        self.logins = 0
+
+        # 取得済みメール（UID -> メッセージ）。low_uid より大きく synced_through 以下のUIDを網羅している
+        self.uidvalidity: Optional[int] = None
+        self.messages: Dict[int, Message] = {}
+        self.low_uid: Optional[int] = None
+        self.synced_through: Optional[int] = None
+        self.synced_at = 0.0
+
+    def reset_messages(self, uidvalidity: Optional[int]):
+        """
+        UIDVALIDITYが変わった場合に取得済みメールを破棄
+
+        Args:
+            uidvalidity: 現在のUIDVALIDITY
+        """
+        if uidvalidity == self.uidvalidity:
+            return
+        self.uidvalidity = uidvalidity
+        self.messages = {}
+        self.low_uid = None
+        self.synced_through = None
+        self.synced_at = 0.0
+
+    def prune(self, keep_after_uid: int):
+        """
+        すべてのサイトが取得済みのメールを破棄
+
+        Args:
+            keep_after_uid: このUIDより大きいメールだけを残す
+        """
+        self.messages = {uid: msg for uid, msg in self.messages.items() if uid > keep_after_uid}
+        if self.low_uid is not None:
+            self.low_uid = max(self.low_uid, keep_after_uid)
+
+
+class ImapSessionPool:
+    """
+    アカウントごとにログイン済みのIMAP接続を再利用するクラス
+
+    同じアカウントを使うメールサイトが何十件あっても、TLSハンドシェイクと
+    ログインはアカウントごとに1回で済む。接続はアカウントごとのロックで
+    排他し、しばらく使われなかった接続は次回利用時に張り直す。
+    """
+
+    def __init__(self, idle_timeout_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        """
+        初期化
+
+        Args:
+            idle_timeout_seconds: この秒数より長く使われなかった接続は再利用しない
+            clock: 単調増加する時刻関数（テスト用に差し替え可能）
+        """
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._accounts: Dict[str, ImapAccountState] = {}
+
+    def account(self, account_id: str) -> ImapAccountState:
+        """
+        アカウントの共有状態を取得
+
+        Args:
+            account_id: メールアカウントID
+
+        Returns:
+            ImapAccountState: アカウントの共有状態
+        """
+        with self._lock:
+            state = self._accounts.get(account_id)
+            if state is None:
+                state = self._accounts[account_id] = ImapAccountState()
+            return state
+
+    @contextmanager
+    def session(
+        self, account_id: str, server: str, port: int, username: str, password: str, timeout: Optional[float] = None
+    ) -> Iterator[imaplib.IMAP4]:
+        """
+        ログイン済みのIMAP接続を借りる（処理中にエラーが起きた接続は破棄する）
+
+        Args:
+            account_id: メールアカウントID
+            server: IMAPサーバー
+            port: IMAPポート
+            username: ユーザー名
+            password: パスワード
+            timeout: 接続と各コマンドの応答待ちのタイムアウト秒数（Noneで無制限）
+
+        Yields:
+            imaplib.IMAP4: ログイン済みのIMAP接続
+        """
+        state = self.account(account_id)
+        with state.lock:
+            mail = self._connection(state, server, port, username, password, timeout)
+            try:
+                yield mail
+            except (OSError, imaplib.IMAP4.abort):
+                # タイムアウトや切断の後はサーバーとの応答がずれているため、ログアウトせずに閉じる
+                self._discard(state, logout=False)
+                raise
+            except Exception:
+                self._discard(state)
+                raise
+            state.last_used_at = self.clock()
+
+    def _connection(
+        self, state: ImapAccountState, server: str, port: int, username: str, password: str, timeout: Optional[float]
+    ) -> imaplib.IMAP4:
+        if state.connection is not None:
+            if self.clock() - state.last_used_at <= self.idle_timeout_seconds:
+                try:
+                    status, _ = state.connection.noop()
+                    if status == "OK":
+                        return state.connection
+                except Exception:
+                    pass
+            self._discard(state, logout=False)
+
+        mail = imaplib.IMAP4_SSL(server, port, timeout=timeout)
+        try:
+            mail.login(username, password)
+        except Exception:
+            mail.shutdown()
+            raise
+        state.connection = mail
+        state.last_used_at = self.clock()
+        state.logins += 1
+        return mail
+
+    @staticmethod
+    def _discard(state: ImapAccountState, logout: bool = True):
+        mail, state.connection = state.connection, None
+        if mail is None:
+            return
+        try:
+            if logout:
+                mail.logout()
+            else:
+                mail.shutdown()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """すべての接続をログアウト"""
+        with self._lock:
+            states = list(self._accounts.values())
+        for state in states:
+            with state.lock:
+                self._discard(state)
+
+
+_imap_pool: Optional[ImapSessionPool] = None
+_imap_pool_lock = threading.Lock()
+
+
+def get_imap_pool() -> ImapSessionPool:
+    """
+    プロセス共有のIMAP接続プールを取得（終了時にすべての接続をログアウトする）
+
+    Returns:
+        ImapSessionPool: 共有のIMAP接続プール
+    """
+    global _imap_pool
+    if _imap_pool is None:
+        with _imap_pool_lock:
+            if _imap_pool is None:
+                _imap_pool = ImapSessionPool()
+                atexit.register(_imap_pool.close_all)
+    return _imap_pool
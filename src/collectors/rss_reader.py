@@ -15,23 +15,30 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from src.collectors.base import BaseInformationCollector, InformationItem  # noqa: E402
+from src.collectors.site_state import SiteStateCache  # noqa: E402
 from src.diff_detector import DiffDetector  # noqa: E402
+from src.http_client import get_session, get_timeout  # noqa: E402
 from src.storage import Storage  # noqa: E402
 
 
 class RSSReaderCollector(BaseInformationCollector):
     """RSS/Atomフィードから情報を収集するクラス"""
 
-    def __init__(self, storage: Optional[Storage] = None):
+    def __init__(self, storage: Optional[Storage] = None, site_state: Optional[SiteStateCache] = None):
         """
         初期化
 
         Args:
             storage: Storageインスタンス
+            site_state: 実行全体で共有するサイト状態キャッシュ
         """
-        super().__init__(storage)
+        super().__init__(storage, site_state)
         self.max_retries = 3
-        self.timeout = 30
+        self.timeout = get_timeout()
+        self.session = get_session()
+        # 直近の取得結果（304で未更新だったか、レスポンスのバリデータ）
+        self.not_modified = False
+        self.response_validators: Dict[str, Optional[str]] = {}
 
     def collect(self, site_config: Dict) -> List[InformationItem]:
         """
@@ -43,6 +50,7 @@ class RSSReaderCollector(BaseInformationCollector):
         Returns:
             List[InformationItem]: 収集した情報アイテムのリスト
         """
+        self.last_error = None
         collector_config = site_config.get("collector_config", {})
         feed_url = collector_config.get("feed_url") or site_config.get("url", "")
 
@@ -50,8 +58,18 @@ class RSSReaderCollector(BaseInformationCollector):
             print(f"警告: RSSフィードURLが設定されていません (site_id: {site_config.get('id')})")
             return []
 
-        # フィードを取得・パース
-        feed = self._fetch_feed(feed_url)
+        # フィードを取得・パース（前回のETag/Last-Modifiedで条件付きリクエスト。失敗が続いているサイトはリトライしない）
+        # デーモンモードのサイト設定は読み込み時のままなので、保存済みのバリデータは共有のサイト状態から読む
+        site_id = site_config.get("id", "")
+        cached_site = self.site_state.get(site_id) if site_id else None
+        validators = (cached_site or site_config).get("collector_state", {})
+        max_attempts = self.fetch_attempts(site_id, self.max_retries)
+        feed = self._fetch_feed(feed_url, validators, max_attempts)
+
+        # 次回の条件付きリクエスト用にバリデータを記録（新着の保存後に commit_collection で確定する）
+        if self.response_validators:
+            self.update_site_state(site_id, **self.response_validators)
+
         if not feed:
             return []
 
@@ -64,25 +82,55 @@ class RSSReaderCollector(BaseInformationCollector):
 
         return items
 
-    def _fetch_feed(self, feed_url: str) -> Optional[feedparser.FeedParserDict]:
+    def _fetch_feed(
+        self, feed_url: str, validators: Optional[Dict] = None, max_attempts: Optional[int] = None
+    ) -> Optional[feedparser.FeedParserDict]:
         """
         RSS/Atomフィードを取得・パース
 
+        前回のETag/Last-Modifiedがあれば条件付きリクエストを送り、
+        304 Not Modifiedの場合はパースせずにNoneを返す（self.not_modified がTrueになる）。
+        取得・パースに失敗した場合は self.last_error にエラー内容を設定する。
+
         Args:
             feed_url: フィードURL
+            validators: 前回のレスポンスのバリデータ（etag, last_modified）
+            max_attempts: 最大試行回数（省略時は self.max_retries）
 
         Returns:
-            feedparser.FeedParserDict: パースされたフィード。エラーの場合はNone
+            feedparser.FeedParserDict: パースされたフィード。エラーまたは未更新の場合はNone
         """
-        for attempt in range(self.max_retries):
+        self.not_modified = False
+        self.response_validators = {}
+        self.last_error = None
+        validators = validators or {}
+        max_attempts = max_attempts or self.max_retries
+
+        for attempt in range(max_attempts):
             try:
-                print(f"  RSSフィードを取得中: {feed_url} (試行 {attempt + 1}/{self.max_retries})")
+                print(f"  RSSフィードを取得中: {feed_url} (試行 {attempt + 1}/{max_attempts})")
 
-                # リクエストヘッダーを設定（User-Agentなど）
+                # リクエストヘッダーを設定（User-Agent、条件付きリクエスト）
                 headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+
+                # 同じホストへの同時リクエスト数・間隔を制限
+                with self.host_slot(feed_url):
+                    response = self.session.get(feed_url, headers=headers, timeout=self.timeout)
+
+                # 未更新の場合はパースせずに終了
+                if response.status_code == 304:
+                    print("  ✓ フィードは更新されていません (304 Not Modified)")
+                    self.not_modified = True
+                    return None
+
+                response.raise_for_status()
 
-                # feedparserでフィードを取得・パース
-                feed = feedparser.parse(feed_url, agent=headers.get("User-Agent"))
+                # feedparserでフィードをパース（取得済みの本文を渡す）
+                feed = feedparser.parse(response.content, response_headers={k.lower(): v for k, v in response.headers.items()})
 
                 # エラーをチェック
                 if feed.bozo:
@@ -90,6 +138,7 @@ class RSSReaderCollector(BaseInformationCollector):
                     print(f"  警告: フィードのパースエラー - {error_msg}")
                     # bozoエラーでもエントリがあれば処理を続行
                     if not feed.entries:
+                        self.last_error = f"フィードのパースエラー: {error_msg}"
                         return None
 
                 if not feed.entries:
@@ -97,30 +146,58 @@ class RSSReaderCollector(BaseInformationCollector):
                     return None
 
                 print(f"  ✓ フィードを取得しました: {len(feed.entries)}件のエントリ")
+                self.response_validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
                 return feed
 
             except requests.exceptions.Timeout:
-                print(f"  ⚠️ タイムアウトエラー (試行 {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
+                print(f"  ⚠️ タイムアウトエラー (試行 {attempt + 1}/{max_attempts})")
+                if attempt < max_attempts - 1:
                     time.sleep(2**attempt)  # 指数バックオフ
                 else:
                     print("  ❌ タイムアウト: 最大試行回数に達しました")
+                    self.last_error = "タイムアウト"
                     return None
 
             except requests.exceptions.RequestException as e:
-                print(f"  ⚠️ ネットワークエラー: {e} (試行 {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
+                print(f"  ⚠️ ネットワークエラー: {e} (試行 {attempt + 1}/{max_attempts})")
+                if self._is_permanent_error(e):
+                    # 404などはリトライしても結果が変わらない
+                    print("  ❌ ネットワークエラー: リトライしても解決しないエラーです")
+                    self.last_error = f"ネットワークエラー: {e}"
+                    return None
+                if attempt < max_attempts - 1:
                     time.sleep(2**attempt)  # 指数バックオフ
                 else:
                     print("  ❌ ネットワークエラー: 最大試行回数に達しました")
+                    self.last_error = f"ネットワークエラー: {e}"
                     return None
 
             except Exception as e:
                 print(f"  ❌ 予期しないエラー: {e}")
+                self.last_error = f"予期しないエラー: {e}"
                 return None
 
         return None
 
+    @staticmethod
+    def _is_permanent_error(error: requests.exceptions.RequestException) -> bool:
+        """
+        リトライしても解決しないエラー（429以外の4xx）かどうかを判定
+
+        Args:
+            error: リクエストの例外
+
+        Returns:
+            bool: リトライ不要なエラーの場合True
+        """
+        response = getattr(error, "response", None)
+        if not isinstance(error, requests.exceptions.HTTPError) or response is None:
+            return False
+        return 400 <= response.status_code < 500 and response.status_code != 429
+
     def _parse_entry_to_item(self, entry: feedparser.FeedParserDict, site_config: Dict) -> Optional[InformationItem]:
         """
         RSSエントリをInformationItemに変換
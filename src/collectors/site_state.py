@@ -0,0 +1,410 @@
+"""収集実行中のサイト状態キャッシュ"""
+
+import atexit
+import copy
+import signal
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.collect_scheduler import AdaptiveIntervalPolicy, CircuitBreaker  # noqa: E402
+from src.storage import Storage  # noqa: E402
+
+
+class SiteStateCache:
+    """
+    収集実行中のサイト状態（site_id -> サイト設定）のキャッシュ
+
+    サイト一覧は実行開始時に1回だけ読み込み、最終収集時刻・統計・
+    収集状態・失敗状況の更新はメモリ上に溜めて flush() でまとめて書き込む。
+    """
+
+    # 収集処理が更新するフィールド（それ以外の設定は flush 時にファイルの内容を優先する）
+    RUNTIME_FIELDS = ("last_collected_at", "stats", "collector_state", "schedule", "health")
+
+    def __init__(
+        self,
+        storage: Storage,
+        sites: Optional[List[Dict]] = None,
+        policy: Optional[AdaptiveIntervalPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            storage: Storageインスタンス
+            sites: 読み込み済みのサイト設定リスト（省略時は storage から読み込む）
+            policy: 収集間隔の決定方法（省略時は環境変数から作成）
+            breaker: 失敗が続くサイトのバックオフ方法（省略時は環境変数から作成）
+        """
+        self.storage = storage
+        self.policy = policy or AdaptiveIntervalPolicy.from_env()
+        self.breaker = breaker or CircuitBreaker.from_env()
+        if sites is None:
+            sites_data = storage.load_sites()
+            sites = sites_data.get("sites", []) if sites_data else []
+
+        self._lock = threading.RLock()
+        self._sites: Dict[str, Dict] = {site["id"]: copy.deepcopy(site) for site in sites if site.get("id")}
+        self._dirty = set()
+        self._hooks_installed = False
+
+    def _site(self, site_id: str) -> Optional[Dict]:
+        """
+        キャッシュ上のサイト設定を取得（キャッシュにない場合は storage から読み込む。ロック取得済みで呼ぶ）
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            Dict: キャッシュ上のサイト設定。存在しない場合はNone
+        """
+        site = self._sites.get(site_id)
+        if site is None and site_id:
+            site = self.storage.load_site(site_id)
+            if site:
+                site.pop("updated_at", None)
+                self._sites[site_id] = site
+        return site
+
+    def get(self, site_id: str) -> Optional[Dict]:
+        """
+        サイト設定を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            Dict: サイト設定のコピー。存在しない場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            return copy.deepcopy(site) if site else None
+
+    def list_sites(self) -> List[Dict]:
+        """
+        キャッシュ上のサイト設定の一覧を取得
+
+        Returns:
+            List[Dict]: サイト設定のコピーのリスト
+        """
+        with self._lock:
+            return [copy.deepcopy(site) for site in self._sites.values()]
+
+    def get_last_collected_time(self, site_id: str) -> Optional[datetime]:
+        """
+        最後に収集した時刻を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            datetime: 最後に収集した時刻。未収集の場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            last_collected_at = site.get("last_collected_at") if site else None
+
+        if not last_collected_at:
+            return None
+
+        try:
+            return datetime.fromisoformat(last_collected_at)
+        except (ValueError, TypeError):
+            return None
+
+    def get_last_checked_time(self, site_id: str) -> Optional[datetime]:
+        """
+        最後に収集を試みて成功した時刻を取得（新着の有無を問わない）
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            datetime: 最後に確認した時刻。未確認の場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            checked_at = (site.get("schedule") or {}).get("last_checked_at") if site else None
+
+        last_collected = self.get_last_collected_time(site_id)
+        try:
+            last_checked = datetime.fromisoformat(checked_at) if checked_at else None
+        except (ValueError, TypeError):
+            last_checked = None
+
+        return max((t for t in (last_collected, last_checked) if t), default=None)
+
+    def get_interval_minutes(self, site_id: str) -> Optional[float]:
+        """
+        サイトの現在の収集間隔を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            float: 収集間隔（分）。サイトが存在しない場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            return self.policy.interval_minutes(site) if site else None
+
+    def record_check(self, site_id: str, new_item_count: int) -> Optional[float]:
+        """
+        収集結果（新着件数）を記録して次の収集間隔を決める
+
+        Args:
+            site_id: サイトID
+            new_item_count: 新着アイテム数
+
+        Returns:
+            float: 次の収集間隔（分）。サイトが存在しない場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            if site is None:
+                return None
+
+            site["schedule"] = self.policy.update(site, new_item_count)
+            self._dirty.add(site_id)
+            return self.policy.interval_minutes(site)
+
+    def record_collection(self, site_id: str, item_count: int, state: Optional[Dict] = None) -> bool:
+        """
+        収集完了（最終収集時刻・統計・収集状態）を記録
+
+        Args:
+            site_id: サイトID
+            item_count: 収集したアイテム数
+            state: 収集状態（collector_state にマージされる）
+
+        Returns:
+            bool: 記録できたかどうか（サイトが存在しない場合False）
+        """
+        with self._lock:
+            site = self._site(site_id)
+            if site is None:
+                return False
+
+            site["last_collected_at"] = datetime.now().isoformat()
+            stats = site.setdefault("stats", {})
+            stats["total_collected"] = stats.get("total_collected", 0) + item_count
+            stats["last_collected_count"] = item_count
+            if state:
+                site.setdefault("collector_state", {}).update(state)
+
+            self._dirty.add(site_id)
+            return True
+
+    def update_state(self, site_id: str, state: Dict) -> bool:
+        """
+        収集状態を記録（変化がなければ何もしない）
+
+        Args:
+            site_id: サイトID
+            state: 収集状態（collector_state にマージされる）
+
+        Returns:
+            bool: 記録できたかどうか（サイトが存在しない場合False）
+        """
+        with self._lock:
+            site = self._site(site_id)
+            if site is None:
+                return False
+
+            current_state = site.get("collector_state", {})
+            if all(current_state.get(key) == value for key, value in state.items()):
+                return True
+
+            site.setdefault("collector_state", {}).update(state)
+            self._dirty.add(site_id)
+            return True
+
+    def get_consecutive_failures(self, site_id: str) -> int:
+        """
+        連続した収集失敗の回数を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            int: 連続失敗回数（失敗していない場合0）
+        """
+        with self._lock:
+            site = self._site(site_id)
+            return int((site.get("health") or {}).get("consecutive_failures", 0)) if site else 0
+
+    def get_circuit_state(self, site_id: str) -> str:
+        """
+        サイトのサーキットの状態を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            str: CircuitBreaker.CLOSED / OPEN（収集しない） / HALF_OPEN（次の収集で回復を確認する）
+        """
+        with self._lock:
+            site = self._site(site_id)
+            return self.breaker.state(site.get("health") if site else None)
+
+    def get_retry_at(self, site_id: str) -> Optional[datetime]:
+        """
+        サーキットが開いているサイトを次に収集できる時刻を取得
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            datetime: 次に収集できる時刻。サーキットが閉じている場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            return self.breaker.open_until(site.get("health") if site else None)
+
+    def record_failure(self, site_id: str, error: str) -> Optional[Dict]:
+        """
+        収集の失敗を記録（連続失敗が閾値に達するとサーキットを開く）
+
+        Args:
+            site_id: サイトID
+            error: エラーメッセージ
+
+        Returns:
+            Dict: 更新後の失敗状況。サイトが存在しない場合はNone
+        """
+        with self._lock:
+            site = self._site(site_id)
+            if site is None:
+                return None
+
+            site["health"] = self.breaker.record_failure(site.get("health"), error)
+            self._dirty.add(site_id)
+            return copy.deepcopy(site["health"])
+
+    def record_success(self, site_id: str) -> bool:
+        """
+        収集の成功を記録（失敗状況をリセットしてサーキットを閉じる。失敗していなければ何もしない）
+
+        Args:
+            site_id: サイトID
+
+        Returns:
+            bool: 記録できたかどうか（サイトが存在しない場合False）
+        """
+        with self._lock:
+            site = self._site(site_id)
+            if site is None:
+                return False
+
+            if site.pop("health", None) is not None:
+                self._dirty.add(site_id)
+            return True
+
+    def open_circuits(self) -> List[Dict]:
+        """
+        連続失敗が閾値に達している（サーキットが開いている、または回復確認待ちの）サイトを取得
+
+        Returns:
+            List[Dict]: id, name, state, consecutive_failures, open_until, last_error のリスト（連続失敗回数の多い順）
+        """
+        with self._lock:
+            circuits = []
+            for site_id, site in self._sites.items():
+                health = site.get("health") or {}
+                if health.get("consecutive_failures", 0) < self.breaker.failure_threshold:
+                    continue
+                circuits.append(
+                    {
+                        "id": site_id,
+                        "name": site.get("name", ""),
+                        "state": self.breaker.state(health),
+                        "consecutive_failures": health.get("consecutive_failures", 0),
+                        "open_until": health.get("open_until"),
+                        "last_error": health.get("last_error", ""),
+                    }
+                )
+        return sorted(circuits, key=lambda c: (-c["consecutive_failures"], c["id"]))
+
+    def has_pending_writes(self) -> bool:
+        """
+        未保存の更新があるかどうか
+
+        Returns:
+            bool: 未保存の更新がある場合True
+        """
+        with self._lock:
+            return bool(self._dirty)
+
+    def flush(self) -> bool:
+        """
+        溜めた更新をまとめて保存（sites.json の書き込みは1回）
+
+        Returns:
+            bool: すべて保存できた場合True
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+
+            saved = set()
+            with self.storage.batch():
+                for site_id in sorted(self._dirty):
+                    # 実行中に設定が編集されていても上書きしないよう、収集で更新したフィールドだけ反映
+                    site = self.storage.load_site(site_id)
+                    if not site:
+                        # 削除されたサイトは保存しない
+                        saved.add(site_id)
+                        continue
+                    cached = self._sites[site_id]
+                    for field in self.RUNTIME_FIELDS:
+                        if field in cached:
+                            site[field] = cached[field]
+                        else:
+                            site.pop(field, None)
+                    site.pop("updated_at", None)
+                    if self.storage.save_site(site):
+                        saved.add(site_id)
+
+            # 保存に失敗したサイトは未保存のまま残し、次の flush（終了時のフックを含む）で再試行する
+            failed = self._dirty - saved
+            self._dirty = failed
+            if failed:
+                print(f"⚠️ サイト状態の保存に失敗しました（{len(failed)}件: {', '.join(sorted(failed))}）")
+                return False
+
+            print("✓ サイト状態を保存しました")
+            return True
+
+    def install_exit_hooks(self):
+        """
+        異常終了時にも溜めた更新を保存するため、atexit と SIGTERM のハンドラを登録
+        """
+        if self._hooks_installed:
+            return
+        self._hooks_installed = True
+
+        atexit.register(self.flush)
+
+        # シグナルハンドラはメインスレッドでのみ登録できる
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            self.flush()
+            if callable(previous_handler):
+                previous_handler(signum, frame)
+            else:
+                sys.exit(128 + signum)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
@@ -0,0 +1,149 @@
+"""AI要約の永続キャッシュ"""
+
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.storage import Storage  # noqa: E402
+
+# キャッシュする要約の最大件数（超えた分は最も長く使われていないものから削除）
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class SummaryCache:
+    """
+    本文のハッシュとモデル名をキーにしたAI要約のキャッシュ
+
+    同じ本文（再取得したメールや複数サイトに届いた同じメール）の要約を
+    再生成しないよう、要約結果を保存して使い回す。件数が上限を超えると
+    最も長く使われていない要約から削除する。
+    """
+
+    def __init__(self, storage: Storage, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        初期化
+
+        Args:
+            storage: Storageインスタンス
+            max_entries: キャッシュする要約の最大件数
+        """
+        self.storage = storage
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        data = storage.load_summary_cache() or {}
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict(data.get("entries", {}))
+        self._evict()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        """
+        キャッシュのキーを作成
+
+        Args:
+            model_name: 要約に使うモデル名
+            text: 要約する本文
+
+        Returns:
+            str: キー（SHA-256）
+        """
+        return hashlib.sha256(f"{model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model_name: str, text: str) -> Optional[str]:
+        """
+        キャッシュ済みの要約を取得
+
+        Args:
+            model_name: 要約に使うモデル名
+            text: 要約する本文
+
+        Returns:
+            str: 要約。キャッシュにない場合はNone
+        """
+        key = self.key(model_name, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry.get("summary")
+
+    def put(self, model_name: str, text: str, summary: str):
+        """
+        要約をキャッシュ
+
+        Args:
+            model_name: 要約に使うモデル名
+            text: 要約した本文
+            summary: 要約
+        """
+        key = self.key(model_name, text)
+        with self._lock:
+            self._entries[key] = {"model": model_name, "summary": summary, "cached_at": datetime.now().isoformat()}
+            self._entries.move_to_end(key)
+            self._evict()
+            self._dirty = True
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def flush(self) -> bool:
+        """
+        変更があれば保存
+
+        Returns:
+            bool: 保存が成功したかどうか（変更がない場合もTrue）
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            if not self.storage.save_summary_cache(dict(self._entries)):
+                return False
+            self._dirty = False
+            return True
+
+
+_summary_caches: "weakref.WeakKeyDictionary[Storage, SummaryCache]" = weakref.WeakKeyDictionary()
+_summary_caches_lock = threading.Lock()
+
+
+def get_summary_cache(storage: Storage) -> SummaryCache:
+    """
+    Storageごとに共有する要約キャッシュを取得
+
+    SUMMARY_CACHE_MAX_ENTRIES（デフォルト1000）で最大件数を設定できる。
+
+    Args:
+        storage: Storageインスタンス
+
+    Returns:
+        SummaryCache: 共有の要約キャッシュ
+    """
+    with _summary_caches_lock:
+        cache = _summary_caches.get(storage)
+        if cache is None:
+            max_entries = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+            cache = _summary_caches[storage] = SummaryCache(storage, max_entries)
+        return cache
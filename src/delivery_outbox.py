@@ -0,0 +1,251 @@
+"""Persistent delivery outbox module"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from src.line_notifier import LineNotifier
+from src.storage import Storage
+
+# Namespace for deterministic job IDs / retry keys
+OUTBOX_NAMESPACE = uuid.UUID("6f1c2a8e-3b7d-4d0a-9a3e-5c4b2f1e8d70")
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class DeliveryOutbox:
+    """
+    Durable queue of LINE delivery jobs
+
+    Jobs are persisted before anything is sent and marked done after LINE
+    accepts them, so a crash or rate limiting mid-delivery leaves pending
+    jobs that the next run resumes. Every job carries a fixed
+    X-Line-Retry-Key, so a resend of a request LINE already accepted is
+    answered with 409 instead of delivering twice. That also makes it safe
+    to write job state changes every save_every_jobs jobs instead of after
+    each one. Message texts are stored once and referenced by the jobs.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_attempts: int = 8,
+        max_attempts_per_run: int = 3,
+        backoff_base_seconds: float = 1.0,
+        save_every_jobs: int = 100,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize
+
+        Args:
+            storage: Storage instance
+            max_attempts: Attempts across runs before a job is marked failed
+            max_attempts_per_run: Attempts within one run before the job is left for the next run
+            backoff_base_seconds: Base of the exponential backoff between attempts in a run
+            save_every_jobs: Number of processed jobs after which the outbox is written during a run
+            sleep: Sleep function (replaceable in tests)
+        """
+        self.storage = storage
+        self.max_attempts = max_attempts
+        self.max_attempts_per_run = max_attempts_per_run
+        self.backoff_base_seconds = backoff_base_seconds
+        self.save_every_jobs = max(1, save_every_jobs)
+        self.sleep = sleep
+
+        jobs_data = storage.load_delivery_jobs() or {}
+        self.jobs: List[Dict] = jobs_data.get("jobs", [])
+        # Message ID -> text, shared by every job sending the same message
+        self.messages: Dict[str, str] = jobs_data.get("messages", {})
+        for job in self.jobs:
+            # Jobs written before messages were stored separately carry their own text
+            if "text" in job:
+                job["message_id"] = self._add_message(job.pop("text"))
+
+    def _save(self) -> bool:
+        return self.storage.save_delivery_jobs(self.jobs, self.messages)
+
+    def _add_message(self, text: str) -> str:
+        message_id = str(uuid.uuid5(OUTBOX_NAMESPACE, f"message|{text}"))
+        self.messages[message_id] = text
+        return message_id
+
+    def enqueue_multicast(self, category: str, user_ids: List[str], text: str, dedup_key: str) -> int:
+        """
+        Write multicast jobs (one per 500 recipients) for a message
+
+        Job IDs are derived from dedup_key, so enqueueing the same message
+        again (e.g. after a crash before the items were saved) is a no-op.
+
+        Args:
+            category: Category name (for logging)
+            user_ids: Recipient user IDs
+            text: Message text
+            dedup_key: Key identifying the message content
+
+        Returns:
+            int: Number of newly written jobs
+        """
+        existing_ids = {job["id"] for job in self.jobs}
+        size = LineNotifier.MULTICAST_MAX_RECIPIENTS
+        now = datetime.now().isoformat()
+
+        added = 0
+        message_id = None
+        for index in range(0, len(user_ids), size):
+            job_id = str(uuid.uuid5(OUTBOX_NAMESPACE, f"{dedup_key}|{index}"))
+            if job_id in existing_ids:
+                continue
+            message_id = message_id or self._add_message(text)
+            self.jobs.append(self._new_job(job_id, "multicast", user_ids[index : index + size], message_id, category, now))
+            added += 1
+
+        if added:
+            self._save()
+        return added
+
+    def _new_job(self, job_id: str, job_type: str, to, message_id: str, category: str, now: str) -> Dict:
+        return {
+            "id": job_id,
+            "type": job_type,
+            "retry_key": str(uuid.uuid5(OUTBOX_NAMESPACE, f"retry|{job_id}")),
+            "to": to,
+            "message_id": message_id,
+            "category": category,
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": None,
+            "last_error": None,
+        }
+
+    def pending_jobs(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get pending jobs that are due
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            List[Dict]: Due pending jobs in enqueue order
+        """
+        now_str = (now or datetime.now()).isoformat()
+        return [
+            job
+            for job in self.jobs
+            if job["status"] == STATUS_PENDING and (not job.get("next_attempt_at") or job["next_attempt_at"] <= now_str)
+        ]
+
+    def process(self, notifier: LineNotifier) -> Dict[str, int]:
+        """
+        Send due pending jobs, retrying with exponential backoff
+
+        Args:
+            notifier: LineNotifier instance
+
+        Returns:
+            Dict[str, int]: Number of failed jobs and jobs still pending after this run
+        """
+        attempted = set()
+        unsaved = 0
+        while True:
+            # Jobs added while processing (per-user fallbacks) are picked up in the same run
+            due_jobs = [job for job in self.pending_jobs() if job["id"] not in attempted]
+            if not due_jobs:
+                break
+            for job in due_jobs:
+                attempted.add(job["id"])
+                self._process_job(job, notifier)
+                unsaved += 1
+                if unsaved >= self.save_every_jobs:
+                    self._save()
+                    unsaved = 0
+
+        # Done jobs have nothing left to resume; failed jobs are kept for a week for inspection
+        failed_cutoff = (datetime.now() - timedelta(days=7)).isoformat()
+        self.jobs = [
+            job
+            for job in self.jobs
+            if job["status"] == STATUS_PENDING or (job["status"] == STATUS_FAILED and job["created_at"] >= failed_cutoff)
+        ]
+        message_ids = {job["message_id"] for job in self.jobs}
+        self.messages = {message_id: text for message_id, text in self.messages.items() if message_id in message_ids}
+        self._save()
+
+        return {
+            "failed": sum(1 for job in self.jobs if job["status"] == STATUS_FAILED),
+            "pending": sum(1 for job in self.jobs if job["status"] == STATUS_PENDING),
+        }
+
+    def _send(self, job: Dict, notifier: LineNotifier) -> bool:
+        text = self.messages[job["message_id"]]
+        if job["type"] == "multicast":
+            return notifier.send_multicast(job["to"], text, retry_key=job["retry_key"])
+        return notifier.send_text_message(job["to"], text, retry_key=job["retry_key"])
+
+    def _process_job(self, job: Dict, notifier: LineNotifier):
+        """
+        Send one job and record the outcome
+
+        Args:
+            job: Delivery job (updated in place)
+            notifier: LineNotifier instance
+        """
+        for attempt in range(self.max_attempts_per_run):
+            job["attempts"] += 1
+            sent = self._send(job, notifier)
+            status_code = notifier.last_status_code
+
+            # 409 means LINE already accepted a request with this retry key
+            if sent or status_code == 409:
+                job["status"] = STATUS_DONE
+                return
+
+            job["last_error"] = f"HTTP {status_code}" if status_code else "network error"
+
+            if status_code and 400 <= status_code < 500 and status_code != 429:
+                # Not retryable: fall back to per-user pushes so one bad recipient doesn't block the rest
+                self._fail_or_split(job)
+                return
+
+            if job["attempts"] >= self.max_attempts:
+                # Out of attempts: a multicast still falls back to per-user pushes, each with its own attempts
+                self._fail_or_split(job)
+                return
+
+            if attempt < self.max_attempts_per_run - 1:
+                self.sleep(self.backoff_base_seconds * 2**attempt)
+
+        # Leave the job for the next run
+        delay_minutes = min(2 ** job["attempts"], 60)
+        job["next_attempt_at"] = (datetime.now() + timedelta(minutes=delay_minutes)).isoformat()
+        print(f"⚠️ Delivery job deferred: {job['category']} (attempts: {job['attempts']}, retry in {delay_minutes} min)")
+
+    def _fail_or_split(self, job: Dict):
+        """
+        Mark a job failed, splitting a failed multicast into per-user push jobs
+
+        Args:
+            job: Delivery job (updated in place)
+        """
+        if job["type"] != "multicast":
+            job["status"] = STATUS_FAILED
+            return
+
+        now = datetime.now().isoformat()
+        for user_id in job["to"]:
+            self.jobs.append(
+                self._new_job(
+                    str(uuid.uuid5(OUTBOX_NAMESPACE, f"{job['id']}|{user_id}")),
+                    "push",
+                    user_id,
+                    job["message_id"],
+                    job["category"],
+                    now,
+                )
+            )
+        job["status"] = STATUS_DONE
+        print(f"⚠️ Multicast rejected ({job['last_error']}), falling back to {len(job['to'])} individual pushes")
@@ -3,7 +3,7 @@
 import hashlib
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent.parent
@@ -13,6 +13,66 @@ if str(project_root) not in sys.path:
 from src.collectors.base import InformationItem  # noqa: E402
 
 
+class DedupIndex:
+    """重複検知用のURL・ハッシュのインデックス（実行中に保持して差分更新する）"""
+
+    def __init__(self, stored_items: Optional[Iterable[Dict]] = None):
+        """
+        初期化
+
+        Args:
+            stored_items: 保存済みの情報アイテム（辞書形式）
+        """
+        self.urls: Set[str] = set()
+        self.hashes: Set[str] = set()
+        for item in stored_items or []:
+            self.add(item.get("url"), item.get("content_hash"))
+
+    def add(self, url: Optional[str], content_hash: Optional[str] = None):
+        """
+        URLとハッシュを登録
+
+        Args:
+            url: URL
+            content_hash: 内容のハッシュ
+        """
+        if url:
+            self.urls.add(url)
+        if content_hash:
+            self.hashes.add(content_hash)
+
+    def discard(self, url: Optional[str], content_hash: Optional[str] = None):
+        """
+        URLとハッシュの登録を取り消す（新着として登録したアイテムを保存できなかった場合）
+
+        Args:
+            url: URL
+            content_hash: 内容のハッシュ
+        """
+        self.urls.discard(url)
+        self.hashes.discard(content_hash)
+
+    def contains(self, item: InformationItem) -> bool:
+        """
+        登録済みかどうかを判定
+
+        Args:
+            item: 情報アイテム
+
+        Returns:
+            bool: URLまたはハッシュが登録済みの場合True
+        """
+        # URLで重複チェック
+        if item.url in self.urls:
+            return True
+
+        # ハッシュで重複チェック（ハッシュが設定されている場合）
+        return bool(item.content_hash and item.content_hash in self.hashes)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+
 class DiffDetector:
     """差分検知システム"""
 
@@ -20,39 +80,52 @@ class DiffDetector:
         """初期化"""
         pass
 
-    def detect_new_items(self, collected_items: List[InformationItem], stored_items: List[Dict]) -> List[InformationItem]:
+    def build_index(self, stored_items: List[Dict]) -> DedupIndex:
         """
-        新着情報のみを抽出
+        保存済みアイテムから重複検知用インデックスを構築（1回の実行につき1度だけ呼ぶ）
 
         Args:
-            collected_items: 収集した情報アイテムのリスト
             stored_items: 保存済みの情報アイテムのリスト（辞書形式）
 
         Returns:
-            List[InformationItem]: 新着情報アイテムのリスト
+            DedupIndex: 重複検知用インデックス
         """
-        if not stored_items:
-            # 保存済みデータがない場合は全て新着
-            return collected_items
+        return DedupIndex(stored_items)
 
-        # 保存済みのURLとハッシュのセットを作成
-        stored_urls = {item.get("url") for item in stored_items if item.get("url")}
-        stored_hashes = {item.get("content_hash") for item in stored_items if item.get("content_hash")}
+    def filter_new_items(self, collected_items: List[InformationItem], index: DedupIndex) -> List[InformationItem]:
+        """
+        インデックスを使って新着情報のみを抽出し、新着をインデックスに追加
 
+        Args:
+            collected_items: 収集した情報アイテムのリスト
+            index: 重複検知用インデックス（その場で更新される）
+
+        Returns:
+            List[InformationItem]: 新着情報アイテムのリスト
+        """
         new_items = []
         for item in collected_items:
-            # URLで重複チェック
-            if item.url in stored_urls:
-                continue
-
-            # ハッシュで重複チェック（ハッシュが設定されている場合）
-            if item.content_hash and item.content_hash in stored_hashes:
+            if index.contains(item):
                 continue
 
             new_items.append(item)
+            index.add(item.url, item.content_hash)
 
         return new_items
 
+    def detect_new_items(self, collected_items: List[InformationItem], stored_items: List[Dict]) -> List[InformationItem]:
+        """
+        新着情報のみを抽出
+
+        Args:
+            collected_items: 収集した情報アイテムのリスト
+            stored_items: 保存済みの情報アイテムのリスト（辞書形式）
+
+        Returns:
+            List[InformationItem]: 新着情報アイテムのリスト
+        """
+        return self.filter_new_items(collected_items, self.build_index(stored_items))
+
     def generate_content_hash(self, title: str, url: str, summary: Optional[str] = None) -> str:
         """
         内容のハッシュを生成（重複検知用）
@@ -0,0 +1,160 @@
+"""Webhook event deduplication module"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from src.storage import Storage
+
+
+class EventDeduplicator:
+    """
+    LRU cache of processed webhookEventIds with a TTL
+
+    LINE redelivers a webhook when it does not get a timely 200, and the
+    copy carries the same webhookEventId. Remembering recently seen IDs lets
+    redelivered copies be skipped instead of re-running user writes. IDs are
+    claimed when an event is accepted (so a copy arriving while it is still
+    queued is skipped) and released with forget() if processing fails.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 10000,
+        storage: Optional[Storage] = None,
+        persist_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize
+
+        Args:
+            ttl_seconds: How long an event ID is remembered
+            max_entries: Maximum number of remembered event IDs (oldest are evicted first)
+            storage: Storage instance to persist seen IDs across restarts (None for memory only)
+            persist_interval_seconds: Minimum interval between persisted writes
+            clock: Time function returning epoch seconds (replaceable in tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.storage = storage
+        self.persist_interval_seconds = persist_interval_seconds
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        # webhookEventId -> time first seen, oldest first
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._dirty = False
+        self._saved_at = 0.0
+        self.skipped = 0
+
+        if storage:
+            self._load()
+
+    def _load(self):
+        data = self.storage.load_webhook_events()
+        if not data:
+            return
+        events = sorted(data.get("events", {}).items(), key=lambda entry: entry[1])
+        with self._lock:
+            for event_id, seen_at in events:
+                self._seen[event_id] = seen_at
+            self._expire(self.clock())
+
+    def _expire(self, now: float):
+        """
+        Drop expired and overflowing entries (caller holds the lock)
+
+        Args:
+            now: Current time in epoch seconds
+        """
+        cutoff = now - self.ttl_seconds
+        while self._seen:
+            event_id, seen_at = next(iter(self._seen.items()))
+            if seen_at >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            self._seen.popitem(last=False)
+
+    def is_duplicate(self, event: Dict) -> bool:
+        """
+        Check an event against the cache and remember it
+
+        Args:
+            event: LINE webhook event
+
+        Returns:
+            bool: True if the event was already seen and should be skipped
+        """
+        event_id = event.get("webhookEventId")
+        if not event_id:
+            return False
+
+        is_redelivery = event.get("deliveryContext", {}).get("isRedelivery", False)
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            if event_id in self._seen:
+                self.skipped += 1
+                if is_redelivery:
+                    print(f"Skipping redelivered event: {event_id}")
+                else:
+                    print(f"Skipping duplicate event: {event_id}")
+                return True
+
+            self._seen[event_id] = now
+            self._dirty = True
+            self._expire(now)
+
+        self._maybe_persist(now)
+        return False
+
+    def forget(self, event: Dict):
+        """
+        Drop an event ID so a redelivered copy is processed again (e.g. after processing failed)
+
+        Args:
+            event: LINE webhook event
+        """
+        event_id = event.get("webhookEventId")
+        if not event_id:
+            return
+
+        with self._lock:
+            if self._seen.pop(event_id, None) is None:
+                return
+            self._dirty = True
+
+        self._maybe_persist(self.clock())
+
+    def _maybe_persist(self, now: float):
+        if self.storage and now - self._saved_at >= self.persist_interval_seconds:
+            self.flush()
+
+    def flush(self) -> bool:
+        """
+        Persist remembered event IDs if anything changed
+
+        Returns:
+            bool: True if saved (or nothing to save), False otherwise
+        """
+        if not self.storage:
+            return True
+
+        with self._lock:
+            if not self._dirty:
+                return True
+            snapshot = dict(self._seen)
+            self._dirty = False
+            self._saved_at = self.clock()
+
+        if not self.storage.save_webhook_events(snapshot):
+            with self._lock:
+                self._dirty = True
+            return False
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
@@ -0,0 +1,115 @@
+"""In-process event queue module"""
+
+import threading
+import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+
+class EventQueue:
+    """
+    Sharded in-process worker pool for webhook events
+
+    Events are routed to one of N single-threaded shards by a key (the LINE
+    user ID), so events from the same user run in order while different
+    users are processed in parallel.
+    """
+
+    def __init__(self, workers: int = 4, max_depth: int = 1000):
+        """
+        Initialize
+
+        Args:
+            workers: Number of shards (worker threads)
+            max_depth: Maximum number of queued events; submit() refuses beyond this
+        """
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+
+        self._shards: List[ThreadPoolExecutor] = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"webhook-worker-{i}") for i in range(self.workers)
+        ]
+        self._cond = threading.Condition()
+        self._depth = 0
+        self._submitted = 0
+        self._processed = 0
+        self._failed = 0
+
+    def submit(self, key: str, handler: Callable, *args) -> bool:
+        """
+        Queue a handler call
+
+        Args:
+            key: Ordering key (calls with the same key run sequentially)
+            handler: Function to call
+            *args: Arguments for the handler
+
+        Returns:
+            bool: True if queued, False if the queue is full (caller should handle it inline)
+        """
+        with self._cond:
+            if self._depth >= self.max_depth:
+                return False
+            self._depth += 1
+            self._submitted += 1
+
+        shard = self._shards[zlib.crc32(key.encode("utf-8")) % self.workers]
+        shard.submit(self._run, handler, *args)
+        return True
+
+    def _run(self, handler: Callable, *args):
+        failed = False
+        try:
+            handler(*args)
+        except Exception as e:
+            failed = True
+            print(f"❌ Event processing error: {e}")
+            traceback.print_exc()
+        finally:
+            with self._cond:
+                self._depth -= 1
+                self._processed += 1
+                if failed:
+                    self._failed += 1
+                self._cond.notify_all()
+
+    def depth(self) -> int:
+        """
+        Get the number of queued or running events
+
+        Returns:
+            int: Queue depth
+        """
+        with self._cond:
+            return self._depth
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Get queue metrics
+
+        Returns:
+            Dict[str, int]: depth, max_depth, workers, submitted, processed, failed
+        """
+        with self._cond:
+            return {
+                "depth": self._depth,
+                "max_depth": self.max_depth,
+                "workers": self.workers,
+                "submitted": self._submitted,
+                "processed": self._processed,
+                "failed": self._failed,
+            }
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until all queued events are processed
+
+        Args:
+            timeout: Maximum seconds to wait (None to wait forever)
+
+        Returns:
+            bool: True if the queue drained
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._depth == 0, timeout)
@@ -0,0 +1,80 @@
+"""Shared HTTP client module"""
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_timeout() -> float:
+    """
+    Get the default request timeout
+
+    Returns:
+        float: Timeout in seconds (HTTP_TIMEOUT_SECONDS, default 30)
+    """
+    return float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+
+
+def create_session(pool_size: Optional[int] = None, max_retries: Optional[int] = None) -> requests.Session:
+    """
+    Create a connection-pooled session with a retry adapter
+
+    Connections are kept alive and reused per host. Failed connection
+    attempts (request never sent) are retried for every method; read errors
+    and 502/503/504 responses only for idempotent methods, so POSTs are not
+    re-sent here (callers that need it retry with an idempotency key).
+
+    Args:
+        pool_size: Connections kept per host (HTTP_POOL_SIZE, default 20)
+        max_retries: Retry count for idempotent requests (HTTP_MAX_RETRIES, default 2)
+
+    Returns:
+        requests.Session: Configured session
+    """
+    pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", "20"))
+    max_retries = max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES", "2"))
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide shared session (created on first use)
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """Close the shared session and drop its pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
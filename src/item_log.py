@@ -0,0 +1,279 @@
+"""Append-only information item log module"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SEGMENT_PREFIX = "items-"
+SEGMENT_SUFFIX = ".ndjson"
+
+
+class ItemLog:
+    """
+    Segmented, append-only NDJSON log of information items
+
+    New items are appended to the newest segment; once it holds
+    segment_max_items lines a new segment is started. Compaction merges
+    all sealed segments into one, applying the retention window
+    (max_items newest items, optionally no older than max_age_days).
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        max_items: Optional[int] = 1000,
+        max_age_days: Optional[int] = None,
+        segment_max_items: int = 500,
+        compact_after_segments: int = 4,
+    ):
+        """
+        Initialize
+
+        Args:
+            log_dir: Directory holding the segment files
+            max_items: Maximum number of items kept by compaction (None for unlimited)
+            max_age_days: Maximum item age in days kept by compaction (None for unlimited)
+            segment_max_items: Number of lines after which a new segment is started
+            compact_after_segments: Segment count above which background compaction is scheduled
+        """
+        self.log_dir = Path(log_dir)
+        self.max_items = max_items
+        self.max_age_days = max_age_days
+        self.segment_max_items = segment_max_items
+        self.compact_after_segments = compact_after_segments
+
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        # (active segment path, number of lines in it)
+        self._active: Optional[Tuple[Path, int]] = None
+
+    def _segment_path(self, number: int) -> Path:
+        return self.log_dir / f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+    @staticmethod
+    def _segment_number(path: Path) -> int:
+        return int(path.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+
+    def _segments(self) -> List[Path]:
+        """
+        List segment files in order
+
+        Returns:
+            List[Path]: Segment paths, oldest first
+        """
+        if not self.log_dir.exists():
+            return []
+        return sorted(self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"), key=self._segment_number)
+
+    def exists(self) -> bool:
+        """
+        Check whether the log has any segments
+
+        Returns:
+            bool: True if at least one segment exists
+        """
+        return bool(self._segments())
+
+    def _active_segment(self) -> Tuple[Path, int]:
+        """
+        Get the segment new items are appended to (caller holds the lock)
+
+        Returns:
+            Tuple[Path, int]: (segment path, number of lines already in it)
+        """
+        if self._active is None:
+            segments = self._segments()
+            if not segments:
+                self._active = (self._segment_path(1), 0)
+            else:
+                self._active = (segments[-1], len(self._read_segment(segments[-1])))
+
+        path, count = self._active
+        if count >= self.segment_max_items:
+            self._active = (self._segment_path(self._segment_number(path) + 1), 0)
+        return self._active
+
+    def append(self, items: List[Dict]):
+        """
+        Append items to the log
+
+        Args:
+            items: List of information items (dictionary format)
+        """
+        if not items:
+            return
+
+        with self._lock:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            path, count = self._active_segment()
+            with open(path, "a", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._active = (path, count + len(items))
+
+    def _read_segment(self, path: Path) -> List[Dict]:
+        """
+        Read one segment, skipping lines left incomplete by an interrupted write
+
+        Args:
+            path: Segment path
+
+        Returns:
+            List[Dict]: Items in the segment
+        """
+        items = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        items.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Warning: Skipping corrupt line in {path.name}")
+        except FileNotFoundError:
+            pass
+        return items
+
+    def read_all(self) -> List[Dict]:
+        """
+        Read all items in append order
+
+        Returns:
+            List[Dict]: All items in the log
+        """
+        with self._lock:
+            items = []
+            for path in self._segments():
+                items.extend(self._read_segment(path))
+            return items
+
+    def rewrite(self, items: List[Dict]):
+        """
+        Replace the whole log content with the given items
+
+        Args:
+            items: List of information items (dictionary format)
+        """
+        with self._compaction_lock, self._lock:
+            segments = self._segments()
+            next_number = self._segment_number(segments[-1]) + 1 if segments else 1
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            target = self._segment_path(next_number)
+            self._write_segment(target, items)
+            for path in segments:
+                path.unlink()
+            self._active = (target, len(items))
+
+    def _write_segment(self, target: Path, items: List[Dict]):
+        """
+        Atomically write a segment file
+
+        Args:
+            target: Segment path
+            items: Items to write
+        """
+        tmp_path = target.with_name(target.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+
+    def _apply_retention(self, items: List[Dict]) -> List[Dict]:
+        """
+        Apply the retention window, keeping the original order
+
+        Args:
+            items: Items in append order
+
+        Returns:
+            List[Dict]: Retained items
+        """
+        # Drop duplicates that an interrupted compaction may have left behind
+        seen = set()
+        unique_items = []
+        for item in items:
+            key = (item.get("id"), item.get("url"))
+            if key in seen:
+                continue
+            seen.add(key)
+            unique_items.append(item)
+
+        if self.max_age_days:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            unique_items = [item for item in unique_items if item.get("scraped_at", "") >= cutoff]
+
+        if self.max_items and len(unique_items) > self.max_items:
+            newest = sorted(range(len(unique_items)), key=lambda i: unique_items[i].get("scraped_at", ""), reverse=True)[
+                : self.max_items
+            ]
+            keep = set(newest)
+            unique_items = [item for i, item in enumerate(unique_items) if i in keep]
+
+        return unique_items
+
+    def compact(self) -> int:
+        """
+        Merge all sealed segments into one and apply the retention window
+
+        Appends arriving during compaction go to a fresh segment and are
+        compacted next time.
+
+        Returns:
+            int: Number of items retained in the compacted segment
+        """
+        with self._compaction_lock:
+            with self._lock:
+                sealed = self._segments()
+                if not sealed:
+                    return 0
+                # Seal the active segment so concurrent appends start a new one
+                self._active = (self._segment_path(self._segment_number(sealed[-1]) + 1), 0)
+
+            items = []
+            for path in sealed:
+                items.extend(self._read_segment(path))
+            retained = self._apply_retention(items)
+
+            with self._lock:
+                self._write_segment(sealed[-1], retained)
+                for path in sealed[:-1]:
+                    path.unlink()
+
+            return len(retained)
+
+    def needs_compaction(self) -> bool:
+        """
+        Check whether enough segments have accumulated to compact
+
+        Returns:
+            bool: True if compaction should run
+        """
+        return len(self._segments()) > self.compact_after_segments
+
+    def schedule_compaction(self) -> bool:
+        """
+        Start compaction in a background thread if it is due and not already running
+
+        The thread is non-daemon so the process waits for it before exiting.
+
+        Returns:
+            bool: True if a compaction thread was started
+        """
+        if not self.needs_compaction():
+            return False
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return False
+
+        self._compaction_thread = threading.Thread(target=self.compact, name="item-log-compaction")
+        self._compaction_thread.start()
+        return True
@@ -4,49 +4,125 @@ import base64
 import hashlib
 import hmac
 import os
-from typing import Dict, List, Optional
+import threading
+import uuid
+from typing import Dict, List, Optional, Union
 
 import requests
 
+from src.http_client import get_session, get_timeout
+from src.rate_limiter import RateLimiter, get_line_rate_limiter, parse_retry_after
+
 
 class LineNotifier:
     """LINE Messaging APIで通知を送信するクラス"""
 
-    def __init__(self, channel_access_token: Optional[str] = None, channel_secret: Optional[str] = None):
+    # Multicast APIの1リクエストあたりの最大送信先数
+    MULTICAST_MAX_RECIPIENTS = 500
+    # 429を受けたときの再送回数
+    MAX_RATE_LIMIT_RETRIES = 2
+    # テキストメッセージ1件あたりの最大文字数
+    TEXT_MAX_LENGTH = 5000
+    # Reply APIの1リクエストあたりの最大メッセージ数
+    REPLY_MAX_MESSAGES = 5
+
+    def __init__(
+        self,
+        channel_access_token: Optional[str] = None,
+        channel_secret: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         初期化
 
         Args:
             channel_access_token: LINEチャネルアクセストークン
             channel_secret: LINEチャネルシークレット（Webhook署名検証用）
+            session: HTTPセッション（省略時はプロセス共有の接続プールを使用）
+            rate_limiter: エンドポイントごとのレートリミッター（省略時はプロセス共有のものを使用）
         """
         self.channel_access_token = channel_access_token or os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
         self.channel_secret = channel_secret or os.getenv("LINE_CHANNEL_SECRET")
         self.push_api_url = "https://api.line.me/v2/bot/message/push"
         self.reply_api_url = "https://api.line.me/v2/bot/message/reply"
         self.multicast_api_url = "https://api.line.me/v2/bot/message/multicast"
+        self.session = session or get_session()
+        self.timeout = get_timeout()
+        self.rate_limiter = rate_limiter or get_line_rate_limiter()
+        self._endpoints = {self.push_api_url: "push", self.reply_api_url: "reply", self.multicast_api_url: "multicast"}
+        # 直近のAPI呼び出しのステータスコード（スレッドごと）
+        self._local = threading.local()
+        # 署名検証用にシークレットを鍵としたHMAC状態を事前に用意（検証ごとにcopy()して使用）
+        self._signature_hmac = (
+            hmac.new(self.channel_secret.encode("utf-8"), digestmod=hashlib.sha256) if self.channel_secret else None
+        )
 
         if not self.channel_access_token:
             raise ValueError("LINE_CHANNEL_ACCESS_TOKEN が設定されていません")
 
-    def send_text_message(self, user_id: str, text: str) -> bool:
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """直近のAPI呼び出しのHTTPステータスコード（通信エラーの場合はNone）"""
+        return getattr(self._local, "status_code", None)
+
+    def _post(self, url: str, data: Dict, retry_key: Optional[str] = None) -> requests.Response:
+        """
+        Messaging APIにPOSTし、ステータスコードを記録
+
+        エンドポイントごとのレート制限に従って送信し、429の場合は
+        Retry-Afterの時間だけエンドポイントを停止してから再送する
+
+        Args:
+            url: APIのURL
+            data: リクエストボディ
+            retry_key: 再送時の重複防止キー（X-Line-Retry-Key、UUID形式）
+
+        Returns:
+            requests.Response: レスポンス
+
+        Raises:
+            requests.RequestException: 通信エラーまたはエラーレスポンスの場合
+        """
+        headers = {"Authorization": f"Bearer {self.channel_access_token}", "Content-Type": "application/json"}
+        if retry_key:
+            headers["X-Line-Retry-Key"] = retry_key
+
+        endpoint = self._endpoints.get(url, "")
+        self._local.status_code = None
+
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire(endpoint)
+            response = self.session.post(url, headers=headers, json=data, timeout=self.timeout)
+            self._local.status_code = response.status_code
+
+            if response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                break
+
+            # レート制限: 指定された時間だけこのエンドポイントへの送信を止める
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            print(f"⚠️ レート制限 (429): {retry_after:.1f}秒後に再送します ({endpoint})")
+            self.rate_limiter.defer(endpoint, retry_after)
+
+        response.raise_for_status()
+        return response
+
+    def send_text_message(self, user_id: str, text: str, retry_key: Optional[str] = None) -> bool:
         """
         テキストメッセージを送信（プッシュ）
 
         Args:
             user_id: 送信先のユーザーID
             text: 送信するテキスト
+            retry_key: 再送時の重複防止キー（X-Line-Retry-Key）
 
         Returns:
             bool: 送信が成功したかどうか
         """
-        headers = {"Authorization": f"Bearer {self.channel_access_token}", "Content-Type": "application/json"}
-
         data = {"to": user_id, "messages": [{"type": "text", "text": text}]}
 
         try:
-            response = requests.post(self.push_api_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
+            self._post(self.push_api_url, data, retry_key)
             print(f"✓ LINE通知を送信しました (to: {user_id[:10]}...)")
             return True
         except requests.RequestException as e:
@@ -66,13 +142,24 @@ class LineNotifier:
         Returns:
             bool: 送信が成功したかどうか
         """
-        headers = {"Authorization": f"Bearer {self.channel_access_token}", "Content-Type": "application/json"}
+        return self.reply_text_messages(reply_token, [text])
+
+    def reply_text_messages(self, reply_token: str, texts: List[str]) -> bool:
+        """
+        複数のテキストメッセージを1回のReplyで送信
+
+        Args:
+            reply_token: リプライトークン
+            texts: 送信するテキストのリスト（最大REPLY_MAX_MESSAGES件）
 
-        data = {"replyToken": reply_token, "messages": [{"type": "text", "text": text}]}
+        Returns:
+            bool: 送信が成功したかどうか
+        """
+        messages = [{"type": "text", "text": text} for text in texts[: self.REPLY_MAX_MESSAGES]]
+        data = {"replyToken": reply_token, "messages": messages}
 
         try:
-            response = requests.post(self.reply_api_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
+            self._post(self.reply_api_url, data)
             print("✓ LINE Replyを送信しました")
             return True
         except requests.RequestException as e:
@@ -96,10 +183,11 @@ class LineNotifier:
             print("通知する情報がありません")
             return True
 
-        message = self._format_information_message(items)
+        message = self.format_information_message(items)
         return self.send_text_message(user_id, message)
 
-    def _format_information_message(self, items: List[Dict]) -> str:
+    @staticmethod
+    def format_information_message(items: List[Dict]) -> str:
         """
         情報アイテムをメッセージ形式に整形
 
@@ -129,32 +217,63 @@ class LineNotifier:
 
         return "\n".join(lines)
 
-    def send_multicast(self, user_ids: List[str], text: str) -> bool:
+    def send_multicast(self, user_ids: List[str], text: str, retry_key: Optional[str] = None) -> bool:
         """
         複数ユーザーに一斉送信（Multicast）
 
+        500件を超える場合は500件ずつに分割して送信する
+
         Args:
-            user_ids: 送信先のユーザーIDリスト（最大500件）
+            user_ids: 送信先のユーザーIDリスト
             text: 送信するテキスト
+            retry_key: 再送時の重複防止キー（UUID形式。分割時はチャンクごとのキーを派生させる）
 
         Returns:
-            bool: 送信が成功したかどうか
+            bool: 全ての送信が成功したかどうか
         """
         if not user_ids:
             print("送信先ユーザーがありません")
             return True
 
-        if len(user_ids) > 500:
-            print("警告: 送信先が500件を超えています。最初の500件のみ送信します")
-            user_ids = user_ids[:500]
+        chunks = self._chunk_user_ids(user_ids)
+        success = True
+        for index, chunk in enumerate(chunks):
+            chunk_retry_key = retry_key
+            if retry_key and len(chunks) > 1:
+                chunk_retry_key = str(uuid.uuid5(uuid.UUID(retry_key), str(index)))
+            if not self._send_multicast_chunk(chunk, text, chunk_retry_key):
+                success = False
+        return success
+
+    def _chunk_user_ids(self, user_ids: List[str]) -> List[List[str]]:
+        """
+        送信先をMulticastの上限件数ごとに分割
 
-        headers = {"Authorization": f"Bearer {self.channel_access_token}", "Content-Type": "application/json"}
+        Args:
+            user_ids: 送信先のユーザーIDリスト
 
+        Returns:
+            List[List[str]]: 分割された送信先リスト
+        """
+        size = self.MULTICAST_MAX_RECIPIENTS
+        return [user_ids[i : i + size] for i in range(0, len(user_ids), size)]
+
+    def _send_multicast_chunk(self, user_ids: List[str], text: str, retry_key: Optional[str] = None) -> bool:
+        """
+        1リクエスト分（最大500件）の一斉送信
+
+        Args:
+            user_ids: 送信先のユーザーIDリスト（最大500件）
+            text: 送信するテキスト
+            retry_key: 再送時の重複防止キー（X-Line-Retry-Key）
+
+        Returns:
+            bool: 送信が成功したかどうか
+        """
         data = {"to": user_ids, "messages": [{"type": "text", "text": text}]}
 
         try:
-            response = requests.post(self.multicast_api_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
+            self._post(self.multicast_api_url, data, retry_key)
             print(f"✓ 一斉送信を送信しました ({len(user_ids)}件)")
             return True
         except requests.RequestException as e:
@@ -163,23 +282,27 @@ class LineNotifier:
                 print(f"レスポンス: {e.response.text}")
             return False
 
-    def verify_signature(self, body: str, signature: str) -> bool:
+    def verify_signature(self, body: Union[bytes, str], signature: str) -> bool:
         """
         Webhook署名を検証
 
         Args:
-            body: リクエストボディ
+            body: リクエストボディ（受信したままのバイト列を推奨）
             signature: X-Line-Signatureヘッダーの値
 
         Returns:
             bool: 署名が正しい場合True
         """
-        if not self.channel_secret:
+        if self._signature_hmac is None:
             print("警告: チャネルシークレットが設定されていません")
             return False
 
-        hash_digest = hmac.new(self.channel_secret.encode("utf-8"), body.encode("utf-8"), hashlib.sha256).digest()
+        if isinstance(body, str):
+            body = body.encode("utf-8")
 
-        expected_signature = base64.b64encode(hash_digest).decode("utf-8")
+        mac = self._signature_hmac.copy()
+        mac.update(body)
+        expected_signature = base64.b64encode(mac.digest())
 
-        return signature == expected_signature
+        # タイミング攻撃を避けるため定数時間で比較
+        return hmac.compare_digest(expected_signature, signature.encode("utf-8"))
@@ -0,0 +1,214 @@
+"""Token-bucket rate limiting module"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+
+# Requests per second per LINE Messaging API endpoint
+DEFAULT_LINE_RATE_LIMITS = {"push": 2000.0, "multicast": 200.0, "reply": 2000.0}
+
+# Window used to compute the observed send rate
+RATE_WINDOW_SECONDS = 10.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at rate_per_second up to capacity; each
+    request takes one token and waits while the bucket is empty or paused.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        """
+        Initialize
+
+        Args:
+            rate_per_second: Sustained requests per second
+            capacity: Maximum burst size (defaults to one second of requests)
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity or max(rate_per_second, 1.0)
+
+        self._cond = threading.Condition()
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._sent: Deque[float] = deque()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until one is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started_at = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait_seconds = self._paused_until - now
+                    if wait_seconds <= 0:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            self._sent.append(now)
+                            return now - started_at
+                        wait_seconds = (1 - self._tokens) / self.rate_per_second
+                    self._cond.wait(wait_seconds)
+            finally:
+                self._waiting -= 1
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for the given time (e.g. from Retry-After)
+
+        Args:
+            seconds: Pause length in seconds
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0
+            self._updated_at = now
+            self._cond.notify_all()
+
+    def current_rate(self) -> float:
+        """
+        Get the observed send rate
+
+        Returns:
+            float: Requests per second over the last RATE_WINDOW_SECONDS
+        """
+        with self._cond:
+            cutoff = time.monotonic() - RATE_WINDOW_SECONDS
+            while self._sent and self._sent[0] < cutoff:
+                self._sent.popleft()
+            return len(self._sent) / RATE_WINDOW_SECONDS
+
+    def queue_depth(self) -> int:
+        """
+        Get the number of callers waiting for a token
+
+        Returns:
+            int: Number of waiting callers
+        """
+        with self._cond:
+            return self._waiting
+
+
+class RateLimiter:
+    """Per-endpoint token buckets"""
+
+    def __init__(self, limits: Dict[str, float]):
+        """
+        Initialize
+
+        Args:
+            limits: Requests per second per endpoint name
+        """
+        self.buckets = {endpoint: TokenBucket(rate) for endpoint, rate in limits.items()}
+
+    def acquire(self, endpoint: str) -> float:
+        """
+        Wait for permission to send one request to an endpoint
+
+        Args:
+            endpoint: Endpoint name (endpoints without a limit are not throttled)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        bucket = self.buckets.get(endpoint)
+        return bucket.acquire() if bucket else 0.0
+
+    def defer(self, endpoint: str, seconds: float):
+        """
+        Pause an endpoint after the server asked us to back off
+
+        Args:
+            endpoint: Endpoint name
+            seconds: Pause length in seconds
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket:
+            bucket.pause(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the current send rate and queue depth per endpoint
+
+        Returns:
+            Dict[str, Dict[str, float]]: endpoint -> {limit_per_second, rate_per_second, queue_depth}
+        """
+        return {
+            endpoint: {
+                "limit_per_second": bucket.rate_per_second,
+                "rate_per_second": bucket.current_rate(),
+                "queue_depth": bucket.queue_depth(),
+            }
+            for endpoint, bucket in self.buckets.items()
+        }
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """
+    Parse a Retry-After header value
+
+    Args:
+        value: Header value (delay in seconds or an HTTP date)
+        default: Delay to use when the header is missing or invalid
+
+    Returns:
+        float: Delay in seconds
+    """
+    if not value:
+        return default
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+_line_rate_limiter: Optional[RateLimiter] = None
+_line_rate_limiter_lock = threading.Lock()
+
+
+def get_line_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter for the LINE Messaging API
+
+    Limits can be overridden with LINE_RATE_LIMIT_PUSH, LINE_RATE_LIMIT_MULTICAST
+    and LINE_RATE_LIMIT_REPLY (requests per second).
+
+    Returns:
+        RateLimiter: Shared rate limiter
+    """
+    global _line_rate_limiter
+    if _line_rate_limiter is None:
+        with _line_rate_limiter_lock:
+            if _line_rate_limiter is None:
+                limits = {
+                    endpoint: float(os.getenv(f"LINE_RATE_LIMIT_{endpoint.upper()}", str(rate)))
+                    for endpoint, rate in DEFAULT_LINE_RATE_LIMITS.items()
+                }
+                _line_rate_limiter = RateLimiter(limits)
+    return _line_rate_limiter
@@ -0,0 +1,594 @@
+"""SQLite-backed data persistence module"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.storage import Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sites (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS information_items (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT,
+    content_hash TEXT,
+    site_id TEXT,
+    scraped_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_url ON information_items (url);
+CREATE INDEX IF NOT EXISTS idx_items_content_hash ON information_items (content_hash);
+CREATE INDEX IF NOT EXISTS idx_items_scraped_at ON information_items (scraped_at);
+"""
+
+
+class _JsonFileStorage:
+    """
+    Plain reader/writer of users.json, sites.json and information_items.json used for import/export
+
+    Unlike Storage, it runs no migrations and keeps no derived files (data/sites/,
+    the item log), so importing and exporting touch only these JSON files.
+    """
+
+    load_json = Storage.load_json
+    save_json = Storage.save_json
+
+    def __init__(self, data_dir: str):
+        """
+        Initialize
+
+        Args:
+            data_dir: Path to data directory
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def _save_records(self, filename: str, key: str, records: List[Dict]) -> bool:
+        data = {"updated_at": datetime.now().isoformat(), "count": len(records), key: records}
+        return self.save_json(filename, data)
+
+    def save_users(self, users: List[Dict]) -> bool:
+        """
+        Save users to users.json
+
+        Args:
+            users: List of user information
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        return self._save_records("users.json", "users", users)
+
+    def load_users(self) -> Optional[Dict]:
+        """
+        Load users from users.json
+
+        Returns:
+            Dict: User information data, or None if file doesn't exist
+        """
+        return self.load_json("users.json")
+
+    def save_sites(self, sites: List[Dict]) -> bool:
+        """
+        Save site configurations to sites.json
+
+        Args:
+            sites: List of site configurations
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        return self._save_records("sites.json", "sites", sites)
+
+    def load_sites(self) -> Optional[Dict]:
+        """
+        Load site configurations from sites.json, or from the individual files in sites/ without writing sites.json
+
+        Returns:
+            Dict: Site configuration data, or None if there are no site files
+        """
+        data = self.load_json("sites.json")
+        if data is not None:
+            return data
+
+        sites_dir = self.data_dir / "sites"
+        paths = sorted(sites_dir.glob("*.json")) if sites_dir.is_dir() else []
+        sites = [site for site in (self.load_json(f"sites/{path.name}") for path in paths) if site]
+        return {"count": len(sites), "sites": sites} if sites else None
+
+    def save_information_items(self, items: List[Dict]) -> bool:
+        """
+        Save information items to information_items.json
+
+        Args:
+            items: List of information items
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        return self._save_records("information_items.json", "items", items)
+
+    def load_information_items(self) -> Optional[Dict]:
+        """
+        Load information items from information_items.json
+
+        Returns:
+            Dict: Information items data, or None if file doesn't exist
+        """
+        return self.load_json("information_items.json")
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage backend that keeps users, sites and information items in SQLite
+
+    Writes touch only the changed rows instead of rewriting whole JSON files.
+    Category groups and email accounts stay in their JSON files, and the JSON
+    files remain the import/export format (see import_from_json / export_to_json).
+    """
+
+    def __init__(self, data_dir: str = "data", db_filename: str = "storage.sqlite3"):
+        """
+        Initialize
+
+        Args:
+            data_dir: Path to data directory
+            db_filename: SQLite database file name (relative to data_dir)
+        """
+        Path(data_dir).mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(data_dir) / db_filename
+        is_new_db = not self.db_path.exists()
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        super().__init__(data_dir)
+
+        # Import existing JSON data into a freshly created database
+        if is_new_db:
+            self.import_from_json()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _migrate_legacy_sites(self):
+        """Sites are imported by import_from_json instead of being split into individual files"""
+        pass
+
+    def _migrate_legacy_items(self):
+        """Information items are imported by import_from_json instead of the item log"""
+        pass
+
+    @contextmanager
+    def batch(self) -> Iterator["SQLiteStorage"]:
+        """
+        Group site writes into a single transaction, committed when the outermost batch exits
+
+        Yields:
+            SQLiteStorage: This storage instance
+        """
+        with self._lock, super().batch():
+            yield self
+
+    def _flush_batch(self):
+        """Commit the transaction opened by batch()"""
+        self._conn.commit()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run writes in their own transaction, or in the enclosing batch() transaction
+        """
+        with self._lock:
+            if self._batch_depth:
+                yield
+            else:
+                with self._conn:
+                    yield
+
+    def _touch(self, collection: str):
+        """
+        Record the update time of a collection
+
+        Args:
+            collection: Collection name (users, sites, information_items)
+        """
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (f"{collection}_updated_at", datetime.now().isoformat()),
+        )
+
+    def _get_updated_at(self, collection: str) -> str:
+        """
+        Get the update time of a collection
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            str: ISO formatted update time (current time if never updated)
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (f"{collection}_updated_at",)).fetchone()
+        return row[0] if row else datetime.now().isoformat()
+
+    def get_data_version(self, collection: str) -> Optional[str]:
+        """
+        Get a token that changes whenever a collection is written (by any connection)
+
+        Args:
+            collection: Collection name (users, sites, information_items)
+
+        Returns:
+            str: Version token, or None if the collection has never been written
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (f"{collection}_updated_at",)).fetchone()
+        return row[0] if row else None
+
+    # ---- Sites ----
+
+    def save_site(self, site: Dict) -> bool:
+        """
+        Save individual site configuration
+
+        Args:
+            site: Site configuration
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        is_valid, errors = self.validate_site(site)
+        if not is_valid:
+            print("❌ Site configuration validation errors:")
+            for error in errors:
+                print(f"  - {error}")
+            return False
+
+        site_data = {"updated_at": datetime.now().isoformat(), **site}
+
+        try:
+            with self._transaction():
+                self._conn.execute(
+                    "INSERT INTO sites (id, data) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                    (site["id"], json.dumps(site_data, ensure_ascii=False)),
+                )
+                self._touch("sites")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save site configuration - {e}")
+            return False
+
+    def load_site(self, site_id: str) -> Optional[Dict]:
+        """
+        Load individual site configuration
+
+        Args:
+            site_id: Site ID
+
+        Returns:
+            Dict: Site configuration data, or None if doesn't exist
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sites WHERE id = ?", (site_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_sites(self) -> Optional[Dict]:
+        """
+        Load all site configurations
+
+        Returns:
+            Dict: Site configuration data (same format as sites.json)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM sites ORDER BY rowid").fetchall()
+            updated_at = self._get_updated_at("sites")
+
+        sites = []
+        for (data,) in rows:
+            site_data = json.loads(data)
+            site_data.pop("updated_at", None)
+            sites.append(site_data)
+
+        return {"updated_at": updated_at, "count": len(sites), "sites": sites}
+
+    def save_sites(self, sites: List[Dict]) -> bool:
+        """
+        Save site configuration list
+
+        Args:
+            sites: List of site configurations
+
+        Returns:
+            bool: True if all sites were saved, False otherwise
+        """
+        success = True
+        with self.batch():
+            for site in sites:
+                if not self.save_site(site):
+                    success = False
+        return success
+
+    def delete_site(self, site_id: str) -> bool:
+        """
+        Delete site configuration
+
+        Args:
+            site_id: Site ID
+
+        Returns:
+            bool: True if deletion succeeded, False otherwise
+        """
+        try:
+            with self._transaction():
+                cursor = self._conn.execute("DELETE FROM sites WHERE id = ?", (site_id,))
+                if cursor.rowcount == 0:
+                    return False
+                self._touch("sites")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to delete site configuration - {e}")
+            return False
+
+    # ---- Information items ----
+
+    def save_information_items(self, items: List[Dict]) -> bool:
+        """
+        Replace all information items
+
+        Args:
+            items: List of information items
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        try:
+            with self._transaction():
+                self._conn.execute("DELETE FROM information_items")
+                self._insert_items(items)
+                self._touch("information_items")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save information items - {e}")
+            return False
+
+    def append_information_items(self, items: List[Dict]) -> bool:
+        """
+        Append information items without touching existing rows, then apply the retention window
+
+        Args:
+            items: List of information items to append
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        if not items:
+            return True
+
+        try:
+            with self._transaction():
+                self._insert_items(items)
+                self._touch("information_items")
+        except Exception as e:
+            print(f"Error: Failed to append information items - {e}")
+            return False
+
+        # Pruning through the scraped_at index is cheap enough to do on every append
+        return self.compact_information_items()
+
+    def compact_information_items(self) -> bool:
+        """
+        Apply the retention window to the stored information items
+
+        Returns:
+            bool: True if compaction succeeded, False otherwise
+        """
+        try:
+            with self._transaction():
+                if self.item_retention_days:
+                    cutoff = (datetime.now() - timedelta(days=self.item_retention_days)).isoformat()
+                    self._conn.execute("DELETE FROM information_items WHERE scraped_at < ?", (cutoff,))
+                if self.item_retention_max_items:
+                    self._conn.execute(
+                        "DELETE FROM information_items WHERE row_id NOT IN "
+                        "(SELECT row_id FROM information_items ORDER BY scraped_at DESC LIMIT ?)",
+                        (self.item_retention_max_items,),
+                    )
+            return True
+        except Exception as e:
+            print(f"Error: Failed to compact information items - {e}")
+            return False
+
+    def _insert_items(self, items: List[Dict]):
+        """
+        Insert information item rows (caller holds the lock and transaction)
+
+        Args:
+            items: List of information items
+        """
+        self._conn.executemany(
+            "INSERT INTO information_items (url, content_hash, site_id, scraped_at, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    item.get("url"),
+                    item.get("content_hash"),
+                    item.get("site_id"),
+                    item.get("scraped_at"),
+                    json.dumps(item, ensure_ascii=False),
+                )
+                for item in items
+            ],
+        )
+
+    def load_information_items(self) -> Optional[Dict]:
+        """
+        Load information items
+
+        Returns:
+            Dict: Information items data (same format as information_items.json)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM information_items ORDER BY row_id").fetchall()
+            updated_at = self._get_updated_at("information_items")
+
+        items = [json.loads(data) for (data,) in rows]
+        return {"updated_at": updated_at, "count": len(items), "items": items}
+
+    # ---- Users ----
+
+    def save_users(self, users: List[Dict]) -> bool:
+        """
+        Replace all users
+
+        Args:
+            users: List of user information
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        try:
+            with self._transaction():
+                self._conn.execute("DELETE FROM users")
+                self._conn.executemany(
+                    "INSERT INTO users (user_id, data) VALUES (?, ?)",
+                    [(u["user_id"], json.dumps(u, ensure_ascii=False)) for u in users],
+                )
+                self._touch("users")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save users - {e}")
+            return False
+
+    def load_users(self) -> Optional[Dict]:
+        """
+        Load user information
+
+        Returns:
+            Dict: User information data (same format as users.json)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM users ORDER BY rowid").fetchall()
+            updated_at = self._get_updated_at("users")
+
+        users = [json.loads(data) for (data,) in rows]
+        return {"updated_at": updated_at, "count": len(users), "users": users}
+
+    def load_user(self, user_id: str) -> Optional[Dict]:
+        """
+        Load a single user by primary key
+
+        Args:
+            user_id: LINE user ID
+
+        Returns:
+            Dict: User information, or None if not registered
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_user(self, user: Dict) -> bool:
+        """
+        Insert or update a single user row
+
+        Args:
+            user: User information (must contain user_id)
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        try:
+            with self._transaction():
+                self._conn.execute(
+                    "INSERT INTO users (user_id, data) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+                    (user["user_id"], json.dumps(user, ensure_ascii=False)),
+                )
+                self._touch("users")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save user - {e}")
+            return False
+
+    def delete_user(self, user_id: str) -> bool:
+        """
+        Delete a single user row
+
+        Args:
+            user_id: LINE user ID
+
+        Returns:
+            bool: True if deletion succeeded (or user didn't exist), False otherwise
+        """
+        try:
+            with self._transaction():
+                self._conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+                self._touch("users")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to delete user - {e}")
+            return False
+
+    # ---- JSON import/export ----
+
+    def import_from_json(self) -> bool:
+        """
+        Import users, sites and information items from the JSON files in data_dir
+
+        Returns:
+            bool: True if import succeeded, False otherwise
+        """
+        json_storage = _JsonFileStorage(str(self.data_dir))
+        success = True
+
+        users_data = json_storage.load_users()
+        if users_data and users_data.get("users"):
+            success = self.save_users(users_data["users"]) and success
+            print(f"✓ Imported {len(users_data['users'])} users")
+
+        sites_data = json_storage.load_sites()
+        if sites_data and sites_data.get("sites"):
+            success = self.save_sites(sites_data["sites"]) and success
+            print(f"✓ Imported {len(sites_data['sites'])} sites")
+
+        items_data = json_storage.load_information_items()
+        if items_data and items_data.get("items"):
+            success = self.save_information_items(items_data["items"]) and success
+            print(f"✓ Imported {len(items_data['items'])} information items")
+
+        return success
+
+    def export_to_json(self, data_dir: Optional[str] = None) -> bool:
+        """
+        Export users, sites and information items to JSON files
+
+        Args:
+            data_dir: Destination data directory (defaults to this storage's data_dir)
+
+        Returns:
+            bool: True if export succeeded, False otherwise
+        """
+        json_storage = _JsonFileStorage(data_dir or str(self.data_dir))
+
+        success = json_storage.save_users(self.load_users()["users"])
+        success = json_storage.save_sites(self.load_sites()["sites"]) and success
+        success = json_storage.save_information_items(self.load_information_items()["items"]) and success
+        return success
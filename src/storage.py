@@ -1,12 +1,18 @@
 """Data persistence management module"""
 
 import json
+import os
 import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from src.item_log import ItemLog
+
 
 class Storage:
     """Class for managing data persistence"""
@@ -23,8 +29,24 @@ class Storage:
         self.sites_dir = self.data_dir / "sites"
         self.sites_dir.mkdir(parents=True, exist_ok=True)
 
+        # Retention window for stored information items
+        self.item_retention_max_items = int(os.getenv("ITEM_RETENTION_MAX_ITEMS", "1000")) or None
+        self.item_retention_days = int(os.getenv("ITEM_RETENTION_DAYS", "0")) or None
+        self.item_log = ItemLog(
+            self.data_dir / "items", max_items=self.item_retention_max_items, max_age_days=self.item_retention_days
+        )
+
+        # In-memory copy of the sites.json aggregate, updated per changed site
+        self._sites_lock = threading.RLock()
+        self._sites_aggregate: Optional["OrderedDict[str, Dict]"] = None
+        self._sites_aggregate_version: Optional[str] = None
+        self._sites_dirty = False
+        self._batch_depth = 0
+
         # Migrate existing sites.json to individual files (first time only)
         self._migrate_legacy_sites()
+        # Migrate existing information_items.json to the item log (first time only)
+        self._migrate_legacy_items()
 
     def save_json(self, filename: str, data: Dict) -> bool:
         """
@@ -69,6 +91,22 @@ class Storage:
             print(f"Error: Failed to load data - {e}")
             return None
 
+    def get_data_version(self, collection: str) -> Optional[str]:
+        """
+        Get a token that changes whenever a collection is written (by any process)
+
+        Args:
+            collection: Collection name (users, sites)
+
+        Returns:
+            str: Version token, or None if the collection has never been written
+        """
+        try:
+            stat = (self.data_dir / f"{collection}.json").stat()
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
     def _migrate_legacy_sites(self):
         """
         Migrate existing sites.json to individual files (first time only)
@@ -84,12 +122,28 @@ class Storage:
         print("Migrating existing sites.json to individual files...")
         legacy_data = self.load_json("sites.json")
         if legacy_data and legacy_data.get("sites"):
-            for site in legacy_data["sites"]:
-                site_id = site.get("id")
-                if site_id:
-                    self.save_site(site)
+            with self.batch():
+                for site in legacy_data["sites"]:
+                    site_id = site.get("id")
+                    if site_id:
+                        self.save_site(site)
             print(f"✓ Migrated {len(legacy_data['sites'])} sites")
 
+    def _migrate_legacy_items(self):
+        """
+        Migrate existing information_items.json to the append-only item log (first time only)
+        """
+        legacy_file = self.data_dir / "information_items.json"
+        if not legacy_file.exists() or self.item_log.exists():
+            return
+
+        legacy_data = self.load_json("information_items.json")
+        items = legacy_data.get("items", []) if legacy_data else []
+        print("Migrating existing information_items.json to the item log...")
+        self.item_log.rewrite(items)
+        legacy_file.rename(legacy_file.with_name("information_items.json.migrated"))
+        print(f"✓ Migrated {len(items)} information items")
+
     def validate_site(self, site: Dict) -> Tuple[bool, List[str]]:
         """
         Validate site configuration
@@ -178,6 +232,17 @@ class Storage:
             elif check_interval <= 0:
                 errors.append("check_interval_minutes must be a positive integer >= 1")
 
+        # Bounds for adaptive collection intervals
+        for key in ("min_check_interval_minutes", "max_check_interval_minutes"):
+            value = collector_config.get(key)
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                errors.append(f"{key} must be a positive integer >= 1")
+
+        min_interval = collector_config.get("min_check_interval_minutes")
+        max_interval = collector_config.get("max_check_interval_minutes")
+        if isinstance(min_interval, int) and isinstance(max_interval, int) and min_interval > max_interval:
+            errors.append("min_check_interval_minutes must not exceed max_check_interval_minutes")
+
         return len(errors) == 0, errors
 
     def save_site(self, site: Dict) -> bool:
@@ -215,18 +280,51 @@ class Storage:
                 json.dump(site_data, f, ensure_ascii=False, indent=2)
 
             # Update sites.json (aggregated file)
-            self._update_sites_json()
+            self._update_sites_json(site_id, site_data)
 
             return True
         except Exception as e:
             print(f"Error: Failed to save site configuration - {e}")
             return False
 
-    def _update_sites_json(self):
+    @contextmanager
+    def batch(self) -> Iterator["Storage"]:
+        """
+        Group site writes so sites.json is written once at the end
+
+        Individual site files are still written immediately; only the
+        aggregate is deferred. Batches can be nested, and the aggregate is
+        written when the outermost batch exits (also on error, so it always
+        matches the files already written).
+
+        Yields:
+            Storage: This storage instance
+        """
+        with self._sites_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._sites_lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._flush_batch()
+
+    def _flush_batch(self):
+        """
+        Write changes deferred by batch() (called when the outermost batch exits)
+        """
+        if self._sites_dirty:
+            self._write_sites_json()
+
+    def _scan_sites(self) -> "OrderedDict[str, Dict]":
         """
-        Aggregate individual files in data/sites/ and update sites.json
+        Read all individual files in data/sites/
+
+        Returns:
+            OrderedDict[str, Dict]: Site ID (file name stem) -> site configuration without metadata
         """
-        sites = []
+        sites = OrderedDict()
 
         # Load all JSON files in sites directory
         for file_path in self.sites_dir.glob("*.json"):
@@ -240,14 +338,60 @@ class Storage:
                     # Exclude updated_at as it's metadata
                     if "updated_at" in site_data:
                         del site_data["updated_at"]
-                    sites.append(site_data)
+                    sites[file_path.stem] = site_data
             except Exception as e:
                 print(f"Warning: Failed to load {file_path.name} - {e}")
                 continue
 
-        # Update sites.json
+        return sites
+
+    def _sites_index(self) -> "OrderedDict[str, Dict]":
+        """
+        Get the in-memory sites aggregate, rescanning data/sites/ if sites.json
+        was changed by someone else (caller holds the sites lock)
+
+        Returns:
+            OrderedDict[str, Dict]: Site ID -> site configuration
+        """
+        if self._sites_aggregate is None or (
+            not self._sites_dirty and self.get_data_version("sites") != self._sites_aggregate_version
+        ):
+            self._sites_aggregate = self._scan_sites()
+            self._sites_aggregate_version = self.get_data_version("sites")
+        return self._sites_aggregate
+
+    def _update_sites_json(self, site_id: Optional[str] = None, site: Optional[Dict] = None):
+        """
+        Update the changed entry of the sites.json aggregate
+
+        Args:
+            site_id: ID of the saved or deleted site (None to rebuild from data/sites/)
+            site: Saved site configuration (None if the site was deleted)
+        """
+        with self._sites_lock:
+            if site_id is None:
+                self._sites_aggregate = None
+            sites = self._sites_index()
+
+            if site_id is not None:
+                if site is None:
+                    sites.pop(site_id, None)
+                else:
+                    sites[site_id] = {key: value for key, value in site.items() if key != "updated_at"}
+
+            self._sites_dirty = True
+            if self._batch_depth == 0:
+                self._write_sites_json()
+
+    def _write_sites_json(self):
+        """
+        Write the in-memory aggregate to sites.json (caller holds the sites lock)
+        """
+        sites = list(self._sites_index().values())
         data = {"updated_at": datetime.now().isoformat(), "count": len(sites), "sites": sites}
         self.save_json("sites.json", data)
+        self._sites_aggregate_version = self.get_data_version("sites")
+        self._sites_dirty = False
 
     def load_site(self, site_id: str) -> Optional[Dict]:
         """
@@ -287,32 +431,11 @@ class Storage:
             if data:
                 return data
 
-        # Aggregate from individual files if sites.json doesn't exist
-        sites = []
-
-        # Load all JSON files in sites directory
-        for file_path in self.sites_dir.glob("*.json"):
-            # Skip _index.json and example files
-            if file_path.name.startswith("_") or file_path.name.endswith(".example.json"):
-                continue
-
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    site_data = json.load(f)
-                    # Exclude updated_at as it's metadata
-                    if "updated_at" in site_data:
-                        del site_data["updated_at"]
-                    sites.append(site_data)
-            except Exception as e:
-                print(f"Warning: Failed to load {file_path.name} - {e}")
-                continue
-
-        data = {"updated_at": datetime.now().isoformat(), "count": len(sites), "sites": sites}
-
-        # Update sites.json (so it can be loaded next time)
-        self.save_json("sites.json", data)
-
-        return data
+        # Aggregate from individual files if sites.json doesn't exist (and write it so it can be loaded next time)
+        with self._sites_lock:
+            self._update_sites_json()
+            sites = list(self._sites_index().values())
+        return {"updated_at": datetime.now().isoformat(), "count": len(sites), "sites": sites}
 
     def save_sites(self, sites: List[Dict]) -> bool:
         """
@@ -325,11 +448,10 @@ class Storage:
             bool: True if save succeeded, False otherwise
         """
         success = True
-        for site in sites:
-            if not self.save_site(site):
-                success = False
-        # _update_sites_json is called in save_site, but update once more at the end for safety
-        self._update_sites_json()
+        with self.batch():
+            for site in sites:
+                if not self.save_site(site):
+                    success = False
         return success
 
     def delete_site(self, site_id: str) -> bool:
@@ -351,7 +473,7 @@ class Storage:
         try:
             file_path.unlink()
             # Update sites.json
-            self._update_sites_json()
+            self._update_sites_json(site_id)
             return True
         except Exception as e:
             print(f"Error: Failed to delete site configuration - {e}")
@@ -359,7 +481,7 @@ class Storage:
 
     def save_information_items(self, items: List[Dict]) -> bool:
         """
-        Save information items
+        Save information items (replaces the whole item log)
 
         Args:
             items: List of information items
@@ -367,17 +489,31 @@ class Storage:
         Returns:
             bool: True if save succeeded, False otherwise
         """
-        data = {"updated_at": datetime.now().isoformat(), "count": len(items), "items": items}
-        return self.save_json("information_items.json", data)
+        try:
+            self.item_log.rewrite(items)
+            print(f"✓ Information items saved: {len(items)} items")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to save information items - {e}")
+            return False
 
     def load_information_items(self) -> Optional[Dict]:
         """
         Load information items
 
         Returns:
-            Dict: Information items data
+            Dict: Information items data, or None if nothing has been stored yet
         """
-        return self.load_json("information_items.json")
+        if not self.item_log.exists():
+            return None
+
+        try:
+            items = self.item_log.read_all()
+        except Exception as e:
+            print(f"Error: Failed to load information items - {e}")
+            return None
+
+        return {"updated_at": datetime.now().isoformat(), "count": len(items), "items": items}
 
     def save_users(self, users: List[Dict]) -> bool:
         """
@@ -401,6 +537,101 @@ class Storage:
         """
         return self.load_json("users.json")
 
+    def load_user(self, user_id: str) -> Optional[Dict]:
+        """
+        Load a single user
+
+        Args:
+            user_id: LINE user ID
+
+        Returns:
+            Dict: User information, or None if not registered
+        """
+        users_data = self.load_users()
+        if not users_data:
+            return None
+
+        users = users_data.get("users", [])
+        return next((u for u in users if u.get("user_id") == user_id), None)
+
+    def save_user(self, user: Dict) -> bool:
+        """
+        Insert or update a single user
+
+        Args:
+            user: User information (must contain user_id)
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        users_data = self.load_users() or {"users": []}
+        users = users_data.get("users", [])
+
+        for i, u in enumerate(users):
+            if u.get("user_id") == user["user_id"]:
+                users[i] = user
+                break
+        else:
+            users.append(user)
+
+        return self.save_users(users)
+
+    def delete_user(self, user_id: str) -> bool:
+        """
+        Delete a single user
+
+        Args:
+            user_id: LINE user ID
+
+        Returns:
+            bool: True if deletion succeeded (or user didn't exist), False otherwise
+        """
+        users_data = self.load_users()
+        if not users_data:
+            return True
+
+        users = [u for u in users_data.get("users", []) if u.get("user_id") != user_id]
+        return self.save_users(users)
+
+    def append_information_items(self, items: List[Dict]) -> bool:
+        """
+        Append information items without rewriting the stored items
+
+        Args:
+            items: List of information items to append
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        if not items:
+            return True
+
+        try:
+            self.item_log.append(items)
+        except Exception as e:
+            print(f"Error: Failed to append information items - {e}")
+            return False
+
+        print(f"✓ Information items appended: {len(items)} items")
+        # Merge segments and apply the retention window in the background once enough have piled up
+        self.item_log.schedule_compaction()
+        return True
+
+    def compact_information_items(self) -> bool:
+        """
+        Apply the retention window to the stored information items now
+
+        Returns:
+            bool: True if compaction succeeded, False otherwise
+        """
+        try:
+            retained = self.item_log.compact()
+            print(f"✓ Information items compacted: {retained} items retained")
+            return True
+        except Exception as e:
+            print(f"Error: Failed to compact information items - {e}")
+            return False
+
     def save_category_groups(self, groups: List[Dict]) -> bool:
         """
         Save category group information
@@ -423,6 +654,96 @@ class Storage:
         """
         return self.load_json("category_groups.json")
 
+    def save_delivery_jobs(self, jobs: List[Dict], messages: Dict[str, str]) -> bool:
+        """
+        Save delivery outbox jobs
+
+        Args:
+            jobs: List of delivery jobs
+            messages: Message ID -> message text referenced by the jobs
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        data = {"updated_at": datetime.now().isoformat(), "count": len(jobs), "jobs": jobs, "messages": messages}
+        return self.save_json("delivery_outbox.json", data)
+
+    def load_delivery_jobs(self) -> Optional[Dict]:
+        """
+        Load delivery outbox jobs
+
+        Returns:
+            Dict: Delivery job data
+        """
+        return self.load_json("delivery_outbox.json")
+
+    def save_webhook_events(self, events: Dict[str, float]) -> bool:
+        """
+        Save processed webhook event IDs
+
+        Args:
+            events: webhookEventId -> processed timestamp (epoch seconds)
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        data = {"updated_at": datetime.now().isoformat(), "count": len(events), "events": events}
+        return self.save_json("webhook_events.json", data)
+
+    def load_webhook_events(self) -> Optional[Dict]:
+        """
+        Load processed webhook event IDs
+
+        Returns:
+            Dict: Processed webhook event data
+        """
+        return self.load_json("webhook_events.json")
+
+    def save_email_sync_state(self, checkpoints: Dict[str, Dict], message_ids: List[str]) -> bool:
+        """
+        Save the email sync state
+
+        Args:
+            checkpoints: "<account_id>/<mailbox>" -> {uidvalidity, last_uid, updated_at}
+            message_ids: Processed Message-IDs, oldest first
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        data = {"updated_at": datetime.now().isoformat(), "checkpoints": checkpoints, "message_ids": message_ids}
+        return self.save_json("email_sync_state.json", data)
+
+    def load_email_sync_state(self) -> Optional[Dict]:
+        """
+        Load the email sync state
+
+        Returns:
+            Dict: Email sync state data
+        """
+        return self.load_json("email_sync_state.json")
+
+    def save_summary_cache(self, entries: Dict[str, Dict]) -> bool:
+        """
+        Save the AI summary cache
+
+        Args:
+            entries: Cache key -> {model, summary, cached_at}, least recently used first
+
+        Returns:
+            bool: True if save succeeded, False otherwise
+        """
+        data = {"updated_at": datetime.now().isoformat(), "count": len(entries), "entries": entries}
+        return self.save_json("summary_cache.json", data)
+
+    def load_summary_cache(self) -> Optional[Dict]:
+        """
+        Load the AI summary cache
+
+        Returns:
+            Dict: Summary cache data
+        """
+        return self.load_json("summary_cache.json")
+
     def save_email_accounts(self, accounts: List[Dict]) -> bool:
         """
         Save email account information
@@ -444,3 +765,29 @@ class Storage:
             Dict: Email account information data
         """
         return self.load_json("email_accounts.json")
+
+
+def create_storage(data_dir: str = "data", backend: Optional[str] = None) -> Storage:
+    """
+    Create a storage instance for the configured backend
+
+    Args:
+        data_dir: Path to data directory
+        backend: Backend name ("json" or "sqlite"). Defaults to the STORAGE_BACKEND environment variable, then "json"
+
+    Returns:
+        Storage: Storage instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    backend = (backend or os.getenv("STORAGE_BACKEND") or "json").lower()
+
+    if backend == "json":
+        return Storage(data_dir)
+    if backend == "sqlite":
+        from src.sqlite_storage import SQLiteStorage
+
+        return SQLiteStorage(data_dir)
+
+    raise ValueError(f"Unknown storage backend: {backend} (expected: json, sqlite)")
@@ -1,9 +1,11 @@
 """ユーザー管理システム"""
 
+import copy
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from src.storage import Storage
+from src.storage import Storage, create_storage
 
 
 class UserManager:
@@ -16,7 +18,76 @@ class UserManager:
         Args:
             storage: Storageインスタンス
         """
-        self.storage = storage or Storage()
+        self.storage = storage or create_storage()
+
+        # メモリ上のインデックス（初回参照時に構築し、他プロセスの書き込みを検知したら再構築）
+        self._lock = threading.RLock()
+        self._users_by_id: Optional[Dict[str, Dict]] = None
+        self._user_ids_by_category: Dict[str, Dict[str, None]] = {}
+        self._users_version: Optional[str] = None
+
+    def _ensure_index(self):
+        """
+        ユーザーID→ユーザー、カテゴリ→ユーザーIDのインデックスを用意（呼び出し側でロックを保持）
+
+        ストレージのデータバージョンが変わっていなければ既存のインデックスをそのまま使う
+        """
+        version = self.storage.get_data_version("users")
+        if self._users_by_id is not None and version == self._users_version:
+            return
+
+        users_data = self.storage.load_users()
+        users = users_data.get("users", []) if users_data else []
+
+        self._users_by_id = {}
+        self._user_ids_by_category = {}
+        for user in users:
+            self._index_user(user)
+        self._users_version = version
+
+    def _index_user(self, user: Dict):
+        """
+        ユーザーをインデックスに追加
+
+        Args:
+            user: ユーザー情報
+        """
+        self._users_by_id[user["user_id"]] = user
+        for category in user.get("subscribed_categories", []):
+            self._user_ids_by_category.setdefault(category, {})[user["user_id"]] = None
+
+    def _unindex_user(self, user_id: str):
+        """
+        ユーザーをインデックスから削除
+
+        Args:
+            user_id: LINEユーザーID
+        """
+        user = self._users_by_id.pop(user_id, None)
+        if not user:
+            return
+        for category in user.get("subscribed_categories", []):
+            self._user_ids_by_category.get(category, {}).pop(user_id, None)
+
+    def _apply_write(self, user_id: str, user: Optional[Dict], version_before: Optional[str]):
+        """
+        自プロセスの書き込みをインデックスに反映（呼び出し側でロックを保持）
+
+        書き込み前に他プロセスの書き込みがあった場合は、その変更がインデックスに
+        ないため、書き込み後のバージョンを記録せず次回参照時に再構築する。
+
+        Args:
+            user_id: LINEユーザーID
+            user: 書き込んだユーザー情報（削除の場合はNone）
+            version_before: 書き込み直前のデータバージョン
+        """
+        self._unindex_user(user_id)
+        if user:
+            self._index_user(copy.deepcopy(user))
+        if version_before == self._users_version:
+            self._users_version = self.storage.get_data_version("users")
+        else:
+            self._users_version = None
 
     def register_user(self, user_id: str, line_display_name: str = "") -> bool:
         """
@@ -29,28 +100,25 @@ class UserManager:
         Returns:
             bool: 登録が成功したかどうか
         """
-        users_data = self.storage.load_users() or {"users": []}
-        users = users_data.get("users", [])
-
-        # 既存ユーザーかチェック
-        existing_user = next((u for u in users if u["user_id"] == user_id), None)
-        if existing_user:
-            print(f"ユーザーは既に登録されています: {user_id[:10]}...")
-            return True
-
-        # 新規ユーザーを追加
-        new_user = {
-            "user_id": user_id,
-            "line_display_name": line_display_name,
-            "subscribed_categories": [],
-            "subscribed_sites": [],
-            "notification_groups": {},
-            "registered_at": datetime.now().isoformat(),
-            "last_active_at": datetime.now().isoformat(),
-        }
-
-        users.append(new_user)
-        return self.storage.save_users(users)
+        with self._lock:
+            # 既存ユーザーかチェック
+            existing_user = self.get_user(user_id)
+            if existing_user:
+                print(f"ユーザーは既に登録されています: {user_id[:10]}...")
+                return True
+
+            # 新規ユーザーを追加
+            new_user = {
+                "user_id": user_id,
+                "line_display_name": line_display_name,
+                "subscribed_categories": [],
+                "subscribed_sites": [],
+                "notification_groups": {},
+                "registered_at": datetime.now().isoformat(),
+                "last_active_at": datetime.now().isoformat(),
+            }
+
+            return self._update_user(new_user)
 
     def unregister_user(self, user_id: str) -> bool:
         """
@@ -62,15 +130,14 @@ class UserManager:
         Returns:
             bool: 解除が成功したかどうか
         """
-        users_data = self.storage.load_users()
-        if not users_data:
+        with self._lock:
+            self._ensure_index()
+            version = self.storage.get_data_version("users")
+            if not self.storage.delete_user(user_id):
+                return False
+            self._apply_write(user_id, None, version)
             return True
 
-        users = users_data.get("users", [])
-        users = [u for u in users if u["user_id"] != user_id]
-
-        return self.storage.save_users(users)
-
     def get_user(self, user_id: str) -> Optional[Dict]:
         """
         ユーザー情報を取得
@@ -81,12 +148,11 @@ class UserManager:
         Returns:
             Dict: ユーザー情報。存在しない場合はNone
         """
-        users_data = self.storage.load_users()
-        if not users_data:
-            return None
-
-        users = users_data.get("users", [])
-        return next((u for u in users if u["user_id"] == user_id), None)
+        with self._lock:
+            self._ensure_index()
+            user = self._users_by_id.get(user_id)
+            # 呼び出し側での変更がインデックスに影響しないようコピーを返す
+            return copy.deepcopy(user) if user else None
 
     def subscribe_category(self, user_id: str, category: str) -> bool:
         """
@@ -99,17 +165,18 @@ class UserManager:
         Returns:
             bool: 購読が成功したかどうか
         """
-        user = self.get_user(user_id)
-        if not user:
-            print(f"ユーザーが見つかりません: {user_id[:10]}...")
-            return False
+        with self._lock:
+            user = self.get_user(user_id)
+            if not user:
+                print(f"ユーザーが見つかりません: {user_id[:10]}...")
+                return False
 
-        if category not in user["subscribed_categories"]:
-            user["subscribed_categories"].append(category)
-            user["last_active_at"] = datetime.now().isoformat()
-            return self._update_user(user)
+            if category not in user["subscribed_categories"]:
+                user["subscribed_categories"].append(category)
+                user["last_active_at"] = datetime.now().isoformat()
+                return self._update_user(user)
 
-        return True
+            return True
 
     def unsubscribe_category(self, user_id: str, category: str) -> bool:
         """
@@ -122,16 +189,17 @@ class UserManager:
         Returns:
             bool: 解除が成功したかどうか
         """
-        user = self.get_user(user_id)
-        if not user:
-            return False
+        with self._lock:
+            user = self.get_user(user_id)
+            if not user:
+                return False
 
-        if category in user["subscribed_categories"]:
-            user["subscribed_categories"].remove(category)
-            user["last_active_at"] = datetime.now().isoformat()
-            return self._update_user(user)
+            if category in user["subscribed_categories"]:
+                user["subscribed_categories"].remove(category)
+                user["last_active_at"] = datetime.now().isoformat()
+                return self._update_user(user)
 
-        return True
+            return True
 
     def get_subscribed_users(self, category: str) -> List[str]:
         """
@@ -143,12 +211,9 @@ class UserManager:
         Returns:
             List[str]: ユーザーIDリスト
         """
-        users_data = self.storage.load_users()
-        if not users_data:
-            return []
-
-        users = users_data.get("users", [])
-        return [u["user_id"] for u in users if category in u.get("subscribed_categories", [])]
+        with self._lock:
+            self._ensure_index()
+            return list(self._user_ids_by_category.get(category, {}))
 
     def _update_user(self, user: Dict) -> bool:
         """
@@ -160,13 +225,11 @@ class UserManager:
         Returns:
             bool: 更新が成功したかどうか
         """
-        users_data = self.storage.load_users() or {"users": []}
-        users = users_data.get("users", [])
-
-        # 既存ユーザーを更新
-        for i, u in enumerate(users):
-            if u["user_id"] == user["user_id"]:
-                users[i] = user
-                break
-
-        return self.storage.save_users(users)
+        with self._lock:
+            # 書き込み前にインデックスを最新にし、書き込み後は差分だけ反映する
+            self._ensure_index()
+            version = self.storage.get_data_version("users")
+            if not self.storage.save_user(user):
+                return False
+            self._apply_write(user["user_id"], user, version)
+            return True
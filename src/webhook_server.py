@@ -1,15 +1,20 @@
 """LINE Webhook Server"""
 
+import atexit
 import json
 import os
+import threading
 from pathlib import Path
+from typing import Dict, List
 
-from flask import Flask, abort, request
+from flask import Flask, abort, jsonify, request
 from dotenv import load_dotenv
 
+from src.event_dedup import EventDeduplicator
+from src.event_queue import EventQueue
 from src.line_notifier import LineNotifier
 from src.user_manager import UserManager
-from src.storage import Storage
+from src.storage import create_storage
 
 # Load environment variables
 project_root = Path(__file__).parent.parent
@@ -18,8 +23,43 @@ load_dotenv(project_root / ".env")
 app = Flask(__name__)
 
 # Global instances
-storage = Storage()
+storage = create_storage()
 user_manager = UserManager(storage)
+event_queue = EventQueue(
+    workers=int(os.getenv("WEBHOOK_WORKERS", "4")),
+    max_depth=int(os.getenv("WEBHOOK_QUEUE_MAX_DEPTH", "1000")),
+)
+event_deduplicator = EventDeduplicator(
+    ttl_seconds=float(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "3600")),
+    max_entries=int(os.getenv("WEBHOOK_DEDUP_MAX_ENTRIES", "10000")),
+    storage=storage if os.getenv("WEBHOOK_DEDUP_PERSIST", "false").lower() == "true" else None,
+)
+atexit.register(event_deduplicator.flush)
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> LineNotifier:
+    """
+    Get the process-wide LineNotifier (created on first use)
+
+    Reusing one instance keeps the environment lookup and the HMAC key
+    setup for signature verification out of the request path.
+
+    Returns:
+        LineNotifier: Shared notifier
+
+    Raises:
+        ValueError: If the LINE credentials are not configured
+    """
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                _notifier = LineNotifier()
+                print("✓ LineNotifier initialized successfully")
+    return _notifier
 
 
 @app.route("/webhook", methods=["POST"])
@@ -33,14 +73,13 @@ def webhook():
 
     # Signature verification
     signature = request.headers.get("X-Line-Signature", "")
-    body = request.get_data(as_text=True)
+    body = request.get_data()
 
     print(f"Body length: {len(body)} bytes")
     print(f"Signature: {signature[:20]}..." if signature else "Signature: None")
 
     try:
-        notifier = LineNotifier()
-        print("✓ LineNotifier initialized successfully")
+        notifier = get_notifier()
 
         # Verify signature
         if notifier.channel_secret:
@@ -55,43 +94,29 @@ def webhook():
         print(f"❌ LINE Notifier initialization error: {e}")
         abort(500)
 
-    # Process events
+    # Queue events and acknowledge immediately; replies are sent by the worker pool
     try:
         # Handle empty body or invalid JSON
-        if not body or body.strip() == "":
+        if not body.strip():
             print("⚠️  Empty request body received")
-            return "OK", 200
+            return "OK", 200, _queue_headers()
 
         # Parse JSON
         body_json = json.loads(body)
         events = body_json.get("events", [])
         print(f"Number of events: {len(events)}")
 
-        for i, event in enumerate(events, 1):
-            event_type = event.get("type")
-            print(f"\n--- Event {i}/{len(events)} ---")
-            print(f"Type: {event_type}")
-
-            # Message event
-            if event_type == "message":
-                message_type = event["message"].get("type")
-                print(f"Message type: {message_type}")
-
-                if message_type == "text":
-                    handle_text_message(event, notifier)
-                else:
-                    handle_unsupported_message(event, notifier)
+        for event in events:
+            if event_deduplicator.is_duplicate(event):
+                continue
+            key = event.get("source", {}).get("userId", "")
+            if not event_queue.submit(key, process_event_once, event, notifier):
+                # Queue full: process inline rather than drop the event
+                print("⚠️  Event queue full, processing inline")
+                process_event_once(event, notifier)
 
-            # Follow/Unfollow event
-            elif event_type == "follow":
-                handle_follow_event(event, notifier)
-            elif event_type == "unfollow":
-                handle_unfollow_event(event)
-
-        print("\n" + "=" * 60)
-        print("Webhook processing completed")
-        print("=" * 60)
-        return "OK", 200
+        print(f"Queued {len(events)} event(s) (queue depth: {event_queue.depth()})")
+        return "OK", 200, _queue_headers()
 
     except Exception as e:
         print(f"❌ Webhook error: {e}")
@@ -101,6 +126,67 @@ def webhook():
         abort(500)
 
 
+def _queue_headers() -> dict:
+    """
+    Build response headers carrying event queue metrics
+
+    Returns:
+        dict: Response headers
+    """
+    metrics = event_queue.metrics()
+    return {
+        "X-Webhook-Queue-Depth": str(metrics["depth"]),
+        "X-Webhook-Queue-Max-Depth": str(metrics["max_depth"]),
+        "X-Webhook-Workers": str(metrics["workers"]),
+    }
+
+
+def process_event_once(event: dict, notifier: LineNotifier):
+    """
+    Process an event claimed by the deduplicator, releasing its webhookEventId if processing fails
+
+    Releasing the ID lets LINE's redelivery of a failed event be processed
+    instead of being skipped as a duplicate.
+
+    Args:
+        event: LINE event
+        notifier: LineNotifier instance
+    """
+    try:
+        process_event(event, notifier)
+    except Exception:
+        event_deduplicator.forget(event)
+        raise
+
+
+def process_event(event: dict, notifier: LineNotifier):
+    """
+    Process one LINE event (runs on the event queue workers)
+
+    Args:
+        event: LINE event
+        notifier: LineNotifier instance
+    """
+    event_type = event.get("type")
+    print(f"▶ Processing event: {event_type}")
+
+    # Message event
+    if event_type == "message":
+        message_type = event["message"].get("type")
+        print(f"Message type: {message_type}")
+
+        if message_type == "text":
+            handle_text_message(event, notifier)
+        else:
+            handle_unsupported_message(event, notifier)
+
+    # Follow/Unfollow event
+    elif event_type == "follow":
+        handle_follow_event(event, notifier)
+    elif event_type == "unfollow":
+        handle_unfollow_event(event)
+
+
 def handle_text_message(event: dict, notifier: LineNotifier):
     """
     Process text message
@@ -216,23 +302,76 @@ def handle_sites_list_command(reply_token: str, notifier: LineNotifier):
     """
     print("  → Displaying sites list")
 
+    notifier.reply_text_messages(reply_token, get_sites_list_pages())
+
+
+_sites_reply_cache = {"version": None, "pages": None}
+_sites_reply_lock = threading.Lock()
+
+
+def get_sites_list_pages() -> List[str]:
+    """
+    Get the rendered sites list reply, re-rendering only when the site config changes
+
+    Returns:
+        List[str]: Reply messages (at most LineNotifier.REPLY_MAX_MESSAGES)
+    """
+    version = storage.get_data_version("sites")
+    with _sites_reply_lock:
+        if version is not None and _sites_reply_cache["version"] == version:
+            return _sites_reply_cache["pages"]
+
     sites_data = storage.load_sites()
-    if not sites_data or not sites_data.get("sites"):
-        message = "現在登録されているサイトはありません。"
+    pages = render_sites_list(sites_data.get("sites", []) if sites_data else [])
+
+    # Keyed on the version read before loading, so a concurrent write invalidates it
+    if version is not None:
+        with _sites_reply_lock:
+            _sites_reply_cache["version"] = version
+            _sites_reply_cache["pages"] = pages
+    return pages
+
+
+def render_sites_list(sites: List[Dict]) -> List[str]:
+    """
+    Render the sites list reply, paged to fit LINE's message limits
+
+    Args:
+        sites: List of site configurations
+
+    Returns:
+        List[str]: Reply messages, each at most LineNotifier.TEXT_MAX_LENGTH characters
+    """
+    if not sites:
+        return ["現在登録されているサイトはありません。"]
+
+    max_length = LineNotifier.TEXT_MAX_LENGTH
+    max_pages = LineNotifier.REPLY_MAX_MESSAGES
+
+    pages = []
+    current = "📰 登録されているサイト一覧\n"
+    for i, site in enumerate(sites, 1):
+        status = "✅" if site.get("enabled", False) else "❌"
+        lines = [f"{i}. {status} {site.get('name', '不明')}", f"   カテゴリ: {site.get('category', '不明')}"]
+        if site.get("url"):
+            lines.append(f"   URL: {site['url']}")
+        block = ("\n".join(lines) + "\n\n")[:max_length]
+
+        if len(current) + len(block) > max_length:
+            pages.append(current.rstrip("\n"))
+            current = ""
+            if len(pages) == max_pages:
+                break
+        current += block
     else:
-        sites = sites_data["sites"]
-        lines = ["📰 登録されているサイト一覧\n"]
-        for i, site in enumerate(sites, 1):
-            status = "✅" if site.get("enabled", False) else "❌"
-            lines.append(f"{i}. {status} {site.get('name', '不明')}")
-            lines.append(f"   カテゴリ: {site.get('category', '不明')}")
-            if site.get("url"):
-                lines.append(f"   URL: {site['url']}")
-            lines.append("")
-
-        message = "\n".join(lines)
+        pages.append(current.rstrip("\n"))
+        return pages
 
-    notifier.reply_text_message(reply_token, message)
+    # Sites that do not fit in the reply are summarized on the last page
+    remaining = len(sites) - (i - 1)
+    note = f"\n\n…他{remaining}件"
+    pages[-1] = pages[-1][: max_length - len(note)] + note
+    return pages
 
 
 def handle_help_message(reply_token: str, notifier: LineNotifier):
@@ -335,6 +474,14 @@ def health():
     return "OK", 200
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Event queue metrics endpoint
+    """
+    return jsonify({**event_queue.metrics(), "duplicates_skipped": event_deduplicator.skipped}), 200
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -10,7 +10,7 @@ os.environ.setdefault("GEMINI_API_KEY", "dummy_key")
 
 
 @patch("src.collect_and_deliver.LineNotifier")
-@patch("src.collect_and_deliver.Storage")
+@patch("src.collect_and_deliver.create_storage")
 def test_main_no_sites(mock_storage_class, mock_notifier_class):
     """Test main function with no sites"""
     from src.collect_and_deliver import main
@@ -30,7 +30,7 @@ def test_main_no_sites(mock_storage_class, mock_notifier_class):
 
 
 @patch("src.collect_and_deliver.LineNotifier")
-@patch("src.collect_and_deliver.Storage")
+@patch("src.collect_and_deliver.create_storage")
 def test_main_with_enabled_sites(mock_storage_class, mock_notifier_class):
     """Test main function with enabled sites"""
     from src.collect_and_deliver import main
@@ -66,3 +66,403 @@ def test_main_with_enabled_sites(mock_storage_class, mock_notifier_class):
 
         main()
         mock_storage.load_sites.assert_called_once()
+
+
+def test_collect_sites_concurrently_keeps_site_order():
+    """Test that concurrent collection returns results in site order and isolates failures"""
+    import time
+
+    from src.collect_and_deliver import _collect_sites_concurrently
+
+    slow = MagicMock()
+    slow.collect.side_effect = lambda site: time.sleep(0.2) or ["slow"]
+    fast = MagicMock()
+    fast.collect.return_value = ["fast"]
+    broken = MagicMock()
+    broken.collect.side_effect = RuntimeError("boom")
+
+    plan = [({"id": "slow"}, slow), ({"id": "broken"}, broken), ({"id": "fast"}, fast)]
+    results = _collect_sites_concurrently(plan, max_workers=3, site_timeout=5)
+
+    assert results == [["slow"], None, ["fast"]]
+
+
+def test_collect_sites_concurrently_timeout():
+    """Test that a site exceeding the timeout yields None without blocking the others"""
+    import threading
+
+    from src.collect_and_deliver import _collect_sites_concurrently
+
+    release = threading.Event()
+    hung = MagicMock()
+    hung.collect.side_effect = lambda site: release.wait(10) and []
+    ok = MagicMock()
+    ok.collect.return_value = ["ok"]
+
+    try:
+        results = _collect_sites_concurrently([({"id": "hung"}, hung), ({"id": "ok"}, ok)], max_workers=2, site_timeout=0.3)
+    finally:
+        release.set()
+
+    assert results == [None, ["ok"]]
+
+
+def test_collect_sites_concurrently_cancels_sites_queued_behind_stuck_workers():
+    """Test that sites queued behind a hung collection are cancelled instead of waiting for it"""
+    import threading
+    import time
+
+    from src.collect_and_deliver import _collect_sites_concurrently
+
+    release = threading.Event()
+    hung = MagicMock()
+    hung.collect.side_effect = lambda site: release.wait(10) and []
+    queued = MagicMock()
+
+    started = time.monotonic()
+    try:
+        results = _collect_sites_concurrently(
+            [({"id": "hung"}, hung), ({"id": "queued"}, queued)], max_workers=1, site_timeout=0.3
+        )
+    finally:
+        release.set()
+
+    assert results == [None, None]
+    assert time.monotonic() - started < 3
+    queued.collect.assert_not_called()
+
+
+def test_collect_sites_concurrently_run_deadline():
+    """Test that the run deadline is measured from submission, not from when each site starts"""
+    import time
+
+    from src.collect_and_deliver import _collect_sites_concurrently
+
+    slow = MagicMock()
+    slow.collect.side_effect = lambda site: time.sleep(0.4) or ["slow"]
+    plan = [({"id": f"site{i}"}, slow) for i in range(4)]
+
+    started = time.monotonic()
+    results = _collect_sites_concurrently(plan, max_workers=1, site_timeout=5, run_timeout=0.5)
+
+    # The second site is still running at the deadline and the last two never start
+    assert results == [["slow"], None, None, None]
+    assert slow.collect.call_count == 2
+    assert time.monotonic() - started < 2
+
+
+def test_run_daemon_collects_due_sites_and_reschedules():
+    """Test that daemon mode collects due sites once per interval and stops on the stop event"""
+    import tempfile
+    import threading
+
+    from src.collect_and_deliver import run_daemon
+    from src.diff_detector import DiffDetector
+    from src.storage import Storage
+
+    class StopAfter(threading.Event):
+        """Stop event that stops the loop after a number of sleeps"""
+
+        def __init__(self, sleeps):
+            super().__init__()
+            self.sleeps = sleeps
+            self.waited = []
+
+        def wait(self, timeout=None):
+            self.waited.append(timeout)
+            if len(self.waited) >= self.sleeps:
+                self.set()
+            return self.is_set()
+
+    site = {
+        "id": "feed",
+        "name": "Feed",
+        "url": "https://example.com",
+        "category": "AI",
+        "collector_type": "rss",
+        "collector_config": {"feed_url": "https://example.com/feed.xml", "check_interval_minutes": 30},
+        "enabled": True,
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = Storage(data_dir=tmpdir)
+        storage.save_site(site)
+        user_manager = MagicMock()
+
+        with patch("src.collect_and_deliver.RSSReaderCollector") as mock_collector_class:
+            mock_collector = MagicMock()
+            mock_collector.collect.return_value = []
+            mock_collector_class.return_value = mock_collector
+
+            stop_event = StopAfter(sleeps=2)
+            run_daemon(storage, user_manager, DiffDetector(), None, 2, 5, poll_seconds=60, stop_event=stop_event)
+
+        # Collected once at startup, then the next deadline is 30 minutes away (capped by the poll interval)
+        assert mock_collector.collect.call_count == 1
+        assert stop_event.waited == [60, 60]
+
+
+def test_collection_progress_is_committed_only_after_items_are_saved():
+    """Test that collectors commit their progress (e.g. email checkpoints) only once new items are saved"""
+    import tempfile
+
+    from src.collect_and_deliver import _collect_new_items, _commit_collections, _publish_new_items
+    from src.collectors.base import InformationItem
+    from src.diff_detector import DiffDetector
+    from src.storage import Storage
+
+    item = InformationItem(title="Title", url="https://example.com/1", site_id="mail", site_name="Mail", category="AI")
+    collector = MagicMock(last_error=None)
+    collector.collect.return_value = [item]
+    collector.record_check.return_value = None
+    failed = MagicMock(last_error="IMAP connection failed")
+    failed.collect.return_value = []
+    plan = [({"id": "mail"}, collector), ({"id": "broken"}, failed)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = Storage(data_dir=tmpdir)
+        diff_detector = DiffDetector()
+        user_manager = MagicMock()
+        user_manager.get_subscribed_users.return_value = []
+
+        new_items, collected = _collect_new_items(plan, diff_detector, diff_detector.build_index([]), 2, 5)
+        assert new_items == [item]
+        assert collected == [plan[0]]
+
+        # Saving the items failed: nothing is committed
+        with patch.object(storage, "append_information_items", return_value=False):
+            _, published = _publish_new_items(storage, user_manager, new_items)
+        assert published is False
+
+        _, published = _publish_new_items(storage, user_manager, new_items)
+        assert published is True
+        _commit_collections(collected)
+        collector.commit_collection.assert_called_once_with("mail")
+        failed.commit_collection.assert_not_called()
+
+
+def test_new_items_are_prepared_concurrently():
+    """Test that per-site preparation (AI summaries) runs on the worker pool and a failing site is skipped"""
+    import threading
+
+    from src.collect_and_deliver import _collect_new_items
+    from src.collectors.base import InformationItem
+    from src.diff_detector import DiffDetector
+
+    # Both sites must be preparing at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_collector(site_id, prepare):
+        item = InformationItem(
+            title=site_id, url=f"https://example.com/{site_id}", site_id=site_id, site_name=site_id, category="AI"
+        )
+        collector = MagicMock(last_error=None)
+        collector.collect.return_value = [item]
+        collector.record_check.return_value = None
+        collector.prepare_new_items.side_effect = prepare
+        return ({"id": site_id}, collector)
+
+    def summarize(site, items):
+        barrier.wait()
+        for item in items:
+            item.summary = f"summary of {site['id']}"
+
+    def broken(site, items):
+        raise RuntimeError("summary API failed")
+
+    plan = [make_collector("a", summarize), make_collector("b", summarize), make_collector("c", broken)]
+    diff_detector = DiffDetector()
+
+    index = diff_detector.build_index([])
+    new_items, collected = _collect_new_items(plan, diff_detector, index, 3, 5)
+
+    assert [item.summary for item in new_items] == ["summary of a", "summary of b"]
+    assert collected == plan[:2]
+    # The failed site's item is not saved, so it must stay new for the next collection
+    assert index.urls == {"https://example.com/a", "https://example.com/b"}
+
+
+def test_feed_validators_are_committed_only_after_items_are_saved():
+    """Test that a feed's ETag is not persisted when saving its new items fails"""
+    import tempfile
+
+    from src.collect_and_deliver import _collect_new_items, _commit_collections, _publish_new_items
+    from src.collectors.host_limiter import HostLimiter
+    from src.collectors.rss_reader import RSSReaderCollector
+    from src.collectors.site_state import SiteStateCache
+    from src.diff_detector import DiffDetector
+    from src.storage import Storage
+
+    site = {
+        "id": "feed",
+        "name": "Feed",
+        "url": "https://example.com",
+        "category": "AI",
+        "collector_type": "rss",
+        "collector_config": {"feed_url": "https://example.com/feed.xml"},
+        "enabled": True,
+    }
+    response = MagicMock(status_code=200, headers={"ETag": '"E1"'})
+    response.content = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>
+<item><title>Entry</title><link>https://example.com/1</link></item></channel></rss>"""
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        patch("src.collectors.rss_reader.get_session") as mock_get_session,
+        patch("src.collectors.base.get_host_limiter", return_value=HostLimiter(min_interval_seconds=0)),
+    ):
+        mock_get_session.return_value.get.return_value = response
+        storage = Storage(data_dir=tmpdir)
+        storage.save_site(site)
+        site_state = SiteStateCache(storage)
+        diff_detector = DiffDetector()
+        user_manager = MagicMock()
+        user_manager.get_subscribed_users.return_value = []
+
+        plan = [(site, RSSReaderCollector(storage, site_state=site_state))]
+        new_items, collected = _collect_new_items(plan, diff_detector, diff_detector.build_index([]), 2, 5)
+        assert len(new_items) == 1
+
+        # Saving the items failed: the ETag must not be persisted, or the next run gets a 304 and loses them
+        with patch.object(storage, "append_information_items", return_value=False):
+            _, published = _publish_new_items(storage, user_manager, new_items)
+        assert published is False
+        site_state.flush()
+        assert "etag" not in (storage.load_site("feed").get("collector_state") or {})
+
+        _, published = _publish_new_items(storage, user_manager, new_items)
+        _commit_collections(collected)
+        site_state.flush()
+        assert storage.load_site("feed")["collector_state"]["etag"] == '"E1"'
+
+
+def test_run_daemon_sends_stored_validators_on_later_fetches():
+    """Test that daemon mode sends the ETag stored by an earlier fetch of the same site"""
+    import tempfile
+    import threading
+    import time
+
+    from src.collect_and_deliver import run_daemon
+    from src.collect_scheduler import CollectionScheduler
+    from src.collectors.host_limiter import HostLimiter
+    from src.diff_detector import DiffDetector
+    from src.storage import Storage
+
+    now = [time.time()]
+
+    class StopAfter(threading.Event):
+        """Stop event that advances the clock past the site interval on every sleep"""
+
+        def __init__(self, sleeps):
+            super().__init__()
+            self.sleeps = sleeps
+            self.waited = 0
+
+        def wait(self, timeout=None):
+            self.waited += 1
+            now[0] += 120
+            if self.waited >= self.sleeps:
+                self.set()
+            return self.is_set()
+
+    site = {
+        "id": "feed",
+        "name": "Feed",
+        "url": "https://example.com",
+        "category": "AI",
+        "collector_type": "rss",
+        "collector_config": {"feed_url": "https://example.com/feed.xml", "check_interval_minutes": 1},
+        "enabled": True,
+    }
+    feed = MagicMock(status_code=200, headers={"ETag": '"E1"'})
+    feed.content = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>
+<item><title>Entry</title><link>https://example.com/1</link></item></channel></rss>"""
+    not_modified = MagicMock(status_code=304, headers={})
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        patch("src.collectors.rss_reader.get_session") as mock_get_session,
+        patch("src.collectors.base.get_host_limiter", return_value=HostLimiter(min_interval_seconds=0)),
+        patch(
+            "src.collect_and_deliver.CollectionScheduler", lambda **kwargs: CollectionScheduler(clock=lambda: now[0], **kwargs)
+        ),
+    ):
+        mock_get = mock_get_session.return_value.get
+        mock_get.side_effect = [feed, not_modified, not_modified]
+        storage = Storage(data_dir=tmpdir)
+        storage.save_site(site)
+        user_manager = MagicMock()
+        user_manager.get_subscribed_users.return_value = []
+
+        run_daemon(storage, user_manager, DiffDetector(), None, 2, 5, poll_seconds=60, stop_event=StopAfter(sleeps=3))
+
+    sent = [call.kwargs["headers"].get("If-None-Match") for call in mock_get.call_args_list]
+    assert sent == [None, '"E1"', '"E1"']
+
+
+def test_run_daemon_redelivers_items_whose_save_failed():
+    """Test that daemon mode treats items as new again after saving them failed"""
+    import tempfile
+    import threading
+    import time
+
+    from src.collect_and_deliver import run_daemon
+    from src.collect_scheduler import CollectionScheduler
+    from src.collectors.base import InformationItem
+    from src.diff_detector import DiffDetector
+    from src.storage import Storage
+
+    now = [time.time()]
+
+    class StopAfter(threading.Event):
+        """Stop event that advances the clock past the site interval on every sleep"""
+
+        def __init__(self, sleeps):
+            super().__init__()
+            self.sleeps = sleeps
+            self.waited = 0
+
+        def wait(self, timeout=None):
+            self.waited += 1
+            now[0] += 120
+            if self.waited >= self.sleeps:
+                self.set()
+            return self.is_set()
+
+    site = {
+        "id": "mail",
+        "name": "Mail",
+        "url": "https://example.com",
+        "category": "AI",
+        "collector_type": "rss",
+        "collector_config": {"feed_url": "https://example.com/feed.xml", "check_interval_minutes": 1},
+        "enabled": True,
+    }
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        patch("src.collect_and_deliver.RSSReaderCollector") as mock_collector_class,
+        patch(
+            "src.collect_and_deliver.CollectionScheduler", lambda **kwargs: CollectionScheduler(clock=lambda: now[0], **kwargs)
+        ),
+    ):
+        collector = MagicMock(last_error=None)
+        # The uncommitted checkpoint makes the collector return the same item again
+        collector.collect.side_effect = lambda site: [
+            InformationItem(title="Mail", url="https://example.com/1", site_id="mail", site_name="Mail", category="AI")
+        ]
+        collector.record_check.return_value = None
+        mock_collector_class.return_value = collector
+        storage = Storage(data_dir=tmpdir)
+        storage.save_site(site)
+        user_manager = MagicMock()
+        user_manager.get_subscribed_users.return_value = []
+
+        with patch.object(storage, "append_information_items", side_effect=[False, True]) as append:
+            run_daemon(storage, user_manager, DiffDetector(), None, 2, 5, poll_seconds=60, stop_event=StopAfter(sleeps=2))
+
+    assert [[item["url"] for item in call.args[0]] for call in append.call_args_list] == [
+        ["https://example.com/1"],
+        ["https://example.com/1"],
+    ]
+    collector.commit_collection.assert_called_once_with("mail")
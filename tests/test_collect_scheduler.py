@@ -0,0 +1,141 @@
+"""Collection scheduler tests"""
+
+from datetime import datetime, timedelta
+
+from src.collect_scheduler import AdaptiveIntervalPolicy, CircuitBreaker, CollectionScheduler
+
+
+def _site(site_id, interval_minutes):
+    return {"id": site_id, "collector_config": {"check_interval_minutes": interval_minutes}}
+
+
+class TestCollectionScheduler:
+    """CollectionScheduler tests"""
+
+    def test_sites_become_due_by_interval(self):
+        """Test sites are popped when due and rescheduled one interval later"""
+        now = [1_000_000.0]
+        scheduler = CollectionScheduler(clock=lambda: now[0])
+        last = {"hourly": datetime.fromtimestamp(now[0] - 30 * 60)}
+        scheduler.sync([_site("fast", 10), _site("hourly", 60)], last.get)
+
+        # Never-collected sites are due immediately, others one interval after their last collection
+        assert [site["id"] for site in scheduler.pop_due()] == ["fast"]
+        assert scheduler.seconds_until_next() == 30 * 60
+
+        scheduler.reschedule(_site("fast", 10))
+        assert scheduler.seconds_until_next() == 10 * 60
+
+        now[0] += 30 * 60
+        assert [site["id"] for site in scheduler.pop_due()] == ["fast", "hourly"]
+        assert scheduler.seconds_until_next() is None
+
+    def test_sync_keeps_due_times_and_drops_removed_sites(self):
+        """Test reloading the configuration keeps existing deadlines and forgets removed sites"""
+        now = [1_000_000.0]
+        scheduler = CollectionScheduler(clock=lambda: now[0])
+        scheduler.sync([_site("a", 10), _site("b", 10)], lambda site_id: None)
+        scheduler.pop_due()
+        scheduler.reschedule(_site("a", 10))
+        scheduler.reschedule(_site("b", 10))
+
+        # Interval changes apply from the next reschedule; removed sites are no longer returned
+        scheduler.sync([_site("a", 5), _site("c", 5)], lambda site_id: None)
+        assert [site["id"] for site in scheduler.pop_due()] == ["c"]
+
+        now[0] += 10 * 60
+        assert [site["id"] for site in scheduler.pop_due()] == ["a"]
+        assert set(scheduler.next_due()) == set()
+
+    def test_open_circuit_delays_due_time(self):
+        """Test a site is not due before its circuit's open period ends"""
+        now = [1_000_000.0]
+        scheduler = CollectionScheduler(clock=lambda: now[0])
+        retry_at = {"dead": datetime.fromtimestamp(now[0] + 120 * 60)}
+        scheduler.sync([_site("dead", 10), _site("ok", 10)], lambda site_id: None, retry_at.get)
+        assert [site["id"] for site in scheduler.pop_due()] == ["ok"]
+
+        scheduler.reschedule(_site("ok", 10), not_before=datetime.fromtimestamp(now[0] + 60 * 60))
+        assert scheduler.next_due()["ok"] == datetime.fromtimestamp(now[0] + 60 * 60)
+        assert scheduler.next_due()["dead"] == retry_at["dead"]
+
+
+class TestAdaptiveIntervalPolicy:
+    """AdaptiveIntervalPolicy tests"""
+
+    def test_interval_follows_new_item_rate(self):
+        """Test busy sites tighten to the lower bound and quiet sites relax gradually to the upper bound"""
+        policy = AdaptiveIntervalPolicy(min_minutes=15, max_minutes=240)
+        site = _site("news", 60)
+        start = datetime(2026, 10, 1, 0, 0)
+
+        # 12 new items in an hour -> one item every 5 minutes, clamped to the lower bound
+        site["schedule"] = policy.update(site, 12, now=start)
+        assert policy.interval_minutes(site) == 15
+
+        # No new items for three days: the interval at most doubles per check until it reaches the upper bound
+        now = start
+        intervals = [policy.interval_minutes(site)]
+        while now < start + timedelta(days=3):
+            now += timedelta(minutes=policy.interval_minutes(site))
+            site["schedule"] = policy.update(site, 0, now=now)
+            intervals.append(policy.interval_minutes(site))
+
+        assert intervals == sorted(intervals)
+        assert all(later <= 2 * earlier for earlier, later in zip(intervals, intervals[1:]))
+        assert intervals[-1] == 240
+        assert site["schedule"]["recent_new_counts"] == [0] * 10
+
+    def test_site_bounds_and_disabled_policy(self):
+        """Test per-site bounds override the defaults and a disabled policy keeps the configured interval"""
+        site = _site("weekly", 60)
+        site["collector_config"]["max_check_interval_minutes"] = 120
+        site["schedule"] = {"interval_minutes": 1440}
+
+        assert AdaptiveIntervalPolicy().interval_minutes(site) == 120
+        assert AdaptiveIntervalPolicy(enabled=False).interval_minutes(site) == 60
+
+    def test_from_env_is_opt_in(self, monkeypatch):
+        """Test adaptive intervals stay off unless COLLECT_ADAPTIVE_INTERVALS=true"""
+        site = _site("weekly", 60)
+        site["schedule"] = {"interval_minutes": 1440}
+
+        monkeypatch.delenv("COLLECT_ADAPTIVE_INTERVALS", raising=False)
+        assert AdaptiveIntervalPolicy.from_env().interval_minutes(site) == 60
+
+        monkeypatch.setenv("COLLECT_ADAPTIVE_INTERVALS", "true")
+        assert AdaptiveIntervalPolicy.from_env().interval_minutes(site) == 1440
+
+
+class TestCircuitBreaker:
+    """CircuitBreaker tests"""
+
+    def test_backoff_doubles_after_threshold(self):
+        """Test the circuit opens at the threshold and the wait doubles up to the cap"""
+        breaker = CircuitBreaker(failure_threshold=3, base_backoff_minutes=60, max_backoff_minutes=180)
+        now = datetime(2026, 1, 1)
+        health = None
+        waits = []
+        for _ in range(6):
+            health = breaker.record_failure(health, "timeout", now)
+            open_until = breaker.open_until(health)
+            waits.append((open_until - now).total_seconds() / 60 if open_until else 0)
+
+        assert waits == [0, 0, 60, 120, 180, 180]
+        assert health["consecutive_failures"] == 6
+        assert health["first_failure_at"] == now.isoformat()
+        assert health["last_error"] == "timeout"
+
+    def test_state_transitions(self):
+        """Test a closed circuit opens, then becomes half-open when the wait has passed"""
+        breaker = CircuitBreaker(failure_threshold=1, base_backoff_minutes=30)
+        now = datetime(2026, 1, 1)
+
+        assert breaker.state(None, now) == CircuitBreaker.CLOSED
+        health = breaker.record_failure(None, "HTTP 500", now)
+        assert breaker.state(health, now + timedelta(minutes=29)) == CircuitBreaker.OPEN
+        assert breaker.state(health, now + timedelta(minutes=30)) == CircuitBreaker.HALF_OPEN
+
+        # A failed probe reopens the circuit for twice as long
+        health = breaker.record_failure(health, "HTTP 500", now + timedelta(minutes=30))
+        assert breaker.open_until(health) == now + timedelta(minutes=90)
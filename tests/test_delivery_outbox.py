@@ -0,0 +1,136 @@
+"""DeliveryOutboxクラスのテスト"""
+
+import tempfile
+
+from src.delivery_outbox import DeliveryOutbox
+from src.storage import Storage
+
+
+class FakeNotifier:
+    """ステータスコードを順に返す送信スタブ"""
+
+    def __init__(self, status_codes):
+        self.status_codes = list(status_codes)
+        self.last_status_code = None
+        self.calls = []
+
+    def _send(self, kind, to, retry_key, text):
+        self.calls.append((kind, to, retry_key, text))
+        self.last_status_code = self.status_codes.pop(0) if self.status_codes else 200
+        return self.last_status_code == 200
+
+    def send_multicast(self, user_ids, text, retry_key=None):
+        return self._send("multicast", user_ids, retry_key, text)
+
+    def send_text_message(self, user_id, text, retry_key=None):
+        return self._send("push", user_id, retry_key, text)
+
+
+class TestDeliveryOutbox:
+    """DeliveryOutboxクラスのテスト"""
+
+    def test_enqueue_is_idempotent(self):
+        """同じメッセージの再登録を無視するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outbox = DeliveryOutbox(Storage(data_dir=tmpdir))
+            user_ids = [f"U{i}" for i in range(501)]
+
+            assert outbox.enqueue_multicast("AI", user_ids, "text", "AI|url") == 2
+            assert outbox.enqueue_multicast("AI", user_ids, "text", "AI|url") == 0
+
+            # 再起動後も保存済みのジョブを読み込む
+            assert len(DeliveryOutbox(Storage(data_dir=tmpdir)).pending_jobs()) == 2
+
+    def test_process_retries_and_resumes(self):
+        """レート制限時に次回実行へ持ち越し、同じリトライキーで再送するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outbox = DeliveryOutbox(Storage(data_dir=tmpdir), max_attempts_per_run=2, sleep=lambda seconds: None)
+            outbox.enqueue_multicast("AI", ["U1", "U2"], "text", "AI|url")
+
+            notifier = FakeNotifier([429, 429])
+            assert outbox.process(notifier) == {"failed": 0, "pending": 1}
+            assert outbox.pending_jobs() == []  # バックオフ中
+
+            # 次回実行（バックオフ経過後）: 既に受理済みなら409が返る
+            resumed = DeliveryOutbox(Storage(data_dir=tmpdir))
+            resumed.jobs[0]["next_attempt_at"] = None
+            assert resumed.process(FakeNotifier([409])) == {"failed": 0, "pending": 0}
+            assert resumed.jobs == []
+
+            retry_keys = {call[2] for call in notifier.calls}
+            assert len(retry_keys) == 1
+
+    def test_rejected_multicast_falls_back_to_push(self):
+        """Multicastが拒否された場合に個別送信へ切り替えるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outbox = DeliveryOutbox(Storage(data_dir=tmpdir), sleep=lambda seconds: None)
+            outbox.enqueue_multicast("AI", ["U1", "U2"], "text", "AI|url")
+
+            notifier = FakeNotifier([400, 200, 400])
+            assert outbox.process(notifier) == {"failed": 1, "pending": 0}
+            assert [call[:2] for call in notifier.calls] == [("multicast", ["U1", "U2"]), ("push", "U1"), ("push", "U2")]
+
+    def test_exhausted_multicast_falls_back_to_push(self):
+        """サーバーエラーが続いて試行回数を使い切ったMulticastも個別送信へ切り替えるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outbox = DeliveryOutbox(
+                Storage(data_dir=tmpdir), max_attempts=2, max_attempts_per_run=2, sleep=lambda seconds: None
+            )
+            outbox.enqueue_multicast("AI", ["U1", "U2"], "text", "AI|url")
+
+            notifier = FakeNotifier([500, 500])
+            assert outbox.process(notifier) == {"failed": 0, "pending": 0}
+            assert [call[:2] for call in notifier.calls] == [
+                ("multicast", ["U1", "U2"]),
+                ("multicast", ["U1", "U2"]),
+                ("push", "U1"),
+                ("push", "U2"),
+            ]
+
+    def test_fallback_jobs_share_one_message_and_saves_are_batched(self):
+        """個別送信ジョブがメッセージ本文を共有し、保存がジョブごとではなくまとめて行われるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            outbox = DeliveryOutbox(storage, save_every_jobs=100, sleep=lambda seconds: None)
+            user_ids = [f"U{i}" for i in range(250)]
+            outbox.enqueue_multicast("AI", user_ids, "text", "AI|url")
+
+            saves = []
+            original_save = storage.save_delivery_jobs
+            storage.save_delivery_jobs = lambda jobs, messages: saves.append(len(jobs)) or original_save(jobs, messages)
+
+            # Multicastが拒否され、250件の個別送信のうち最初の1件は送信できない
+            notifier = FakeNotifier([400, 400])
+            outbox.process(notifier)
+
+            assert len(notifier.calls) == 251
+            # 251ジョブを処理して、途中で2回・最後に1回だけ保存する
+            assert len(saves) == 3
+
+            saved = storage.load_delivery_jobs()
+            assert [job["to"] for job in saved["jobs"]] == ["U0"]
+            assert "text" not in saved["jobs"][0]
+            assert list(saved["messages"].values()) == ["text"]
+
+    def test_loads_jobs_with_inline_text(self):
+        """メッセージ本文をジョブごとに持つ以前の形式のジョブを再開できるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            legacy_job = {
+                "id": "J1",
+                "type": "push",
+                "retry_key": "6f1c2a8e-3b7d-4d0a-9a3e-5c4b2f1e8d71",
+                "to": "U1",
+                "text": "old",
+                "category": "AI",
+                "status": "pending",
+                "attempts": 0,
+                "created_at": "2026-01-01T00:00:00",
+                "next_attempt_at": None,
+                "last_error": None,
+            }
+            storage.save_json("delivery_outbox.json", {"jobs": [legacy_job]})
+
+            notifier = FakeNotifier([200])
+            assert DeliveryOutbox(storage).process(notifier) == {"failed": 0, "pending": 0}
+            assert notifier.calls == [("push", "U1", legacy_job["retry_key"], "old")]
@@ -0,0 +1,33 @@
+"""DiffDetectorクラスのテスト"""
+
+from src.collectors.base import InformationItem
+from src.diff_detector import DiffDetector
+
+
+def _item(url: str, content_hash: str = None) -> InformationItem:
+    return InformationItem(title="title", url=url, category="AI", site_id="site", site_name="Site", content_hash=content_hash)
+
+
+class TestDiffDetector:
+    """DiffDetectorクラスのテスト"""
+
+    def test_detect_new_items(self):
+        """URL・ハッシュによる重複除外テスト"""
+        detector = DiffDetector()
+        stored = [{"url": "https://example.com/1", "content_hash": "h1"}]
+        collected = [_item("https://example.com/1"), _item("https://example.com/2", "h1"), _item("https://example.com/3")]
+
+        new_items = detector.detect_new_items(collected, stored)
+        assert [item.url for item in new_items] == ["https://example.com/3"]
+
+    def test_filter_new_items_updates_index(self):
+        """インデックスの差分更新テスト"""
+        detector = DiffDetector()
+        index = detector.build_index([])
+
+        first = detector.filter_new_items([_item("https://example.com/1", "h1")], index)
+        second = detector.filter_new_items([_item("https://example.com/1"), _item("https://example.com/2", "h1")], index)
+
+        assert len(first) == 1
+        assert second == []
+        assert len(index) == 1
@@ -0,0 +1,331 @@
+"""EmailCollectorクラスのテスト"""
+
+import email
+import socket
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.collectors.email_collector import EmailCollector
+from src.collectors.host_limiter import HostLimiter
+from src.collectors.imap_pool import ImapSessionPool
+from src.http_client import get_timeout
+from src.storage import Storage
+
+ACCOUNT = {"id": "gmail", "imap_server": "imap.example.com", "username": "user@example.com", "password": "secret"}
+
+SITE = {
+    "id": "newsletter",
+    "name": "Newsletter",
+    "url": "https://example.com",
+    "category": "AI",
+    "collector_type": "email",
+    "collector_config": {"email_account_id": "gmail", "subscription_email": "user+news@example.com"},
+    "enabled": True,
+}
+
+
+def _message(number: int, to: str = "user+news@example.com") -> bytes:
+    return (
+        f"Message-ID: <{number}@example.com>\r\nTo: {to}\r\nSubject: Issue {number}\r\n"
+        f'Content-Type: text/html\r\n\r\n<a href="https://example.com/{number}">Read</a>'
+    ).encode()
+
+
+class FakeIMAP:
+    """UID SEARCH / UID FETCH（ヘッダー・BODYSTRUCTURE・パート）だけを扱うテスト用IMAPサーバー"""
+
+    def __init__(self, messages: dict, uidvalidity: int = 1, unseen: set = None):
+        self.messages = messages
+        self.uidvalidity = uidvalidity
+        self.unseen = set(messages) if unseen is None else unseen
+        self.structures = {}
+        self.sections = {}
+        self.searches = []
+        self.fetches = []
+        self.logins = 0
+        self.shutdowns = 0
+        self.connect_kwargs = []
+        self.fail_next_fetch = None
+
+    @property
+    def fetched(self):
+        """本文（パート）を取得したUID"""
+        return [
+            uid
+            for items, uids in self.fetches
+            if "BODY.PEEK[HEADER" not in items and "BODYSTRUCTURE" not in items
+            for uid in uids
+        ]
+
+    def __call__(self, *args, **kwargs):
+        self.connect_kwargs.append(kwargs)
+        return self
+
+    def login(self, username, password):
+        self.logins += 1
+        return "OK", [b"logged in"]
+
+    def noop(self):
+        return "OK", [b"NOOP completed"]
+
+    def status(self, mailbox, names):
+        uidnext = max(self.messages, default=0) + 1
+        return "OK", [f'"{mailbox}" (UIDVALIDITY {self.uidvalidity} UIDNEXT {uidnext})'.encode()]
+
+    def select(self, mailbox):
+        return "OK", [str(len(self.messages)).encode()]
+
+    @staticmethod
+    def _uids(message_set):
+        uids = []
+        for part in message_set.split(","):
+            start, _, end = part.partition(":")
+            uids.extend(range(int(start), int(end or start) + 1))
+        return uids
+
+    def uid(self, command, *args):
+        if command == "SEARCH":
+            criteria = args[1:]
+            self.searches.append(criteria)
+            if criteria[0] == "UID":
+                low = int(criteria[1].split(":")[0])
+                # 実際のサーバーと同様、該当がなくても最後のメールを返す
+                uids = [uid for uid in self.messages if uid >= low] or [max(self.messages)]
+            else:
+                uids = sorted(self.unseen)
+            return "OK", [" ".join(str(uid) for uid in uids).encode()]
+
+        if self.fail_next_fetch is not None:
+            error, self.fail_next_fetch = self.fail_next_fetch, None
+            raise error
+
+        message_set, items = args
+        uids = [uid for uid in self._uids(message_set) if uid in self.messages]
+        self.fetches.append((items, uids))
+        data = []
+        for uid in uids:
+            raw = self.messages[uid]
+            head, _, body = raw.partition(b"\r\n\r\n")
+            if "BODYSTRUCTURE" in items:
+                structure = self.structures.get(uid, b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 10 1 NIL NIL NIL)')
+                data.append(f"{uid} (UID {uid} BODYSTRUCTURE ".encode() + structure + b")")
+                continue
+            if "HEADER.FIELDS" in items:
+                literal = b"\r\n".join(line for line in head.split(b"\r\n") if not line.startswith(b"Content-")) + b"\r\n\r\n"
+            elif "BODY.PEEK[]" in items:
+                literal = raw
+            else:
+                section = items.split("[")[1].split("]")[0]
+                literal = self.sections.get((uid, section), body)
+            data.extend([(f"{uid} (UID {uid} BODY[...] {{{len(literal)}}}".encode(), literal), b")"])
+        return "OK", data
+
+    def close(self):
+        return "OK", []
+
+    def logout(self):
+        return "BYE", []
+
+    def shutdown(self):
+        self.shutdowns += 1
+
+
+@pytest.fixture(autouse=True)
+def no_host_spacing():
+    """テスト間でホストごとの接続間隔待ちが発生しないようにする"""
+    with patch("src.collectors.base.get_host_limiter", return_value=HostLimiter(min_interval_seconds=0)):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    """テストごとに新しいIMAP接続プールを使い、時刻を進められるようにする"""
+    now = [0.0]
+    with patch("src.collectors.email_collector.get_imap_pool", return_value=ImapSessionPool(clock=lambda: now[0])):
+        yield now
+
+
+def _collect(storage: Storage, site: dict) -> list:
+    """収集して、新着の保存後と同じように取得位置を確定する"""
+    collector = EmailCollector(storage)
+    items = collector.collect(site)
+    assert collector.commit_collection(site["id"]) is True
+    return items
+
+
+def _storage(tmpdir: str) -> Storage:
+    storage = Storage(data_dir=tmpdir)
+    storage.save_email_accounts([ACCOUNT])
+    storage.save_site(SITE)
+    return storage
+
+
+class TestEmailCollector:
+    """EmailCollectorクラスのテスト"""
+
+    def test_fetches_only_new_uids(self, clock):
+        """2回目以降は前回の最大UIDより新しいメールだけを取得するテスト"""
+        server = FakeIMAP({1: _message(1), 2: _message(2)}, unseen={2})
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+
+            # 初回は未読メールだけ
+            items = _collect(storage, SITE)
+            assert [item.url for item in items] == ["https://example.com/2"]
+            assert server.searches[-1][0] == "UNSEEN"
+
+            # 新着なし（"UID 3:*" が最後のメールを返しても取得しない）
+            server.fetches.clear()
+            assert _collect(storage, SITE) == []
+            assert server.searches[-1][:2] == ("UID", "3:*")
+            assert server.fetched == []
+
+            server.messages[3] = _message(3)
+            clock[0] += 120
+            items = _collect(storage, SITE)
+            assert [item.url for item in items] == ["https://example.com/3"]
+            assert server.fetched == [3]
+
+            saved = storage.load_email_sync_state()
+            assert saved["checkpoints"]["gmail/INBOX"]["last_uid"] == {"newsletter": 3}
+            assert saved["message_ids"] == ["<2@example.com>", "<3@example.com>"]
+
+    def test_uidvalidity_change_resets_checkpoint(self):
+        """UIDVALIDITYが変わると取得位置を破棄し、処理済みMessage-IDで重複を除外するテスト"""
+        server = FakeIMAP({1: _message(1)})
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            assert len(_collect(storage, SITE)) == 1
+
+            # メールボックスが作り直されてUIDが振り直された
+            server.messages = {1: _message(1), 2: _message(2)}
+            server.uidvalidity = 2
+            server.unseen = {1, 2}
+            items = _collect(storage, SITE)
+
+            assert server.searches[-1][0] == "UNSEEN"
+            assert [item.url for item in items] == ["https://example.com/2"]
+            assert storage.load_email_sync_state()["checkpoints"]["gmail/INBOX"]["uidvalidity"] == 2
+
+    def test_sites_share_one_session_and_search(self, clock):
+        """同じアカウントのサイトが1つの接続と1回の検索を共有し、ローカルで振り分けられるテスト"""
+        other = {
+            **SITE,
+            "id": "digest",
+            "collector_config": {**SITE["collector_config"], "subscription_email": "user+digest@example.com"},
+        }
+        server = FakeIMAP({1: _message(1)}, unseen=set())
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            storage.save_site(other)
+
+            # 初回（未読なし）で取得位置を作る
+            assert _collect(storage, SITE) == []
+            assert _collect(storage, other) == []
+
+            server.messages.update({2: _message(2), 3: _message(3, to="user+digest@example.com"), 4: _message(4, to="me@x")})
+            clock[0] += 120
+            server.searches.clear()
+
+            news = _collect(storage, SITE)
+            digest = _collect(storage, other)
+
+            assert [item.url for item in news] == ["https://example.com/2"]
+            assert [item.url for item in digest] == ["https://example.com/3"]
+            assert server.logins == 1
+            assert server.searches == [("UID", "2:*", 'OR TO "user+news@example.com" TO "user+digest@example.com"')]
+
+    def test_uncommitted_collection_is_fetched_again(self, clock):
+        """取得位置を確定しなかった（保存前に破棄された）収集のメールを次回もう一度取得するテスト"""
+        server = FakeIMAP({1: _message(1)}, unseen=set())
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            assert _collect(storage, SITE) == []
+
+            server.messages[2] = _message(2)
+            clock[0] += 120
+            # 収集結果が破棄された（タイムアウトや保存の失敗）
+            assert [item.url for item in EmailCollector(storage).collect(SITE)] == ["https://example.com/2"]
+            assert storage.load_email_sync_state()["message_ids"] == []
+
+            clock[0] += 120
+            assert [item.url for item in _collect(storage, SITE)] == ["https://example.com/2"]
+            assert storage.load_email_sync_state()["checkpoints"]["gmail/INBOX"]["last_uid"] == {"newsletter": 2}
+
+    def test_socket_error_drops_the_connection(self, clock):
+        """タイムアウトを指定して接続し、応答待ちのタイムアウト後は接続を閉じて次回ログインし直すテスト"""
+        server = FakeIMAP({1: _message(1)}, unseen=set())
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            assert _collect(storage, SITE) == []
+            assert server.connect_kwargs == [{"timeout": get_timeout()}]
+
+            server.messages[2] = _message(2)
+            server.fail_next_fetch = socket.timeout("timed out")
+            clock[0] += 120
+            collector = EmailCollector(storage)
+            assert collector.collect(SITE) == []
+            assert "timed out" in collector.last_error
+            assert server.shutdowns == 1
+
+            clock[0] += 120
+            assert [item.url for item in _collect(storage, SITE)] == ["https://example.com/2"]
+            assert server.logins == 2
+
+    def test_fetches_headers_first_and_only_the_text_part(self):
+        """ヘッダーをまとめて取得して重複を除外し、添付ファイルを除く本文パートだけを取得するテスト"""
+        server = FakeIMAP({1: _message(1), 2: _message(2), 3: _message(3)})
+        server.structures[3] = (
+            b'(("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 4 1 NIL NIL NIL)'
+            b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "BASE64" 48 1 NIL NIL NIL)'
+            b'("APPLICATION" "PDF" ("NAME" "a.pdf") NIL NIL "BASE64" 999999 NIL ("ATTACHMENT" ("FILENAME" "a.pdf")) NIL)'
+            b' "MIXED" ("BOUNDARY" "b0") NIL NIL)'
+        )
+        server.sections[(3, "2")] = b"PGEgaHJlZj0iaHR0cHM6Ly9leGFtcGxlLmNvbS9wZGYiPlBERjwvYT4=\r\n"
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            EmailCollector(storage).sync_state.mark_processed(["<1@example.com>"])
+
+            items = EmailCollector(storage).collect(SITE)
+
+        assert [item.url for item in items] == ["https://example.com/2", "https://example.com/pdf"]
+        header_fetches = [uids for items, uids in server.fetches if "HEADER.FIELDS" in items]
+        assert header_fetches == [[1, 2, 3]]
+        assert ("(UID BODY.PEEK[1])", [2]) in server.fetches
+        assert ("(UID BODY.PEEK[2])", [3]) in server.fetches
+        assert all("BODY.PEEK[3]" not in items and "BODY.PEEK[]" not in items for items, _ in server.fetches)
+
+    def test_summaries_only_for_new_items_and_cached(self):
+        """要約は重複除外の後に新着だけ生成し、同じ本文はキャッシュを使うテスト"""
+        site = {**SITE, "collector_config": {**SITE["collector_config"], "summary_enabled": True}}
+        server = FakeIMAP({1: _message(1), 2: _message(2)})
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch("src.collectors.email_collector.imaplib.IMAP4_SSL", server):
+            storage = _storage(tmpdir)
+            collector = EmailCollector(storage)
+
+            with patch.object(EmailCollector, "_request_summary", return_value="要約") as request_summary:
+                items = collector.collect(site)
+                assert [item.summary for item in items] == [None, None]
+                request_summary.assert_not_called()
+
+                # 1件目は既存と重複したとして、新着の2件目だけ要約する
+                collector.prepare_new_items(site, items[1:])
+                assert items[1].summary == "要約"
+                assert items[0].summary is None
+                assert request_summary.call_count == 1
+
+                # 同じ本文は別の実行でもキャッシュから返す
+                other = EmailCollector(storage)
+                item = other._parse_email_to_item(email.message_from_bytes(server.messages[2]), site)
+                other.prepare_new_items(site, [item])
+                assert item.summary == "要約"
+                assert request_summary.call_count == 1
@@ -0,0 +1,48 @@
+"""EmailDocumentクラスのテスト"""
+
+from unittest.mock import patch
+
+from src.collectors import email_document
+from src.collectors.email_document import EmailDocument
+
+HTML = """<html><head><title>Weekly News</title></head><body>
+<h2>This week's top stories</h2>
+<p>Read <a href="https://example.com/1">the first</a> and <a href="/relative">more</a>.</p>
+</body></html>"""
+
+
+class TestEmailDocument:
+    """EmailDocumentクラスのテスト"""
+
+    def test_parses_once_for_links_title_and_text(self):
+        """リンク・タイトル・テキストを1回のパースで取得するテスト"""
+        with patch.object(email_document, "BeautifulSoup", wraps=email_document.BeautifulSoup) as soup:
+            document = EmailDocument(HTML)
+
+            assert document.links == ["https://example.com/1"]
+            assert document.title == "Weekly News"
+            assert "Read the first and more ." in document.text
+            assert soup.call_count == 1
+
+    def test_falls_back_to_html_parser(self):
+        """高速なパーサーが使えない場合に html.parser でパースするテスト"""
+        document = EmailDocument(HTML, parser="no-such-parser")
+
+        assert document.links == ["https://example.com/1"]
+        assert document.soup is not None
+
+    def test_parser_is_html_parser_unless_configured(self, monkeypatch):
+        """lxml がインストールされていても、設定しない限り html.parser を使うテスト"""
+        monkeypatch.delenv("EMAIL_HTML_PARSER", raising=False)
+        assert EmailDocument(HTML).parser == "html.parser"
+
+        monkeypatch.setenv("EMAIL_HTML_PARSER", "lxml")
+        assert EmailDocument(HTML).parser == "lxml"
+        assert EmailDocument(HTML).links == ["https://example.com/1"]
+
+    def test_plain_text_and_empty_body(self):
+        """テキストのみ・空の本文を扱えるテスト"""
+        assert EmailDocument("").links == []
+        assert EmailDocument("").title is None
+        assert EmailDocument(None).text == ""
+        assert EmailDocument("See https://example.com/a").text == "See https://example.com/a"
@@ -0,0 +1,66 @@
+"""EventDeduplicator tests"""
+
+import tempfile
+
+from src.event_dedup import EventDeduplicator
+from src.storage import Storage
+
+
+def _event(event_id, is_redelivery=False):
+    return {"type": "follow", "webhookEventId": event_id, "deliveryContext": {"isRedelivery": is_redelivery}}
+
+
+class TestEventDeduplicator:
+    """EventDeduplicator tests"""
+
+    def test_skips_redelivered_event(self):
+        """Test a redelivered copy of a processed event is skipped"""
+        dedup = EventDeduplicator()
+
+        assert not dedup.is_duplicate(_event("evt1"))
+        assert dedup.is_duplicate(_event("evt1", is_redelivery=True))
+        assert not dedup.is_duplicate(_event("evt2"))
+        assert dedup.skipped == 1
+
+    def test_forget_allows_redelivery(self):
+        """処理に失敗したイベントを忘れると再送を処理できるテスト"""
+        dedup = EventDeduplicator()
+
+        assert not dedup.is_duplicate(_event("evt1"))
+        dedup.forget(_event("evt1"))
+        assert not dedup.is_duplicate(_event("evt1", is_redelivery=True))
+        assert dedup.is_duplicate(_event("evt1", is_redelivery=True))
+
+    def test_event_without_id_is_processed(self):
+        """Test events without webhookEventId are never treated as duplicates"""
+        dedup = EventDeduplicator()
+
+        assert not dedup.is_duplicate({"type": "follow"})
+        assert not dedup.is_duplicate({"type": "follow"})
+
+    def test_ttl_and_capacity(self):
+        """Test entries expire after the TTL and the oldest are evicted beyond max_entries"""
+        now = [1000.0]
+        dedup = EventDeduplicator(ttl_seconds=60, max_entries=2, clock=lambda: now[0])
+
+        dedup.is_duplicate(_event("evt1"))
+        dedup.is_duplicate(_event("evt2"))
+        dedup.is_duplicate(_event("evt3"))
+        assert len(dedup) == 2
+        assert not dedup.is_duplicate(_event("evt1"))
+
+        now[0] += 61
+        assert not dedup.is_duplicate(_event("evt3"))
+        assert len(dedup) == 1
+
+    def test_persisted_across_instances(self):
+        """Test seen event IDs survive a restart when persisted"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            dedup = EventDeduplicator(storage=storage, persist_interval_seconds=3600)
+            dedup.is_duplicate(_event("evt1"))
+            dedup.is_duplicate(_event("evt2"))
+            assert dedup.flush()
+
+            restarted = EventDeduplicator(storage=storage)
+            assert restarted.is_duplicate(_event("evt2", is_redelivery=True))
@@ -0,0 +1,53 @@
+"""EventQueue tests"""
+
+import threading
+import time
+
+from src.event_queue import EventQueue
+
+
+class TestEventQueue:
+    """EventQueue tests"""
+
+    def test_same_key_runs_in_order(self):
+        """Test events with the same key are processed sequentially in order"""
+        queue = EventQueue(workers=4)
+        results = []
+
+        def handler(value):
+            time.sleep(0.01 if value == 0 else 0)
+            results.append(value)
+
+        for value in range(5):
+            assert queue.submit("user1", handler, value)
+
+        assert queue.join(timeout=5)
+        assert results == [0, 1, 2, 3, 4]
+
+    def test_full_queue_refuses(self):
+        """Test submit returns False once max_depth is reached"""
+        queue = EventQueue(workers=1, max_depth=1)
+        release = threading.Event()
+
+        assert queue.submit("user1", release.wait, 5)
+        assert not queue.submit("user2", lambda: None)
+        assert queue.depth() == 1
+
+        release.set()
+        assert queue.join(timeout=5)
+        assert queue.depth() == 0
+
+    def test_handler_errors_are_counted(self):
+        """Test failing handlers are counted without stopping the worker"""
+        queue = EventQueue(workers=1)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        queue.submit("user1", fail)
+        queue.submit("user1", lambda: None)
+        assert queue.join(timeout=5)
+
+        metrics = queue.metrics()
+        assert metrics["processed"] == 2
+        assert metrics["failed"] == 1
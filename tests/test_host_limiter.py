@@ -0,0 +1,55 @@
+"""HostLimiterクラスのテスト"""
+
+import threading
+import time
+
+from src.collectors.host_limiter import HostLimiter
+
+
+class TestHostLimiter:
+    """HostLimiterクラスのテスト"""
+
+    def test_limits_in_flight_per_host(self):
+        """同じホストへの同時リクエスト数が上限を超えないテスト"""
+        limiter = HostLimiter(max_in_flight=2, min_interval_seconds=0)
+        lock = threading.Lock()
+        current = {"in_flight": 0, "peak": 0}
+
+        def request():
+            with limiter.limit("https://feeds.example.com/a.xml"):
+                with lock:
+                    current["in_flight"] += 1
+                    current["peak"] = max(current["peak"], current["in_flight"])
+                time.sleep(0.05)
+                with lock:
+                    current["in_flight"] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert current["peak"] == 2
+        assert limiter.stats()["feeds.example.com"]["in_flight"] == 0
+
+    def test_min_interval_per_host(self):
+        """同じホストへのリクエスト開始間隔を空け、別ホストは待たないテスト"""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = HostLimiter(max_in_flight=4, min_interval_seconds=2.0, clock=lambda: now[0], sleep=sleep)
+
+        with limiter.limit("https://Feeds.Example.com/a.xml"):
+            pass
+        with limiter.limit("feeds.example.com"):
+            pass
+        with limiter.limit("imap.gmail.com"):
+            pass
+
+        assert sleeps == [2.0]
+        assert limiter.stats()["feeds.example.com"]["waited_seconds"] == 2.0
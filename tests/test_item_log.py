@@ -0,0 +1,64 @@
+"""ItemLogクラスのテスト"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from src.item_log import ItemLog
+from src.storage import Storage
+
+
+def _item(n: int) -> dict:
+    return {"id": f"site_{n}", "url": f"https://example.com/{n}", "scraped_at": f"2026-01-01T00:00:{n:02d}"}
+
+
+class TestItemLog:
+    """ItemLogクラスのテスト"""
+
+    def test_append_rotates_segments(self):
+        """セグメントのローテーションテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log = ItemLog(Path(tmpdir), segment_max_items=2)
+            for n in range(5):
+                log.append([_item(n)])
+
+            assert len(list(Path(tmpdir).glob("*.ndjson"))) == 3
+            assert [item["id"] for item in log.read_all()] == [f"site_{n}" for n in range(5)]
+
+    def test_compact_applies_retention(self):
+        """コンパクション時の保持件数テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log = ItemLog(Path(tmpdir), max_items=3, segment_max_items=2)
+            log.append([_item(n) for n in [4, 1, 3]])
+            log.append([_item(n) for n in [0, 2]])
+
+            assert log.compact() == 3
+            assert len(list(Path(tmpdir).glob("*.ndjson"))) == 1
+            # 新しい順に3件を残し、追記順は維持する
+            assert [item["id"] for item in log.read_all()] == ["site_4", "site_3", "site_2"]
+
+            log.append([_item(9)])
+            assert log.read_all()[-1]["id"] == "site_9"
+
+    def test_corrupt_line_is_skipped(self):
+        """書き込み途中の行をスキップするテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log = ItemLog(Path(tmpdir))
+            log.append([_item(1)])
+            with open(next(Path(tmpdir).glob("*.ndjson")), "a", encoding="utf-8") as f:
+                f.write('{"id": "broken"')
+
+            assert [item["id"] for item in log.read_all()] == ["site_1"]
+
+    def test_storage_migrates_legacy_items(self):
+        """information_items.jsonからの移行テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(Path(tmpdir) / "information_items.json", "w", encoding="utf-8") as f:
+                json.dump({"items": [_item(1), _item(2)]}, f)
+
+            storage = Storage(data_dir=tmpdir)
+            storage.append_information_items([_item(3)])
+
+            items = storage.load_information_items()["items"]
+            assert [item["id"] for item in items] == ["site_1", "site_2", "site_3"]
+            assert not (Path(tmpdir) / "information_items.json").exists()
@@ -0,0 +1,63 @@
+"""LineNotifierクラスのテスト"""
+
+import base64
+import hashlib
+import hmac
+from unittest.mock import MagicMock
+
+import requests
+
+from src.line_notifier import LineNotifier
+
+
+def _notifier(failing_urls: tuple = ()) -> LineNotifier:
+    """指定したAPIだけ失敗するセッションを持つLineNotifierを作成"""
+    session = MagicMock()
+
+    def post(url, **kwargs):
+        response = MagicMock()
+        if url in failing_urls:
+            response.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
+        return response
+
+    session.post.side_effect = post
+    return LineNotifier(channel_access_token="dummy_token", session=session)
+
+
+class TestLineNotifier:
+    """LineNotifierクラスのテスト"""
+
+    def test_send_multicast_chunks_recipients(self):
+        """500件を超える送信先を分割して送信するテスト"""
+        notifier = _notifier()
+        user_ids = [f"U{i}" for i in range(1201)]
+
+        assert notifier.send_multicast(user_ids, "hello") is True
+
+        sent = [call.kwargs["json"]["to"] for call in notifier.session.post.call_args_list]
+        assert [len(to) for to in sent] == [500, 500, 201]
+        assert sum(sent, []) == user_ids
+
+    def test_rate_limited_request_is_resent(self):
+        """429の場合にRetry-After後に再送するテスト"""
+        notifier = _notifier()
+        limited = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        limited.raise_for_status.side_effect = requests.HTTPError("429 Too Many Requests")
+        notifier.session.post.side_effect = [limited, MagicMock(status_code=200)]
+
+        assert notifier.send_text_message("U1", "hello") is True
+        assert notifier.session.post.call_count == 2
+        assert notifier.last_status_code == 200
+
+    def test_verify_signature(self):
+        """生のバイト列で署名を検証するテスト"""
+        notifier = LineNotifier(channel_access_token="dummy_token", channel_secret="secret", session=MagicMock())
+        body = '{"events": [{"message": {"text": "登録"}}]}'.encode("utf-8")
+        signature = base64.b64encode(hmac.new(b"secret", body, hashlib.sha256).digest()).decode("utf-8")
+
+        assert notifier.verify_signature(body, signature) is True
+        assert notifier.verify_signature(body.decode("utf-8"), signature) is True
+        # 事前計算したHMAC状態が検証で変化しないこと
+        assert notifier.verify_signature(body, signature) is True
+        assert notifier.verify_signature(body + b" ", signature) is False
+        assert notifier.verify_signature(body, "署名") is False
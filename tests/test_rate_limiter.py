@@ -0,0 +1,43 @@
+"""RateLimiterクラスのテスト"""
+
+import time
+
+from src.rate_limiter import RateLimiter, TokenBucket, parse_retry_after
+
+
+class TestRateLimiter:
+    """RateLimiterクラスのテスト"""
+
+    def test_token_bucket_paces_requests(self):
+        """バケットが空の場合に補充を待つテスト"""
+        bucket = TokenBucket(rate_per_second=50, capacity=1)
+
+        started_at = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        elapsed = time.monotonic() - started_at
+
+        # 1件目はバースト、残り5件は1/50秒ずつ待つ
+        assert elapsed >= 0.09
+        assert bucket.current_rate() > 0
+
+    def test_defer_pauses_endpoint(self):
+        """Retry-Afterによる一時停止テスト"""
+        limiter = RateLimiter({"push": 1000, "reply": 1000})
+        limiter.defer("push", 0.2)
+
+        assert limiter.acquire("reply") < 0.05
+        assert limiter.acquire("push") >= 0.15
+        # 制限のないエンドポイントは待たない
+        assert limiter.acquire("unknown") == 0.0
+
+        stats = limiter.stats()
+        assert stats["push"]["queue_depth"] == 0
+        assert stats["push"]["limit_per_second"] == 1000
+
+    def test_parse_retry_after(self):
+        """Retry-Afterヘッダーのパーステスト"""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) == 1.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("invalid", default=2.0) == 2.0
@@ -0,0 +1,137 @@
+"""RSSReaderCollectorクラスのテスト"""
+
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.collectors.host_limiter import HostLimiter
+from src.collectors.rss_reader import RSSReaderCollector
+from src.storage import Storage
+
+FEED_XML = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>Entry 1</title><link>https://example.com/1</link><description>Body</description></item>
+</channel></rss>"""
+
+SITE = {
+    "id": "test_site",
+    "name": "Test Site",
+    "url": "https://example.com",
+    "category": "AI",
+    "collector_type": "rss",
+    "collector_config": {"feed_url": "https://example.com/feed.xml"},
+    "enabled": True,
+}
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture(autouse=True)
+def no_host_spacing():
+    """テスト間でホストごとのリクエスト間隔待ちが発生しないようにする"""
+    with patch("src.collectors.base.get_host_limiter", return_value=HostLimiter(min_interval_seconds=0)):
+        yield
+
+
+class TestRSSReaderCollector:
+    """RSSReaderCollectorクラスのテスト"""
+
+    @patch("src.collectors.rss_reader.get_session")
+    def test_collect_records_validators(self, mock_get_session):
+        """取得したフィードのETag/Last-Modifiedを記録するテスト"""
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value = _response(200, FEED_XML, {"ETag": '"abc"', "Last-Modified": "Sat, 17 Oct 2026 00:00:00 GMT"})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_site(SITE)
+            collector = RSSReaderCollector(storage)
+
+            items = collector.collect(SITE)
+            assert [item.url for item in items] == ["https://example.com/1"]
+
+            assert collector.save_site_state("test_site") is True
+            state = storage.load_site("test_site")["collector_state"]
+            assert state == {"etag": '"abc"', "last_modified": "Sat, 17 Oct 2026 00:00:00 GMT"}
+
+    @patch("src.collectors.rss_reader.feedparser.parse")
+    @patch("src.collectors.rss_reader.get_session")
+    def test_not_modified_skips_parsing(self, mock_get_session, mock_parse):
+        """304 Not Modifiedの場合にパースしないテスト"""
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value = _response(304)
+        site = {**SITE, "collector_state": {"etag": '"abc"', "last_modified": None}}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            collector = RSSReaderCollector(Storage(data_dir=tmpdir))
+            assert collector.collect(site) == []
+
+        assert collector.not_modified is True
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+        assert "If-Modified-Since" not in mock_get.call_args.kwargs["headers"]
+        mock_parse.assert_not_called()
+
+    @patch("src.collectors.rss_reader.time.sleep")
+    @patch("src.collectors.rss_reader.get_session")
+    def test_failure_is_reported(self, mock_get_session, mock_sleep):
+        """取得失敗を last_error で通知し、サーキットが開いたサイトだけリトライしないテスト"""
+        import requests
+
+        from src.collect_scheduler import CircuitBreaker
+        from src.collectors.site_state import SiteStateCache
+
+        mock_get = mock_get_session.return_value.get
+        mock_get.side_effect = requests.exceptions.ConnectionError("refused")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_site(SITE)
+            site_state = SiteStateCache(storage, breaker=CircuitBreaker(failure_threshold=2))
+            collector = RSSReaderCollector(storage, site_state=site_state)
+
+            assert collector.collect(SITE) == []
+            assert "refused" in collector.last_error
+            assert mock_get.call_count == 3
+
+            # しきい値未満の1回の失敗では、次の収集でもリトライする
+            collector.record_failure("test_site", collector.last_error)
+            mock_get.reset_mock()
+            assert collector.collect(SITE) == []
+            assert mock_get.call_count == 3
+
+            # サーキットが開いた後の収集（再開時の試行）は1回だけ
+            collector.record_failure("test_site", collector.last_error)
+            mock_get.reset_mock()
+            mock_sleep.reset_mock()
+            assert collector.collect(SITE) == []
+            assert mock_get.call_count == 1
+            mock_sleep.assert_not_called()
+
+    @patch("src.collectors.rss_reader.time.sleep")
+    @patch("src.collectors.rss_reader.get_session")
+    def test_not_found_is_not_retried(self, mock_get_session, mock_sleep):
+        """404はリトライせず失敗として扱い、304は失敗にしないテスト"""
+        import requests
+
+        not_found = _response(404)
+        not_found.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found", response=not_found)
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value = not_found
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            collector = RSSReaderCollector(Storage(data_dir=tmpdir))
+            assert collector.collect(SITE) == []
+            assert mock_get.call_count == 1
+            assert collector.last_error
+            mock_sleep.assert_not_called()
+
+            mock_get.return_value = _response(304)
+            assert collector.collect(SITE) == []
+            assert collector.last_error is None
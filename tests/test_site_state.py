@@ -0,0 +1,155 @@
+"""SiteStateCacheクラスのテスト"""
+
+import tempfile
+from unittest.mock import patch
+
+from src.collectors.rss_reader import RSSReaderCollector
+from src.collectors.site_state import SiteStateCache
+from src.storage import Storage
+
+
+def _site(site_id: str) -> dict:
+    return {
+        "id": site_id,
+        "name": f"Site {site_id}",
+        "url": "https://example.com",
+        "category": "AI",
+        "collector_type": "rss",
+        "collector_config": {"feed_url": f"https://example.com/{site_id}.xml", "check_interval_minutes": 60},
+        "enabled": True,
+    }
+
+
+class TestSiteStateCache:
+    """SiteStateCacheクラスのテスト"""
+
+    def test_updates_are_buffered_until_flush(self):
+        """収集完了の記録が flush までまとめて保存されないテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_sites([_site("a"), _site("b")])
+            cache = SiteStateCache(storage)
+            collector = RSSReaderCollector(storage, site_state=cache)
+
+            assert collector.should_collect(_site("a")) is True
+
+            with patch.object(storage, "load_sites") as load_sites:
+                collector.update_site_state("a", etag='"v1"')
+                assert collector.mark_as_collected("a", []) is True
+                assert collector.commit_collection("a") is True
+                collector.update_site_state("b", etag='"v2"')
+                assert collector.save_site_state("b") is True
+                # 実行中はキャッシュから判定する
+                assert collector.should_collect(_site("a")) is False
+                load_sites.assert_not_called()
+
+            assert "last_collected_at" not in storage.load_site("a")
+            assert cache.has_pending_writes()
+
+            with patch.object(storage, "save_json", wraps=storage.save_json) as save_json:
+                assert cache.flush() is True
+                assert save_json.call_count == 1
+
+            site_a = storage.load_site("a")
+            assert site_a["last_collected_at"]
+            assert site_a["stats"] == {"total_collected": 0, "last_collected_count": 0}
+            assert site_a["collector_state"] == {"etag": '"v1"'}
+            assert storage.load_site("b")["collector_state"] == {"etag": '"v2"'}
+            assert not cache.has_pending_writes()
+
+    def test_flush_keeps_config_edited_during_run(self):
+        """実行中に編集された設定を flush で上書きしないテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_site(_site("a"))
+            cache = SiteStateCache(storage)
+
+            cache.record_collection("a", 3)
+            storage.save_site({**_site("a"), "name": "Renamed"})
+            cache.flush()
+
+            site = storage.load_site("a")
+            assert site["name"] == "Renamed"
+            assert site["stats"]["total_collected"] == 3
+
+    def test_unknown_site(self):
+        """存在しないサイトの記録が失敗するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SiteStateCache(Storage(data_dir=tmpdir))
+
+            assert cache.record_collection("missing", 1) is False
+            assert cache.get_last_collected_time("missing") is None
+
+    def test_record_check_sets_interval(self):
+        """新着件数の記録で収集間隔が決まり、新着がなくても収集間隔を守るテスト"""
+        from src.collect_scheduler import AdaptiveIntervalPolicy
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_site(_site("a"))
+            cache = SiteStateCache(storage, policy=AdaptiveIntervalPolicy(min_minutes=15, max_minutes=240))
+            collector = RSSReaderCollector(storage, site_state=cache)
+
+            assert collector.should_collect(_site("a")) is True
+            assert collector.record_check("a", 0) == 120
+            assert collector.should_collect(_site("a")) is False
+
+            cache.flush()
+            schedule = storage.load_site("a")["schedule"]
+            assert schedule["interval_minutes"] == 120
+            assert schedule["recent_new_counts"] == [0]
+
+    def test_circuit_opens_and_resets(self):
+        """連続失敗でサーキットが開き、成功で失敗状況がリセットされるテスト"""
+        from src.collect_scheduler import CircuitBreaker
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_sites([_site("a"), _site("b")])
+            cache = SiteStateCache(storage, breaker=CircuitBreaker(failure_threshold=2, base_backoff_minutes=60))
+            collector = RSSReaderCollector(storage, site_state=cache)
+
+            # しきい値未満の失敗では収集内のリトライを続ける
+            collector.record_failure("a", "タイムアウト")
+            assert collector.should_collect(_site("a")) is True
+            assert collector.fetch_attempts("a", 3) == 3
+            assert cache.open_circuits() == []
+
+            health = collector.record_failure("a", "タイムアウト")
+            assert health["consecutive_failures"] == 2
+            assert cache.get_circuit_state("a") == CircuitBreaker.OPEN
+            assert collector.should_collect(_site("a")) is False
+            assert collector.fetch_attempts("a", 3) == 1
+            assert [c["id"] for c in cache.open_circuits()] == ["a"]
+
+            cache.flush()
+            assert storage.load_site("a")["health"]["consecutive_failures"] == 2
+
+            # 再読み込みしても開いたまま。成功すれば閉じて保存からも消える
+            cache = SiteStateCache(storage, breaker=CircuitBreaker(failure_threshold=2))
+            assert cache.get_circuit_state("a") == CircuitBreaker.OPEN
+            assert cache.record_success("a") is True
+            assert cache.record_success("b") is True
+            cache.flush()
+            assert "health" not in storage.load_site("a")
+            assert cache.get_circuit_state("a") == CircuitBreaker.CLOSED
+
+    def test_failed_flush_keeps_updates_for_retry(self):
+        """保存に失敗したサイトの更新を破棄せず、次の flush で再試行するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_sites([_site("a"), _site("b")])
+            cache = SiteStateCache(storage)
+            cache.record_collection("a", 1)
+            cache.record_collection("b", 2)
+
+            original_save_site = storage.save_site
+            with patch.object(storage, "save_site", side_effect=lambda site: site["id"] != "a" and original_save_site(site)):
+                assert cache.flush() is False
+            assert cache.has_pending_writes()
+            assert "last_collected_at" not in storage.load_site("a")
+
+            assert cache.flush() is True
+            assert not cache.has_pending_writes()
+            assert storage.load_site("a")["stats"]["total_collected"] == 1
+            assert storage.load_site("b")["stats"]["total_collected"] == 2
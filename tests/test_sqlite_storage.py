@@ -0,0 +1,147 @@
+"""SQLiteStorageクラスのテスト"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage, create_storage
+
+TEST_SITE = {
+    "id": "test_site",
+    "name": "Test Site",
+    "url": "https://example.com",
+    "category": "AI",
+    "collector_type": "rss",
+    "collector_config": {"feed_url": "https://example.com/feed.xml", "check_interval_minutes": 60},
+    "enabled": False,
+}
+
+
+class TestSQLiteStorage:
+    """SQLiteStorageクラスのテスト"""
+
+    def test_user_row_operations(self):
+        """ユーザー単位の保存・読み込み・削除テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(data_dir=tmpdir)
+
+            assert storage.save_user({"user_id": "U1", "subscribed_categories": []}) is True
+            assert storage.save_user({"user_id": "U2", "subscribed_categories": ["AI"]}) is True
+            assert storage.save_user({"user_id": "U1", "subscribed_categories": ["SDGs"]}) is True
+
+            assert storage.load_user("U1")["subscribed_categories"] == ["SDGs"]
+            assert [u["user_id"] for u in storage.load_users()["users"]] == ["U1", "U2"]
+
+            assert storage.delete_user("U1") is True
+            assert storage.load_user("U1") is None
+            assert storage.load_users()["count"] == 1
+            storage.close()
+
+    def test_save_and_load_site(self):
+        """サイト設定の保存・読み込み・削除テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(data_dir=tmpdir)
+
+            assert storage.save_site(TEST_SITE) is True
+            assert storage.load_site("test_site")["name"] == "Test Site"
+
+            sites = storage.load_sites()["sites"]
+            assert len(sites) == 1
+            assert "updated_at" not in sites[0]
+
+            assert storage.delete_site("test_site") is True
+            assert storage.delete_site("test_site") is False
+            storage.close()
+
+    def test_batch_commits_sites_once(self):
+        """バッチ内のサイト保存が1トランザクションにまとまるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(data_dir=tmpdir)
+
+            with storage.batch():
+                storage.save_site(TEST_SITE)
+                storage.save_site({**TEST_SITE, "id": "test_site_2"})
+                assert storage._conn.in_transaction
+
+            assert not storage._conn.in_transaction
+            assert len(storage.load_sites()["sites"]) == 2
+            storage.close()
+
+    def test_user_writes_join_open_batch(self):
+        """バッチ内のユーザー・情報アイテムの書き込みが途中でコミットされないテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(data_dir=tmpdir)
+
+            with storage.batch():
+                storage.save_site(TEST_SITE)
+                writes = [
+                    lambda: storage.save_user({"user_id": "U1", "subscribed_categories": []}),
+                    lambda: storage.delete_user("U1"),
+                    lambda: storage.save_users([{"user_id": "U2", "subscribed_categories": []}]),
+                    lambda: storage.save_information_items([{"url": "https://example.com/1"}]),
+                    lambda: storage.append_information_items([{"url": "https://example.com/2"}]),
+                    storage.compact_information_items,
+                ]
+                for write in writes:
+                    assert write() is True
+                    assert storage._conn.in_transaction
+
+            assert not storage._conn.in_transaction
+            assert storage.load_site("test_site") is not None
+            storage.close()
+
+    def test_append_information_items(self):
+        """情報アイテムの追記テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(data_dir=tmpdir)
+
+            assert storage.save_information_items([{"url": "https://example.com/1"}]) is True
+            assert storage.append_information_items([{"url": "https://example.com/2"}]) is True
+
+            items = storage.load_information_items()["items"]
+            assert [item["url"] for item in items] == ["https://example.com/1", "https://example.com/2"]
+            storage.close()
+
+    def test_import_and_export_json(self):
+        """JSON形式からのインポート・JSON形式へのエクスポートテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_storage = Storage(data_dir=tmpdir)
+            json_storage.save_users([{"user_id": "U1", "subscribed_categories": ["AI"]}])
+            json_storage.save_site(TEST_SITE)
+            json_storage.save_json("information_items.json", {"items": [{"url": "https://example.com/1"}]})
+
+            # 新規データベース作成時に既存のJSONを取り込む（JSONファイルはそのまま残す）
+            storage = SQLiteStorage(data_dir=tmpdir)
+            assert storage.load_user("U1")["subscribed_categories"] == ["AI"]
+            assert storage.load_site("test_site") is not None
+            assert storage.load_information_items()["count"] == 1
+            assert (Path(tmpdir) / "information_items.json").exists()
+            assert not (Path(tmpdir) / "items").exists()
+
+            storage.save_user({"user_id": "U2", "subscribed_categories": []})
+            with tempfile.TemporaryDirectory() as export_dir:
+                assert storage.export_to_json(export_dir) is True
+                assert not (Path(export_dir) / "items").exists()
+                assert not (Path(export_dir) / "sites").exists()
+                exported_sites = json.loads((Path(export_dir) / "sites.json").read_text(encoding="utf-8"))
+                assert [site["id"] for site in exported_sites["sites"]] == ["test_site"]
+                exported_items = json.loads((Path(export_dir) / "information_items.json").read_text(encoding="utf-8"))
+                assert [item["url"] for item in exported_items["items"]] == ["https://example.com/1"]
+                exported = Storage(data_dir=export_dir).load_users()
+                assert [u["user_id"] for u in exported["users"]] == ["U1", "U2"]
+            storage.close()
+
+    def test_create_storage_backend(self):
+        """バックエンド選択テスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert type(create_storage(tmpdir, backend="json")) is Storage
+
+            storage = create_storage(tmpdir, backend="sqlite")
+            assert isinstance(storage, SQLiteStorage)
+            storage.close()
+
+            with pytest.raises(ValueError):
+                create_storage(tmpdir, backend="unknown")
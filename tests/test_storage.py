@@ -116,3 +116,45 @@ class TestStorage:
         is_valid, errors = storage.validate_site(invalid_site)
         assert is_valid is False
         assert any("check_interval_minutesは1以上の正の数" in error for error in errors)
+
+    def test_batch_writes_sites_json_once(self):
+        """バッチ内のサイト保存でsites.jsonが1回だけ書き込まれるテスト"""
+        from unittest.mock import patch
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            sites = [
+                {
+                    "id": f"site_{i}",
+                    "name": f"Site {i}",
+                    "url": f"https://example.com/{i}",
+                    "category": "AI",
+                    "collector_type": "rss",
+                    "collector_config": {"feed_url": f"https://example.com/{i}/feed.xml"},
+                    "enabled": True,
+                }
+                for i in range(50)
+            ]
+
+            with patch.object(storage, "save_json", wraps=storage.save_json) as save_json:
+                assert storage.save_sites(sites) is True
+                assert save_json.call_count == 1
+
+            loaded = storage.load_sites()["sites"]
+            assert [site["id"] for site in loaded] == [site["id"] for site in sites]
+
+            # 単体の更新・削除は該当エントリのみ反映
+            storage.save_site({**sites[0], "name": "Renamed"})
+            assert storage.delete_site("site_1") is True
+            loaded = storage.load_sites()["sites"]
+            assert len(loaded) == 49
+            assert loaded[0]["name"] == "Renamed"
+            assert "updated_at" not in loaded[0]
+
+            # 他のインスタンスで変更された場合は再集計される
+            Storage(data_dir=tmpdir).delete_site("site_2")
+            storage.save_site({**sites[3], "name": "Changed"})
+            assert {site["id"] for site in storage.load_sites()["sites"]} == {site["id"] for site in sites} - {
+                "site_1",
+                "site_2",
+            }
@@ -0,0 +1,42 @@
+"""SummaryCacheクラスのテスト"""
+
+import tempfile
+
+from src.collectors.summary_cache import SummaryCache
+from src.storage import Storage
+
+
+class TestSummaryCache:
+    """SummaryCacheクラスのテスト"""
+
+    def test_keyed_by_model_and_text(self):
+        """本文とモデル名の組み合わせで要約をキャッシュし、保存したものを読み込めるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            cache = SummaryCache(storage)
+            cache.put("gemini-1.5-flash", "本文", "要約")
+
+            assert cache.get("gemini-1.5-flash", "本文") == "要約"
+            assert cache.get("gemini-1.5-pro", "本文") is None
+            assert cache.get("gemini-1.5-flash", "別の本文") is None
+            assert (cache.hits, cache.misses) == (1, 2)
+
+            assert cache.flush() is True
+            assert SummaryCache(storage).get("gemini-1.5-flash", "本文") == "要約"
+
+    def test_evicts_least_recently_used(self):
+        """上限を超えると最も長く使われていない要約から削除するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            cache = SummaryCache(storage, max_entries=2)
+            cache.put("m", "a", "A")
+            cache.put("m", "b", "B")
+            assert cache.get("m", "a") == "A"
+            cache.put("m", "c", "C")
+
+            assert len(cache) == 2
+            assert cache.get("m", "b") is None
+            assert cache.get("m", "a") == "A"
+
+            cache.flush()
+            assert len(SummaryCache(storage, max_entries=1)) == 1
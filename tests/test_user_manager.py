@@ -0,0 +1,75 @@
+"""UserManagerクラスのテスト"""
+
+import tempfile
+from unittest.mock import patch
+
+from src.storage import Storage
+from src.user_manager import UserManager
+
+
+class TestUserManager:
+    """UserManagerクラスのテスト"""
+
+    def test_subscription_index(self):
+        """カテゴリ→ユーザーのインデックスが書き込みに追従するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = UserManager(Storage(data_dir=tmpdir))
+            manager.register_user("U1")
+            manager.register_user("U2")
+            manager.subscribe_category("U1", "AI")
+            manager.subscribe_category("U2", "AI")
+            manager.subscribe_category("U2", "SDGs")
+
+            assert manager.get_subscribed_users("AI") == ["U1", "U2"]
+            assert manager.get_subscribed_users("SDGs") == ["U2"]
+
+            manager.unsubscribe_category("U1", "AI")
+            manager.unregister_user("U2")
+            assert manager.get_subscribed_users("AI") == []
+            assert manager.get_subscribed_users("SDGs") == []
+
+    def test_users_loaded_once(self):
+        """インデックス構築後はusers.jsonを再読み込みしないテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = Storage(data_dir=tmpdir)
+            storage.save_users([{"user_id": "U1", "subscribed_categories": ["AI", "SDGs"]}])
+            manager = UserManager(storage)
+
+            with patch.object(storage, "load_users", wraps=storage.load_users) as load_users:
+                for category in ["AI", "SDGs", "ドローン"]:
+                    manager.get_subscribed_users(category)
+                assert load_users.call_count == 1
+
+                # 自身の書き込み後はインデックスを差分更新する（増えるのはJSONバックエンドのsave_user内の読み込みのみ）
+                manager.subscribe_category("U1", "ドローン")
+                assert manager.get_subscribed_users("ドローン") == ["U1"]
+                assert load_users.call_count == 2
+
+    def test_external_write_invalidates_index(self):
+        """他プロセスの書き込みでインデックスを再構築するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = UserManager(Storage(data_dir=tmpdir))
+            manager.register_user("U1")
+            assert manager.get_user("U2") is None
+
+            # 別プロセス相当のStorageから書き込む
+            Storage(data_dir=tmpdir).save_user({"user_id": "U2", "subscribed_categories": ["AI"]})
+            assert manager.get_user("U2") is not None
+            assert manager.get_subscribed_users("AI") == ["U2"]
+
+    def test_write_racing_an_external_write_reloads_index(self):
+        """インデックス構築後、自身の書き込み前に他プロセスが書き込んだ場合も、その変更を取り込むテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = UserManager(Storage(data_dir=tmpdir))
+            manager.register_user("U1")
+            original_ensure_index = manager._ensure_index
+
+            def ensure_index_then_external_write():
+                original_ensure_index()
+                # インデックス構築の直後に、別プロセス相当のStorageが書き込む
+                Storage(data_dir=tmpdir).save_user({"user_id": "U2", "subscribed_categories": ["AI"]})
+
+            with patch.object(manager, "_ensure_index", side_effect=ensure_index_then_external_write):
+                manager.subscribe_category("U1", "AI")
+
+            assert manager.get_subscribed_users("AI") == ["U1", "U2"]
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+import src.webhook_server as webhook_server
 from src.webhook_server import app
 
 
@@ -16,6 +17,14 @@ def client():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def reset_notifier():
+    """Drop the cached LineNotifier so each test sees its own mock"""
+    webhook_server._notifier = None
+    yield
+    webhook_server._notifier = None
+
+
 class TestWebhookServer:
     """Webhook server tests"""
 
@@ -82,3 +91,154 @@ class TestWebhookServer:
 
         # Should fail with 400
         assert response.status_code == 400
+
+    @patch("src.webhook_server.LineNotifier")
+    def test_webhook_acknowledges_before_reply(self, mock_notifier_class, client):
+        """Test webhook returns 200 while the reply is still being sent"""
+        import threading
+
+        from src.webhook_server import event_queue
+
+        release = threading.Event()
+        mock_notifier = MagicMock()
+        mock_notifier.channel_secret = "test_secret"
+        mock_notifier.verify_signature.return_value = True
+        mock_notifier.reply_text_message.side_effect = lambda *args: release.wait(5)
+        mock_notifier_class.return_value = mock_notifier
+
+        event = {
+            "type": "message",
+            "message": {"type": "text", "text": "test"},
+            "replyToken": "test_reply_token",
+            "source": {"userId": "test_user_id"},
+        }
+
+        response = client.post(
+            "/webhook",
+            data=json.dumps({"events": [event]}),
+            content_type="application/json",
+            headers={"X-Line-Signature": "test_signature"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["X-Webhook-Queue-Depth"] == "1"
+
+        release.set()
+        assert event_queue.join(timeout=5)
+        mock_notifier.reply_text_message.assert_called_once()
+
+    def test_metrics_endpoint(self, client):
+        """Test event queue metrics endpoint"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert {"depth", "max_depth", "workers", "submitted", "processed", "failed"} <= set(response.get_json())
+
+    @patch("src.webhook_server.LineNotifier")
+    def test_webhook_skips_redelivered_event(self, mock_notifier_class, client):
+        """Test a redelivered event with a known webhookEventId is not processed again"""
+        from src.webhook_server import event_queue
+
+        mock_notifier = MagicMock()
+        mock_notifier.channel_secret = "test_secret"
+        mock_notifier.verify_signature.return_value = True
+        mock_notifier_class.return_value = mock_notifier
+
+        event = {
+            "type": "message",
+            "message": {"type": "text", "text": "test"},
+            "replyToken": "test_reply_token",
+            "source": {"userId": "test_user_id"},
+            "webhookEventId": "01TESTREDELIVERY",
+            "deliveryContext": {"isRedelivery": False},
+        }
+        redelivered = {**event, "deliveryContext": {"isRedelivery": True}}
+
+        for payload in (event, redelivered):
+            response = client.post(
+                "/webhook",
+                data=json.dumps({"events": [payload]}),
+                content_type="application/json",
+                headers={"X-Line-Signature": "test_signature"},
+            )
+            assert response.status_code == 200
+
+        assert event_queue.join(timeout=5)
+        mock_notifier.reply_text_message.assert_called_once()
+
+    @patch("src.webhook_server.LineNotifier")
+    def test_webhook_processes_redelivery_of_failed_event(self, mock_notifier_class, client):
+        """Test a redelivered event is processed again when the first attempt raised"""
+        from src.webhook_server import event_queue
+
+        mock_notifier = MagicMock()
+        mock_notifier.channel_secret = "test_secret"
+        mock_notifier.verify_signature.return_value = True
+        mock_notifier.reply_text_message.side_effect = [RuntimeError("LINE API down"), True]
+        mock_notifier_class.return_value = mock_notifier
+
+        event = {
+            "type": "message",
+            "message": {"type": "text", "text": "test"},
+            "replyToken": "test_reply_token",
+            "source": {"userId": "test_user_id"},
+            "webhookEventId": "01TESTFAILEDEVENT",
+            "deliveryContext": {"isRedelivery": False},
+        }
+        redelivered = {**event, "deliveryContext": {"isRedelivery": True}}
+
+        for payload in (event, redelivered):
+            response = client.post(
+                "/webhook",
+                data=json.dumps({"events": [payload]}),
+                content_type="application/json",
+                headers={"X-Line-Signature": "test_signature"},
+            )
+            assert response.status_code == 200
+            assert event_queue.join(timeout=5)
+
+        assert mock_notifier.reply_text_message.call_count == 2
+
+
+class TestSitesListReply:
+    """Sites list reply rendering and caching tests"""
+
+    def test_render_pages_within_line_limits(self):
+        """Test a long sites list is paged into at most 5 messages of 5000 characters"""
+        from src.webhook_server import render_sites_list
+
+        sites = [
+            {"name": f"Site {i}", "category": "AI", "enabled": True, "url": f"https://example.com/{'x' * 100}/{i}"}
+            for i in range(300)
+        ]
+
+        pages = render_sites_list(sites)
+
+        assert 1 < len(pages) <= 5
+        assert all(len(page) <= 5000 for page in pages)
+        assert pages[0].startswith("📰 登録されているサイト一覧")
+        assert "…他" in pages[-1]
+
+    def test_render_empty(self):
+        """Test the reply when no sites are registered"""
+        from src.webhook_server import render_sites_list
+
+        assert render_sites_list([]) == ["現在登録されているサイトはありません。"]
+
+    def test_pages_cached_until_sites_change(self):
+        """Test the rendered reply is reused until the site config version changes"""
+        storage = MagicMock()
+        storage.get_data_version.return_value = "v1"
+        storage.load_sites.return_value = {"sites": [{"name": "Site A", "category": "AI", "enabled": True}]}
+
+        with (
+            patch.object(webhook_server, "storage", storage),
+            patch.dict(webhook_server._sites_reply_cache, {"version": None, "pages": None}),
+        ):
+            first = webhook_server.get_sites_list_pages()
+            assert webhook_server.get_sites_list_pages() is first
+            assert storage.load_sites.call_count == 1
+
+            storage.get_data_version.return_value = "v2"
+            storage.load_sites.return_value = {"sites": [{"name": "Site B", "category": "AI", "enabled": True}]}
+            assert "Site B" in webhook_server.get_sites_list_pages()[0]
+            assert storage.load_sites.call_count == 2
@@ -18,7 +18,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.storage import Storage
+from src.storage import create_storage
 
 
 def create_email_site_config(args) -> dict:
@@ -147,7 +147,7 @@ def main():
         sys.exit(1)
     
     # サイト設定を保存
-    storage = Storage()
+    storage = create_storage()
     
     # 既存のサイトIDをチェック
     existing_site = storage.load_site(args.id)
@@ -14,12 +14,12 @@ from typing import Dict, List
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.storage import Storage
+from src.storage import create_storage
 
 
 def load_sites() -> List[Dict]:
     """サイト設定を読み込み"""
-    storage = Storage()
+    storage = create_storage()
     sites_data = storage.load_sites()
     return sites_data.get("sites", []) if sites_data else []
 